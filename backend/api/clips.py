@@ -0,0 +1,23 @@
+import os
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from services.clips import clip_recorder
+
+router = APIRouter()
+
+
+@router.get("/clips")
+def list_clips(camera_id: Optional[str] = None):
+    """Saved alert clips, newest first"""
+    return {"clips": clip_recorder.list_clips(camera_id), **clip_recorder.stats()}
+
+
+@router.get("/clips/{alert_id}")
+def get_clip(alert_id: str):
+    """Motion-JPEG clip recorded around an alert"""
+    clip = clip_recorder.get_clip(alert_id)
+    if clip is None or not os.path.exists(clip["path"]):
+        raise HTTPException(status_code=404, detail="Clip not found or still recording")
+    return FileResponse(clip["path"], media_type="video/x-motion-jpeg", filename=clip["file"])
@@ -1,25 +1,43 @@
-from fastapi import APIRouter
-from services.alert_store import alerts  # Import shared store directly
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, Response
 from services.alert_service import get_alerts, clear_alerts
-from detection.state import current_detection
+from camera import camera_ids, get_feed
+from config import PRIMARY_CAMERA
+from detection.state import get_detection
 from db import get_all_users, get_user_by_name
-
-# Debug: Print store ID to verify same instance
-print(f"🔗 dashboard.py loaded - ALERT STORE ID: {id(alerts)}")
+from services import model_pool, readiness
+from services.scheduler import scheduler
+from services.snapshots import get_alert_thumbnail
+from services.profiles import runtime_settings
+from services.power import power_manager
 
 router = APIRouter()
 
 @router.get("/health")
 def health_check():
-    """Check if the system is active and running"""
-    return {"status": "active", "message": "System is running"}
+    """Check if the system is active and running, with the active performance profile"""
+    return {"status": "active", "message": "System is running", "profile": runtime_settings.active()}
+
+@router.get("/ready")
+def readiness_check():
+    """Load state and load time of each lazily initialised component"""
+    ready = readiness.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "components": readiness.status()},
+    )
 
 @router.get("/alerts")
 def get_alerts_endpoint():
-    print(f"📋 GET /alerts - ALERT STORE ID: {id(alerts)}, count: {len(alerts)}")
-    result = get_alerts()
-    print(f"📋 GET /alerts returning {len(result)} alerts")
-    return result
+    return get_alerts()
+
+@router.get("/alerts/{alert_id}/thumbnail")
+def get_alert_thumbnail_endpoint(alert_id: str):
+    """Small JPEG of the frame that triggered an alert"""
+    thumbnail = get_alert_thumbnail(alert_id)
+    if thumbnail is None:
+        raise HTTPException(status_code=404, detail="No thumbnail for this alert")
+    return Response(thumbnail, media_type="image/jpeg", headers={"Cache-Control": "max-age=86400"})
 
 @router.delete("/alerts")
 def delete_all_alerts():
@@ -27,10 +45,31 @@ def delete_all_alerts():
     clear_alerts()
     return {"message": "All alerts cleared"}
 
+@router.get("/cameras")
+def list_cameras():
+    """Configured cameras, their latest frame, inference scheduler and model pool stats"""
+    cameras = []
+    for camera_id in camera_ids():
+        seq, timestamp, _ = get_feed(camera_id).latest()
+        cameras.append({
+            "id": camera_id,
+            "frames": seq,
+            "last_frame": timestamp or None,
+            "detection": dict(get_detection(camera_id)),
+        })
+    return {"cameras": cameras, "scheduler": scheduler.stats(), "model_pools": model_pool.stats()}
+
+@router.get("/power")
+def power_status():
+    """Power-save mode of each camera and the time spent active and idle"""
+    return power_manager.stats()
+
 @router.get("/current-detection")
-def get_current_detection():
+def get_current_detection(camera_id: str = PRIMARY_CAMERA):
+    if camera_id not in camera_ids():
+        raise HTTPException(status_code=404, detail=f"Unknown camera '{camera_id}'")
     # If a known face is detected, include their reminders
-    detection = dict(current_detection)
+    detection = dict(get_detection(camera_id))
     if detection.get("isKnown") and detection.get("name"):
         user = get_user_by_name(detection["name"])
         if user:
@@ -1,10 +1,46 @@
+import os
+import time
+
 from fastapi import APIRouter, UploadFile, File, Form
-import numpy as np
-import face_recognition
-from db import add_user
-import cv2
+from starlette.concurrency import run_in_threadpool
+from api.upload_utils import StageTimer, decode_image, read_upload, save_upload
+from config import ENROLL_DETECT_MAX_SIDE, ENROLL_IMAGE_MAX_BYTES, ENROLL_VIDEO_MAX_BYTES
+from recognition.face_lib import face_encodings
+from recognition.face_detectors import crop_face, detect_faces_bounded
+from recognition.video_enrollment import EnrollmentError, select_enrollment_faces
+from db import add_user, add_user_encodings
+from services.logger import get_logger
 
 router = APIRouter()
+log = get_logger("enroll")
+
+
+def encode_face_photo(image_bytes, timer):
+    """
+    Encoding of the first face in an uploaded photo. CPU-bound, so handlers
+    run it in the threadpool. Raises EnrollmentError with a message for the
+    user when the photo can't be used.
+    """
+    # Decode to contiguous uint8 RGB, at reduced scale for large JPEGs
+    rgb, scale = decode_image(image_bytes)
+    timer.lap("decode")
+    if rgb is None:
+        raise EnrollmentError("Invalid image format")
+    log.debug("decoded upload", shape=rgb.shape, scale=scale)
+
+    # Detect on a bounded copy, encode only the face region
+    face_locations = detect_faces_bounded(rgb, ENROLL_DETECT_MAX_SIDE)
+    timer.lap("detect")
+    if not face_locations:
+        raise EnrollmentError("No face detected. Please upload a clear photo with a visible face.")
+
+    crop, box = crop_face(rgb, face_locations[0])
+    encodings = face_encodings(crop, [box])
+    timer.lap("encode")
+    log.debug("faces encoded", faces=len(face_locations), encodings=len(encodings))
+    if not encodings:
+        raise EnrollmentError("Could not extract face encoding. Please try a different photo.")
+    return encodings[0]
 
 
 @router.post("/enroll-face")
@@ -12,91 +48,81 @@ async def enroll_face(
     name: str = Form(...),
     file: UploadFile = File(...)
 ):
+    timer = StageTimer()
+    # Oversized bodies were already refused by UploadLimitMiddleware
+    image_bytes = await read_upload(file, ENROLL_IMAGE_MAX_BYTES)
+    timer.lap("read")
     try:
-        print(f"\n=== Enrollment Request ===", flush=True)
-        print(f"Name: {name}", flush=True)
-        print(f"File: {file.filename}", flush=True)
-        
-        # Read uploaded image
-        image_bytes = await file.read()
-        print(f"Image bytes received: {len(image_bytes)}", flush=True)
-        
-        # Decode bytes with OpenCV to ensure contiguous uint8 RGB data
-        image_array = np.frombuffer(image_bytes, dtype=np.uint8)
-        bgr_image = cv2.imdecode(image_array, cv2.IMREAD_UNCHANGED)
-
-        if bgr_image is None:
-            print("ERROR decoding image: OpenCV returned None", flush=True)
-            return {"error": "Invalid image format"}
-
-        print(
-            "Decoded BGR: "
-            f"shape={bgr_image.shape}, dtype={bgr_image.dtype}, "
-            f"ndim={bgr_image.ndim}, contiguous={bgr_image.flags['C_CONTIGUOUS']}",
-            flush=True,
-        )
+        log.info("enrollment request", name=name, file=file.filename, bytes=len(image_bytes))
 
-        if bgr_image.ndim == 2:
-            bgr_image = cv2.cvtColor(bgr_image, cv2.COLOR_GRAY2BGR)
-            print("Converted grayscale to BGR", flush=True)
-        elif bgr_image.shape[2] == 4:
-            bgr_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGRA2BGR)
-            print("Dropped alpha channel", flush=True)
-
-        rgb = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
-        rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
-
-        print(
-            "Prepared RGB for dlib: "
-            f"shape={rgb.shape}, dtype={rgb.dtype}, contiguous={rgb.flags['C_CONTIGUOUS']}",
-            flush=True,
-        )
-
-        # Use face_recognition to detect faces and get encodings
         try:
-            # Detect face locations first
-            face_locations = face_recognition.face_locations(rgb)
-            print(f"Face locations found: {len(face_locations)}", flush=True)
-            
-            if not face_locations:
-                print("ERROR: No face detected in image", flush=True)
-                return {"error": "No face detected. Please upload a clear photo with a visible face."}
-            
-            # Get face encodings for detected faces
-            encodings = face_recognition.face_encodings(rgb, face_locations)
-            print(f"Encodings extracted: {len(encodings)}", flush=True)
-            
+            encoding = await run_in_threadpool(encode_face_photo, image_bytes, timer)
+        except EnrollmentError as e:
+            log.info("enrollment photo rejected", name=name, reason=str(e))
+            return {"error": str(e)}
         except Exception as e:
-            print(f"ERROR in face detection/encoding: {e}", flush=True)
-            import traceback
-            traceback.print_exc()
+            log.exception("face processing failed", name=name, error=e)
             return {"error": f"Face processing failed: {str(e)}"}
-            
-        if not encodings:
-            print("ERROR: Could not extract face encoding", flush=True)
-            return {"error": "Could not extract face encoding. Please try a different photo."}
 
         # Save user with face_encoding (single 128-dim vector)
         user = {
             "name": name.lower(),
-            "face_encoding": encodings[0].tolist()
+            "face_encoding": encoding.tolist()
         }
 
         try:
-            add_user(user)
-            print(f"✓ Successfully enrolled: {name}", flush=True)
+            await run_in_threadpool(add_user, user)
+            timer.lap("save")
+            log.info("user enrolled", name=name, **timer.seconds)
             return {
                 "status": "success",
-                "message": f"{name} enrolled successfully"
+                "message": f"{name} enrolled successfully",
+                "timings": timer.seconds
             }
         except Exception as e:
-            print(f"ERROR saving to database: {e}", flush=True)
-            import traceback
-            traceback.print_exc()
+            log.exception("failed to save user", name=name, error=e)
             return {"error": f"Failed to save user: {str(e)}"}
     
     except Exception as e:
-        print(f"ERROR in enroll endpoint: {e}", flush=True)
-        import traceback
-        traceback.print_exc()
+        log.exception("enrollment failed", name=name, error=e)
         return {"error": f"Enrollment failed: {str(e)}"}
+
+
+@router.post("/enroll-video")
+async def enroll_video(
+    name: str = Form(...),
+    file: UploadFile = File(...)
+):
+    """Enroll from a few seconds of video of the person turning their head"""
+    # Streamed to disk in chunks; oversized bodies were already refused by UploadLimitMiddleware
+    path, size = await save_upload(file, ENROLL_VIDEO_MAX_BYTES)
+    try:
+        log.info("video enrollment request", name=name, file=file.filename, bytes=size)
+        start = time.perf_counter()
+        try:
+            encodings, report = await run_in_threadpool(select_enrollment_faces, path)
+        except EnrollmentError as e:
+            log.info("video enrollment rejected", name=name, reason=str(e))
+            return {"error": str(e)}
+        except Exception as e:
+            log.exception("video processing failed", name=name, error=e)
+            return {"error": f"Face processing failed: {str(e)}"}
+
+        try:
+            total = await run_in_threadpool(add_user_encodings, name, encodings)
+        except Exception as e:
+            log.exception("failed to save user", name=name, error=e)
+            return {"error": f"Failed to save user: {str(e)}"}
+
+        seconds = time.perf_counter() - start
+        log.info("user enrolled from video", name=name, encodings=len(encodings), seconds=round(seconds, 2))
+        return {
+            "status": "success",
+            "message": f"{name} enrolled with {len(encodings)} faces from the video",
+            "encodings_added": len(encodings),
+            "encodings_total": total,
+            "seconds": round(seconds, 2),
+            **report,
+        }
+    finally:
+        os.unlink(path)
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from fastapi import HTTPException
+
+
+def parse_time(value):
+    """Epoch seconds or ISO 8601 (naive = server local time)."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid time '{value}'")
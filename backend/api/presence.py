@@ -0,0 +1,36 @@
+import time
+from typing import Optional
+
+from api.params import parse_time
+from fastapi import APIRouter, HTTPException
+from services.presence import presence_timeline
+
+router = APIRouter()
+
+DEFAULT_RANGE_SECONDS = 24 * 3600
+
+
+@router.get("/presence")
+def get_presence(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    camera_id: Optional[str] = None,
+    name: Optional[str] = None,
+    intervals: bool = True,
+):
+    """Per-person presence intervals and occupancy per camera (default: the last 24 hours)"""
+    end_ts = parse_time(end) or time.time()
+    start_ts = parse_time(start)
+    if start_ts is None:
+        start_ts = end_ts - DEFAULT_RANGE_SECONDS
+    if start_ts >= end_ts:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    return {
+        "start": start_ts,
+        "end": end_ts,
+        "cameras": presence_timeline.query(
+            start_ts, end_ts, camera_id, name, intervals
+        ),
+        "storage": presence_timeline.stats(),
+    }
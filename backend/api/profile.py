@@ -0,0 +1,28 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from config import PROFILES
+from services.profiles import runtime_settings
+
+router = APIRouter()
+
+
+class ApplyProfileRequest(BaseModel):
+    profile: str
+    overrides: Dict[str, Any] = {}
+
+
+@router.get("/profile")
+def get_profile():
+    """Active performance profile and the values of every available one"""
+    return {**runtime_settings.active(), "profiles": PROFILES}
+
+
+@router.post("/profile")
+def apply_profile(request: ApplyProfileRequest):
+    """Switch performance profile (optionally overriding single values) without a restart"""
+    try:
+        return runtime_settings.apply_profile(request.profile, request.overrides)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
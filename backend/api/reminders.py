@@ -1,6 +1,9 @@
+import time
+
 from fastapi import APIRouter
-from pydantic import BaseModel
-from db import update_reminders, get_user_by_name
+from pydantic import BaseModel, Field
+from db import update_reminders, update_timed_reminders, get_user_by_name
+from services.reminder_scheduler import reminder_scheduler
 from typing import List
 
 router = APIRouter()
@@ -9,6 +12,14 @@ class UpdateRemindersRequest(BaseModel):
     name: str
     reminders: List[str]
 
+class TimedReminder(BaseModel):
+    message: str
+    at: str = Field(pattern=r"^([01]\d|2[0-3]):[0-5]\d$")  # HH:MM, local time
+
+class UpdateTimedRemindersRequest(BaseModel):
+    name: str
+    reminders: List[TimedReminder]
+
 @router.post("/update-reminders")
 def set_reminders(request: UpdateRemindersRequest):
     success = update_reminders(request.name.lower(), request.reminders)
@@ -22,4 +33,20 @@ def get_user_reminders(name: str):
     user = get_user_by_name(name.lower())
     if not user:
         return {"error": "User not found"}
-    return {"name": user["name"], "reminders": user.get("reminders", [])}
+    return {
+        "name": user["name"],
+        "reminders": user.get("reminders", []),
+        "timed_reminders": user.get("timed_reminders", []),
+    }
+
+@router.post("/update-timed-reminders")
+def set_timed_reminders(request: UpdateTimedRemindersRequest):
+    reminders = [r.model_dump() for r in request.reminders]
+    if not update_timed_reminders(request.name.lower(), reminders):
+        return {"error": "User not found"}
+    return {"status": "Timed reminders updated", "timed_reminders": reminders}
+
+@router.get("/reminder-schedule")
+def get_reminder_schedule():
+    """Upcoming time-of-day reminders and those waiting for their user"""
+    return reminder_scheduler.upcoming(time.time())
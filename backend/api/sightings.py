@@ -0,0 +1,90 @@
+import json
+import time
+from typing import Optional
+
+import numpy as np
+from api.params import parse_time
+from api.upload_utils import decode_image, read_upload
+from config import ENROLL_DETECT_MAX_SIDE, ENROLL_IMAGE_MAX_BYTES, SIGHTING_DEFAULT_WINDOW_HOURS
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from recognition.face_detectors import crop_face, detect_faces_bounded
+from recognition.face_lib import face_encodings
+from services.sightings import sighting_index
+from starlette.concurrency import run_in_threadpool
+
+router = APIRouter()
+
+
+def _time_range(start, end):
+    """Parsed (start, end); without a start, the SIGHTING_DEFAULT_WINDOW_HOURS before end (or now)."""
+    start, end = parse_time(start), parse_time(end)
+    if start is None:
+        start = (time.time() if end is None else end) - SIGHTING_DEFAULT_WINDOW_HOURS * 3600
+    return start, end
+
+
+def _probe_from_image(image_bytes):
+    # Same bounded decode and detection as enrollment, so a huge photo can't stall a worker
+    rgb, _ = decode_image(image_bytes)
+    if rgb is None:
+        raise HTTPException(status_code=400, detail="Invalid image format")
+    locations = detect_faces_bounded(rgb, ENROLL_DETECT_MAX_SIDE)
+    if not locations:
+        raise HTTPException(status_code=400, detail="No face detected in probe image")
+    crop, box = crop_face(rgb, locations[0])
+    encodings = face_encodings(crop, [box])
+    if not encodings:
+        raise HTTPException(status_code=400, detail="Could not encode the probe face")
+    return encodings[0]
+
+
+@router.get("/sightings")
+def list_sightings(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    camera_id: Optional[str] = None,
+    name: Optional[str] = None,
+    limit: int = 100,
+):
+    """Recorded sightings in a time range (default: the last day), newest first"""
+    start, end = _time_range(start, end)
+    return {
+        "sightings": sighting_index.list(start, end, camera_id, name, limit),
+        "start": start,
+        **sighting_index.stats(),
+    }
+
+
+@router.post("/sightings/search")
+async def search_sightings(
+    file: Optional[UploadFile] = File(None),
+    embedding: Optional[str] = Form(None),
+    start: Optional[str] = Form(None),
+    end: Optional[str] = Form(None),
+    camera_id: Optional[str] = Form(None),
+    threshold: float = Form(0.5),
+    limit: int = Form(50),
+):
+    """Sightings of the face in a probe image (or a JSON 128-d embedding), closest first.
+    Without ``start`` only the last SIGHTING_DEFAULT_WINDOW_HOURS are searched."""
+    search_start, search_end = _time_range(start, end)
+    if embedding:
+        try:
+            probe = np.array(json.loads(embedding), dtype=np.float32)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="embedding must be a JSON list of numbers")
+        if probe.shape != (128,):
+            raise HTTPException(status_code=400, detail="embedding must have 128 values")
+    elif file is not None:
+        # Detection, encoding and partition loading all block, so they run off the event loop
+        image_bytes = await read_upload(file, ENROLL_IMAGE_MAX_BYTES)
+        probe = await run_in_threadpool(_probe_from_image, image_bytes)
+    else:
+        raise HTTPException(status_code=400, detail="Provide a probe image or an embedding")
+
+    return {
+        "sightings": await run_in_threadpool(
+            sighting_index.search, probe, search_start, search_end, camera_id, threshold, limit
+        ),
+        "start": search_start,
+    }
@@ -0,0 +1,164 @@
+import os
+import re
+import struct
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from config import ENROLL_DECODE_MIN_SIDE, UPLOAD_CHUNK_BYTES
+
+# Allowance for the multipart framing and form fields around the file
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# JPEG scales OpenCV can decode at directly (libjpeg DCT scaling)
+REDUCED_READS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def _suffix(filename):
+    """The upload's extension if it looks like one (decoders may rely on it)."""
+    extension = os.path.splitext(filename or "")[1]
+    return extension if re.fullmatch(r"\.[A-Za-z0-9]{1,5}", extension) else ""
+
+
+def _too_large(max_bytes):
+    return HTTPException(status_code=413, detail=f"Upload larger than {max_bytes // (1024 * 1024)} MB")
+
+
+class UploadLimitMiddleware:
+    """
+    Refuses request bodies over a per-path cap with 413 before the form is
+    parsed and spooled: at once from Content-Length, or as soon as a streamed
+    body passes the cap. ``limits`` maps path -> max file bytes.
+    """
+
+    def __init__(self, app, limits):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        max_body = limit + FORM_OVERHEAD_BYTES
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > max_body:
+            response = JSONResponse(status_code=413, content={"detail": _too_large(limit).detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    # Raised inside the form parsing, so the 413 is sent by FastAPI
+                    raise _too_large(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def read_upload(file, max_bytes):
+    """
+    Read an upload UPLOAD_CHUNK_BYTES at a time; 413 as soon as it passes
+    ``max_bytes``. The body itself is bounded by UploadLimitMiddleware.
+    """
+    chunks, size = [], 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > max_bytes:
+            raise _too_large(max_bytes)
+        chunks.append(chunk)
+
+
+async def save_upload(file, max_bytes):
+    """
+    Stream an upload to a temporary file, UPLOAD_CHUNK_BYTES at a time.
+
+    Returns (path, size); the caller deletes the file. Uploads larger than
+    ``max_bytes`` are rejected with 413 as soon as the cap is crossed.
+    """
+    handle = tempfile.NamedTemporaryFile(suffix=_suffix(file.filename), delete=False)
+    size = 0
+    try:
+        with handle:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                handle.write(chunk)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    return handle.name, size
+
+
+def jpeg_size(data):
+    """(width, height) from a JPEG's frame header, or None if ``data`` isn't a readable JPEG."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # markers without a length
+            i += 2
+            continue
+        # SOFn frame headers; C4, C8 and CC share the range but are not frames
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+
+def decode_image(data, min_side=ENROLL_DECODE_MIN_SIDE):
+    """
+    Decode an uploaded image to contiguous RGB uint8. Large JPEGs are decoded
+    straight at a reduced scale as long as the longer side stays at least
+    ``min_side``. Returns (rgb, scale) with scale the reduction factor, or
+    (None, 1) when the data can't be decoded.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    flag, scale = cv2.IMREAD_COLOR, 1
+    size = jpeg_size(data)
+    if size is not None:
+        for factor, reduced in REDUCED_READS:
+            if max(size) // factor >= min_side:
+                flag, scale = reduced, factor
+                break
+    bgr = cv2.imdecode(buffer, flag)
+    if bgr is None:
+        return None, 1
+    return np.ascontiguousarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)), scale
+
+
+class StageTimer:
+    """Seconds spent in each stage of a request, returned in the response."""
+
+    def __init__(self):
+        self.seconds = {}
+        self._mark = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.seconds[stage] = round(now - self._mark, 4)
+        self._mark = now
@@ -0,0 +1,133 @@
+"""
+Speed / recall benchmark for the face detector backends.
+
+The dataset is a directory of images plus a ``labels.json`` that maps each
+image file name to its ground-truth face boxes as ``[x1, y1, x2, y2]`` pixels:
+
+    {"door_01.jpg": [[120, 80, 220, 200]], "empty_hall.jpg": []}
+
+Run from the backend folder:
+
+    python -m benchmarks.face_detectors path/to/dataset --backends hog haar mediapipe
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from recognition.face_detectors import DETECTOR_BACKENDS, create_face_detector
+
+IOU_MATCH = 0.5
+
+
+def load_dataset(dataset_dir):
+    with open(os.path.join(dataset_dir, "labels.json"), "r") as f:
+        labels = json.load(f)
+
+    samples = []
+    for filename, boxes in sorted(labels.items()):
+        bgr = cv2.imread(os.path.join(dataset_dir, filename), cv2.IMREAD_COLOR)
+        if bgr is None:
+            print(f"Skipping unreadable image: {filename}", file=sys.stderr)
+            continue
+        rgb = np.ascontiguousarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+        samples.append((filename, rgb, [tuple(b) for b in boxes]))
+    return samples
+
+
+def _iou(a, b):
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _match(predicted, truth):
+    """Greedy one-to-one matching; returns the number of true positives."""
+    unmatched = list(predicted)
+    hits = 0
+    for gt in truth:
+        best = max(unmatched, key=lambda p: _iou(p, gt), default=None)
+        if best is not None and _iou(best, gt) >= IOU_MATCH:
+            unmatched.remove(best)
+            hits += 1
+    return hits
+
+
+def benchmark_backend(backend, samples, warmup=2):
+    detector = create_face_detector(backend)
+
+    for _, rgb, _ in samples[:warmup]:
+        detector.detect(rgb)
+
+    latencies = []
+    truth_total = predicted_total = hits = 0
+    for _, rgb, truth in samples:
+        start = time.perf_counter()
+        locations = detector.detect(rgb)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+        # (top, right, bottom, left) -> (x1, y1, x2, y2)
+        predicted = [(left, top, right, bottom) for top, right, bottom, left in locations]
+        truth_total += len(truth)
+        predicted_total += len(predicted)
+        hits += _match(predicted, truth)
+
+    latencies = np.array(latencies)
+    return {
+        "backend": backend,
+        "images": len(samples),
+        "latency_ms_mean": float(latencies.mean()),
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        "recall": hits / truth_total if truth_total else None,
+        "precision": hits / predicted_total if predicted_total else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dataset", help="Directory with images and labels.json")
+    parser.add_argument(
+        "--backends", nargs="+", default=list(DETECTOR_BACKENDS),
+        help="Backends to compare (default: all)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    samples = load_dataset(args.dataset)
+    if not samples:
+        parser.error("No labelled images found")
+
+    results = []
+    for backend in args.backends:
+        try:
+            results.append(benchmark_backend(backend, samples))
+        except Exception as e:
+            results.append({"backend": backend, "error": str(e)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'backend':<10} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7} {'prec':>7}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<10} unavailable: {r['error']}")
+            continue
+        recall = "-" if r["recall"] is None else f"{r['recall']:.3f}"
+        precision = "-" if r["precision"] is None else f"{r['precision']:.3f}"
+        print(
+            f"{r['backend']:<10} {r['latency_ms_mean']:>8.1f} {r['latency_ms_p50']:>8.1f} "
+            f"{r['latency_ms_p95']:>8.1f} {recall:>7} {precision:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Memory / latency / agreement benchmark for the known-face gallery modes.
+
+Compares each recognition.gallery mode against the float64 path on the same
+queries: bytes held, query latency, and how often the
+identification (best name, and match vs. stranger at the 0.45 threshold)
+agrees with float64. Galleries come from a users.json or are generated with
+dlib-like statistics (128-d, same-person distance ~0.3, different ~1.0).
+Quantized modes re-rank from the benchmark's own encodings, as the live
+galleries do from the user cache, so that memory is not counted.
+
+Run from the backend folder:
+
+    python -m benchmarks.gallery --identities 2000 --shots 5
+    python -m benchmarks.gallery --users users.json --json
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from recognition.gallery import GALLERY_MODES, FaceGallery
+
+MATCH_THRESHOLD = 0.45
+DIMENSIONS = 128
+
+
+def synthetic_gallery(identities, shots, queries, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0.0, 0.065, (identities, DIMENSIONS))
+    names = [f"person{i}" for i in range(identities) for _ in range(shots)]
+    encodings = np.repeat(centers, shots, axis=0) + rng.normal(0.0, 0.018, (identities * shots, DIMENSIONS))
+
+    # Half the queries are new shots of enrolled people, half are strangers
+    known = centers[rng.integers(0, identities, queries // 2)]
+    strangers = rng.normal(0.0, 0.065, (queries - len(known), DIMENSIONS))
+    probes = np.vstack([known, strangers]) + rng.normal(0.0, 0.018, (queries, DIMENSIONS))
+    return names, encodings, probes
+
+
+def users_gallery(path, queries, seed=0):
+    with open(path, "r") as f:
+        users = json.load(f)
+    names, encodings = [], []
+    for user in users:
+        for encoding in user.get("face_encodings") or ([user["face_encoding"]] if user.get("face_encoding") else []):
+            names.append(user["name"])
+            encodings.append(encoding)
+    encodings = np.asarray(encodings, dtype=np.float64)
+    # Probe with perturbed enrolled shots
+    rng = np.random.default_rng(seed)
+    probes = encodings[rng.integers(0, len(encodings), queries)]
+    return names, encodings, probes + rng.normal(0.0, 0.018, probes.shape)
+
+
+def benchmark_mode(mode, names, encodings, probes, reference, rerank_k):
+    build_start = time.perf_counter()
+    gallery = FaceGallery(names, encodings, mode=mode, rerank_k=rerank_k, source=lambda rows: encodings[rows])
+    build_ms = (time.perf_counter() - build_start) * 1000.0
+
+    latencies = []
+    agree_name = agree_decision = 0
+    distance_error = 0.0
+    for probe, (ref_decision, ref_name, ref_distance) in zip(probes, reference):
+        start = time.perf_counter()
+        name, distance = gallery.best(probe)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+        decision = name if distance < MATCH_THRESHOLD else "STRANGER"
+        agree_name += name == ref_name
+        agree_decision += decision == ref_decision
+        distance_error = max(distance_error, abs(distance - ref_distance))
+
+    latencies = np.array(latencies)
+    return {
+        "mode": mode,
+        "vectors": len(gallery),
+        "bytes": gallery.nbytes(),
+        "scan_bytes": gallery.scan_nbytes(),
+        "bytes_per_vector": gallery.nbytes() / max(1, len(gallery)),
+        "build_ms": build_ms,
+        "query_ms_mean": float(latencies.mean()),
+        "query_ms_p50": float(np.percentile(latencies, 50)),
+        "query_ms_p95": float(np.percentile(latencies, 95)),
+        "top1_agreement": agree_name / len(probes),
+        "decision_agreement": agree_decision / len(probes),
+        "max_distance_error": distance_error,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", help="users.json to take the gallery from")
+    parser.add_argument("--identities", type=int, default=1000, help="Synthetic identities")
+    parser.add_argument("--shots", type=int, default=5, help="Synthetic encodings per identity")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--rerank-k", type=int, default=8)
+    parser.add_argument("--modes", nargs="+", default=list(GALLERY_MODES), choices=GALLERY_MODES)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.users:
+        names, encodings, probes = users_gallery(args.users, args.queries)
+    else:
+        names, encodings, probes = synthetic_gallery(args.identities, args.shots, args.queries)
+    if not names:
+        parser.error("Gallery is empty")
+
+    exact = FaceGallery(names, encodings, mode="float64")
+    reference = []
+    for probe in probes:
+        name, distance = exact.best(probe)
+        decision = name if distance < MATCH_THRESHOLD else "STRANGER"
+        reference.append((decision, name, distance))
+
+    results = [
+        benchmark_mode(mode, names, encodings, probes, reference, args.rerank_k)
+        for mode in args.modes
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{len(names)} vectors, {len(probes)} queries, rerank k={args.rerank_k}")
+    print(
+        f"{'mode':<8} {'scan KiB':>9} {'total KiB':>10} {'B/vec':>7} {'mean ms':>8} {'p95 ms':>8} "
+        f"{'top-1':>7} {'decision':>9} {'max |dd|':>9}"
+    )
+    for r in results:
+        print(
+            f"{r['mode']:<8} {r['scan_bytes'] / 1024:>9.1f} {r['bytes'] / 1024:>10.1f} "
+            f"{r['bytes_per_vector']:>7.0f} "
+            f"{r['query_ms_mean']:>8.3f} {r['query_ms_p95']:>8.3f} "
+            f"{r['top1_agreement']:>7.3f} {r['decision_agreement']:>9.3f} "
+            f"{r['max_distance_error']:>9.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
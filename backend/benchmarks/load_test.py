@@ -0,0 +1,307 @@
+"""
+HTTP load test for the dashboard API and the MJPEG stream.
+
+Simulates N dashboards polling /alerts, /current-detection and /users and M
+viewers holding /video-feed open, then prints a JSON report with throughput,
+latency percentiles per endpoint, stream frame rates and server CPU time.
+
+By default the app runs under uvicorn in a subprocess (so its CPU time is
+measured on its own) with the synthetic frame source. --inprocess drives the
+ASGI app directly in this process instead; no server or port is needed, but
+the CPU figure then includes the load generator.
+
+Run from the backend folder:
+
+    python -m benchmarks.load_test --pollers 20 --viewers 3 --duration 30
+    python -m benchmarks.load_test --inprocess --pollers 50 --poll-interval 0
+
+Needs the dev requirements (pip install -r requirements-dev.txt).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+try:
+    import psutil
+except ImportError:  # only needed where /proc is missing (Windows)
+    psutil = None
+
+POLL_ENDPOINTS = ("/alerts", "/current-detection", "/users")
+BOUNDARY = b"--frame\r\n"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Recorder:
+    def __init__(self):
+        self.measuring = False
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.stream_frames = []
+        self.stream_bytes = []
+
+    def request(self, path, seconds, ok):
+        if not self.measuring:
+            return
+        if ok:
+            self.latencies[path].append(seconds * 1000.0)
+        else:
+            self.errors[path] += 1
+
+
+def _percentiles(values_ms):
+    values = np.array(values_ms) if values_ms else np.zeros(1)
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+# ---------------- CLIENTS ---------------- #
+async def poller(client, recorder, interval, stop_at):
+    """One dashboard: fetch every poll endpoint, then wait for the next round."""
+    while time.monotonic() < stop_at:
+        round_start = time.monotonic()
+        for path in POLL_ENDPOINTS:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            recorder.request(path, time.perf_counter() - start, ok)
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - round_start)))
+
+
+class _StreamCounter:
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.frames = 0
+        self.bytes = 0
+        self._tail = b""
+
+    def feed(self, chunk):
+        if not self.recorder.measuring:
+            return
+        data = self._tail + chunk
+        self.frames += data.count(BOUNDARY)
+        self.bytes += len(chunk)
+        # Keep enough to catch a boundary split across chunks
+        self._tail = data[-(len(BOUNDARY) - 1):]
+
+    def finish(self):
+        self.recorder.stream_frames.append(self.frames)
+        self.recorder.stream_bytes.append(self.bytes)
+
+
+async def http_viewer(client, recorder, path, stop_at):
+    counter = _StreamCounter(recorder)
+    try:
+        async with client.stream("GET", path, timeout=None) as response:
+            async for chunk in response.aiter_raw():
+                counter.feed(chunk)
+                if time.monotonic() >= stop_at:
+                    break
+    except httpx.HTTPError as e:
+        print(f"Stream viewer failed: {e}", file=sys.stderr)
+    counter.finish()
+
+
+async def asgi_viewer(app, recorder, path, stop_at):
+    """Stream viewer that calls the ASGI app directly (httpx buffers ASGI bodies)."""
+    counter = _StreamCounter(recorder)
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "", "headers": [(b"host", b"loadtest")],
+        "client": ("127.0.0.1", 0), "server": ("loadtest", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(max(0.0, stop_at - time.monotonic()))
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            counter.feed(message.get("body", b""))
+
+    await app(scope, receive, send)
+    counter.finish()
+
+
+# ---------------- SERVER ---------------- #
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _process_cpu_seconds(pid):
+    """utime + stime of a process from /proc (Linux) or psutil, or None."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except OSError:
+        pass
+    if psutil is None:
+        return None
+    try:
+        times = psutil.Process(pid).cpu_times()
+    except psutil.Error:
+        return None
+    return times.user + times.system
+
+
+def _self_cpu_seconds():
+    return time.process_time()
+
+
+def start_server(port, env):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("Server did not become healthy within 60s")
+
+
+# ---------------- RUN ---------------- #
+async def run_load(client, viewer, args, cpu_seconds):
+    recorder = Recorder()
+    stop_at = time.monotonic() + args.warmup + args.duration
+    stream_path = f"/video-feed?tier={args.tier}"
+
+    tasks = [
+        asyncio.create_task(poller(client, recorder, args.poll_interval, stop_at))
+        for _ in range(args.pollers)
+    ]
+    tasks += [
+        asyncio.create_task(viewer(recorder, stream_path, stop_at))
+        for _ in range(args.viewers)
+    ]
+
+    await asyncio.sleep(args.warmup)
+    recorder.measuring = True
+    cpu_start, measure_start = cpu_seconds(), time.monotonic()
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - measure_start
+    cpu_end = cpu_seconds()
+
+    endpoints = {}
+    total = 0
+    for path in POLL_ENDPOINTS:
+        latencies = recorder.latencies[path]
+        total += len(latencies)
+        endpoints[path] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[path],
+            "rps": len(latencies) / elapsed,
+            **_percentiles(latencies),
+        }
+
+    cpu = None if cpu_start is None or cpu_end is None else cpu_end - cpu_start
+    return {
+        "seconds": elapsed,
+        "total_rps": total / elapsed,
+        "endpoints": endpoints,
+        "streams": {
+            "viewers": args.viewers,
+            "tier": args.tier,
+            "fps_per_viewer": [frames / elapsed for frames in recorder.stream_frames],
+            "kbytes_per_second_per_viewer": [b / elapsed / 1024 for b in recorder.stream_bytes],
+        },
+        "cpu_seconds": cpu,
+        "cpu_percent": 100.0 * cpu / elapsed if cpu is not None else None,
+    }
+
+
+async def run_inprocess(args):
+    import main
+    app = main.app
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            viewer = lambda recorder, path, stop_at: asgi_viewer(app, recorder, path, stop_at)  # noqa: E731
+            return await run_load(client, viewer, args, _self_cpu_seconds)
+
+
+async def run_server(args, port, pid):
+    limits = httpx.Limits(max_connections=args.pollers + args.viewers + 10)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+        viewer = lambda recorder, path, stop_at: http_viewer(client, recorder, path, stop_at)  # noqa: E731
+        return await run_load(client, viewer, args, lambda: _process_cpu_seconds(pid))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP load test for the dashboard API")
+    parser.add_argument("--pollers", type=int, default=10, help="Simulated polling dashboards")
+    parser.add_argument(
+        "--poll-interval", type=float, default=1.0,
+        help="Seconds between a dashboard's polling rounds (0 = back to back)",
+    )
+    parser.add_argument("--viewers", type=int, default=1, help="Simulated /video-feed viewers")
+    parser.add_argument("--tier", default="high", choices=["auto", "low", "medium", "high"])
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds before measuring")
+    parser.add_argument("--source", default="synthetic", help="CAMERA_SOURCE for the app")
+    parser.add_argument("--inprocess", action="store_true", help="Drive the ASGI app in-process")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["CAMERA_SOURCE"] = args.source
+
+    if args.inprocess:
+        report = asyncio.run(run_inprocess(args))
+    else:
+        port = _free_port()
+        server = start_server(port, dict(os.environ))
+        try:
+            report = asyncio.run(run_server(args, port, server.pid))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    report.update({
+        "mode": "inprocess" if args.inprocess else "uvicorn",
+        "pollers": args.pollers,
+        "poll_interval": args.poll_interval,
+        "source": args.source,
+    })
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Headless throughput benchmark for the processing pipeline.
+
+Feeds a recorded video (or synthetic frames) through processor.process_frame,
+the same recognition / motion / fall / alert stages the live loop runs, as fast
+as possible, and prints a JSON report with frames per second, p50/p95/p99
+latency per stage and peak memory.
+
+Run from the backend folder:
+
+    python -m benchmarks.pipeline --video clips/front_door.mp4 --output bench.json
+    python -m benchmarks.pipeline --synthetic 300 --every-frame
+    python -m benchmarks.pipeline --synthetic 300 --profile low-power
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from frame_sources import DEFAULT_FPS, SyntheticSource, open_source
+
+
+def iter_frames(source, max_frames=None):
+    """Yield (frame, fps) from a frame source until it runs dry."""
+    count = 0
+    while max_frames is None or count < max_frames:
+        frame = source.read()
+        if frame is None:
+            break
+        count += 1
+        yield frame, source.native_fps or DEFAULT_FPS
+
+
+def _percentiles(samples_ms):
+    values = np.array(samples_ms)
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB, or None if it can't be read."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        memory = psutil.Process().memory_info()
+        # peak_wset is the Windows peak working set; elsewhere only the current RSS is known
+        return getattr(memory, "peak_wset", memory.rss) / (1024 * 1024)
+    return None
+
+
+def run(frames, every_frame=False, warmup=5, profile=None):
+    import processor
+    from services.profiles import runtime_settings
+
+    overrides = dict(runtime_settings.overrides)
+    if every_frame:
+        overrides["face_interval"] = 0.0
+        processor.FACE_INTERVAL_PENDING = 0.0
+    if profile or every_frame:
+        runtime_settings.apply_profile(profile or runtime_settings.profile, overrides, persist=False)
+
+    timings = defaultdict(list)
+
+    @contextmanager
+    def timer(stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[stage].append((time.perf_counter() - start) * 1000.0)
+
+    state = processor.new_processor_state()
+    clock = time.time()
+    processed = 0
+    started = None
+
+    for index, (frame, fps) in enumerate(frames):
+        if index == warmup:
+            timings.clear()
+            started = time.perf_counter()
+            processed = 0
+        # Advance a virtual clock at the source frame rate so the time-based
+        # rate limits behave as they would in real time.
+        now = clock + index / fps
+        start = time.perf_counter()
+        if processor.is_valid_frame(frame):
+            processor.process_frame(frame, state, now=now, timer=timer)
+        timings["frame"].append((time.perf_counter() - start) * 1000.0)
+        processed += 1
+
+    if started is None:
+        raise SystemExit(f"Need more than {warmup} frames to benchmark")
+
+    elapsed = time.perf_counter() - started
+    return {
+        "frames": processed,
+        "seconds": elapsed,
+        "fps": processed / elapsed if elapsed > 0 else None,
+        "stages": {stage: _percentiles(values) for stage, values in timings.items() if values},
+        "peak_rss_mb": _peak_rss_mb(),
+        "every_frame": every_frame,
+        "profile": runtime_settings.profile,
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless pipeline throughput benchmark")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument(
+        "--video", help="Recorded video, image directory or stream URL to replay"
+    )
+    inputs.add_argument("--synthetic", type=int, metavar="N", help="Generate N synthetic frames")
+    parser.add_argument("--max-frames", type=int, help="Stop after this many video frames")
+    parser.add_argument("--warmup", type=int, default=5, help="Frames excluded from the stats")
+    parser.add_argument(
+        "--every-frame", action="store_true",
+        help="Run face recognition on every frame instead of the live rate limit",
+    )
+    parser.add_argument("--profile", help="Performance profile to run with (see config.PROFILES)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    # fps=0: read as fast as possible, the pipeline is the bottleneck
+    if args.video:
+        source = open_source(args.video, fps=0)
+    else:
+        source = SyntheticSource(fps=0, count=args.synthetic)
+    frames = iter_frames(source, args.max_frames)
+
+    report = run(frames, every_frame=args.every_frame, warmup=args.warmup, profile=args.profile)
+    report["source"] = args.video or f"synthetic:{args.synthetic}"
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
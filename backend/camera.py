@@ -1,16 +1,19 @@
+import threading
+import time
+
 import cv2
 import numpy as np
+from config import CAMERAS, PRIMARY_CAMERA, IDLE_CAPTURE_WIDTH, IDLE_CAPTURE_HEIGHT, IDLE_FPS
+from frame_sources import open_source
+from services.logger import get_logger
+from services.metrics import observe, stage
+from services.profiles import setting
+from services.readiness import LazyComponent
 
-cap = cv2.VideoCapture(0)
-
-def get_frame():
-    if not cap.isOpened():
-        return None
+log = get_logger("camera")
 
-    ret, frame = cap.read()
-    if not ret or frame is None:
-        return None
 
+def normalize_frame(frame):
     # 🔒 Force uint8
     if frame.dtype != np.uint8:
         frame = np.clip(frame, 0, 255).astype(np.uint8)
@@ -22,6 +25,155 @@ def get_frame():
         frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
 
     # 🔒 Force strict C-contiguous copy for dlib compatibility
-    frame = np.array(frame, dtype=np.uint8, order='C', copy=True)
+    return np.array(frame, dtype=np.uint8, order='C', copy=True)
+
+
+class CameraFeed:
+    """
+    One configured camera: its frame source plus a capture thread that
+    publishes the latest frame. The processor and every stream client read
+    the published frame, so each camera is captured and decoded once.
+    """
+
+    def __init__(self, camera_id, settings):
+        self.camera_id = camera_id
+        self.settings = settings
+        # The primary camera keeps the plain "camera" name in /ready
+        name = "camera" if camera_id == PRIMARY_CAMERA else f"camera:{camera_id}"
+        self.component = LazyComponent(name, self._open)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._timestamp = 0.0
+        self._thread = None
+        self._sized = None  # (source id, (width, height)) last requested
+        self._power_save = False
+        self._wake = threading.Event()
+        self._wake_requested = None
+
+    def _open(self):
+        source = open_source(
+            self.settings.get("source", "0"),
+            fps=self.settings.get("fps"),
+            loop=self.settings.get("loop", False),
+        )
+        if not source.open():
+            raise RuntimeError(f"Could not open camera source {self.settings.get('source')!r}")
+        return source
+
+    @property
+    def source(self):
+        return self.component.get()
+
+    def set_source(self, source):
+        """Swap the frame source (e.g. a recorded file for replay)."""
+        previous = self.component.release()
+        if previous is not None and previous is not source:
+            previous.close()
+        self.component.set(source)
+
+    @stage("get_frame")
+    def read(self):
+        """Read straight from the source, bypassing the capture thread."""
+        try:
+            source = self.source
+        except RuntimeError:
+            return None
+        self._apply_capture_size(source)
+        frame = source.read()
+        if frame is None:
+            return None
+        return normalize_frame(frame)
+
+    def set_power_save(self, enabled):
+        """Capture at the idle resolution and frame rate, or back at full rate."""
+        self._power_save = enabled
+        if not enabled:
+            self._wake_requested = time.monotonic()
+            self._wake.set()
+
+    def _apply_capture_size(self, source):
+        """Request the profile's (or idle) capture resolution when it or the source changes."""
+        if self._power_save:
+            size = (IDLE_CAPTURE_WIDTH, IDLE_CAPTURE_HEIGHT)
+        else:
+            size = (setting("capture_width"), setting("capture_height"))
+        if self._sized != (id(source), size):
+            source.set_resolution(*size)
+            self._sized = (id(source), size)
+            log.info("capture resolution requested", camera=self.camera_id, width=size[0], height=size[1])
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._capture_loop, name=f"capture-{self.camera_id}", daemon=True
+                )
+                self._thread.start()
+
+    def _capture_loop(self):
+        while True:
+            try:
+                frame = self.read()
+            except Exception as e:
+                log.exception("capture error", camera=self.camera_id, error=e)
+                frame = None
+            if frame is None:
+                time.sleep(0.2)
+                continue
+            with self._cond:
+                self._frame = frame
+                self._seq += 1
+                self._timestamp = time.time()
+                self._cond.notify_all()
+
+            if self._wake_requested is not None and not self._power_save:
+                # First full-rate frame after leaving power save
+                observe("power_wake_seconds", time.monotonic() - self._wake_requested, camera=self.camera_id)
+                self._wake_requested = None
+            if self._power_save:
+                # Hold the next read back to IDLE_FPS; a wake-up cuts the wait short
+                self._wake.wait(1.0 / IDLE_FPS)
+                self._wake.clear()
+
+    def wait_frame(self, after_seq=0, timeout=1.0):
+        """
+        Block until a frame newer than ``after_seq`` is published.
+
+        Returns (seq, frame); frame is None on timeout. Published frames are
+        shared between readers and must not be modified in place.
+        """
+        self.start()
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after_seq, timeout)
+            if self._seq > after_seq:
+                return self._seq, self._frame
+            return after_seq, None
+
+    def latest(self):
+        """(seq, timestamp, frame) of the most recent frame without waiting."""
+        with self._cond:
+            return self._seq, self._timestamp, self._frame
+
+
+_feeds = {camera_id: CameraFeed(camera_id, settings) for camera_id, settings in CAMERAS.items()}
+
+
+def get_feed(camera_id=PRIMARY_CAMERA):
+    return _feeds[camera_id]
+
+
+def camera_ids():
+    return list(_feeds)
+
+
+def get_source(camera_id=PRIMARY_CAMERA):
+    return get_feed(camera_id).source
+
+
+def set_source(source, camera_id=PRIMARY_CAMERA):
+    get_feed(camera_id).set_source(source)
+
 
-    return frame
+def get_frame(camera_id=PRIMARY_CAMERA):
+    return get_feed(camera_id).read()
@@ -1,2 +1,201 @@
+import json
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 CAMERA_INDEX = 0
+# Frame source spec for the camera (see frame_sources.open_source): a device
+# index, video file, image directory, "rtsp://..." / "http://..." URL or
+# "synthetic". CAMERA_FPS caps the read rate; 0 replays unthrottled.
+CAMERA_SOURCE = os.getenv("CAMERA_SOURCE", str(CAMERA_INDEX))
+CAMERA_FPS = float(os.environ["CAMERA_FPS"]) if os.getenv("CAMERA_FPS") else None
+CAMERA_LOOP = os.getenv("CAMERA_LOOP", "0") == "1"
 NO_MOVEMENT_TIME = 10  # seconds
+
+# Named motion zones as normalized (x1, y1, x2, y2) rectangles, e.g.
+# {"exit": (0.6, 0.0, 1.0, 1.0)}. Per-zone motion is in the "zones" field of
+# analyze_motion's result; detect_motion only returns the overall flag.
+MOTION_ZONES = {}
+
+# Local OpenCV DNN object detector used for missing-item reminders
+# (e.g. SSD MobileNet frozen graph + pbtxt). Item checks are skipped if absent.
+ITEM_MODEL_PATH = os.getenv(
+    "ITEM_MODEL_PATH", os.path.join(BASE_DIR, "models", "ssd_mobilenet.pb")
+)
+ITEM_MODEL_CONFIG = os.getenv(
+    "ITEM_MODEL_CONFIG", os.path.join(BASE_DIR, "models", "ssd_mobilenet.pbtxt")
+)
+
+# "thread" runs recognition and pose estimation in the processing thread;
+# "process" runs them in a pool of worker processes fed through shared memory.
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+# Largest frame a shared-memory slot can hold (1080p BGR)
+INFERENCE_SLOT_BYTES = 1920 * 1080 * 3
+
+# Cameras by id. Each entry takes "source", "fps", "loop", "priority" (higher
+# is served first when inference workers are busy), optional "zones" and an
+# optional "face_detector" backend.
+# Set CAMERAS to a JSON object to run several, e.g.
+# {"front": {"source": "0"}, "porch": {"source": "rtsp://...", "priority": 2}}
+CAMERAS = json.loads(os.getenv("CAMERAS", "null")) or {
+    "default": {"source": CAMERA_SOURCE, "fps": CAMERA_FPS, "loop": CAMERA_LOOP},
+}
+# Camera behind /current-detection and /video-feed without a camera id
+PRIMARY_CAMERA = next(iter(CAMERAS))
+# MediaPipe models, OpenCV DNN nets and Haar cascades are not thread-safe:
+# each model type (Pose, FaceMesh, the face detector backends other than
+# HOG, the item detector) keeps a pool of up to MODEL_POOL_SIZE instances
+# and every concurrent caller checks out its own.
+MODEL_POOL_SIZE = int(os.getenv("MODEL_POOL_SIZE", "2"))
+# Threads sharing recognition/pose work across all cameras. In thread mode
+# one per camera, up to one per pooled model instance.
+SCHEDULER_WORKERS = int(os.getenv(
+    "SCHEDULER_WORKERS",
+    INFERENCE_WORKERS if INFERENCE_MODE == "process" else min(len(CAMERAS), MODEL_POOL_SIZE),
+))
+
+# Face detector backend: "hog" (dlib), "mediapipe", "haar" or "dnn".
+# A camera's "face_detector" entry in CAMERAS overrides it, e.g.
+# {"porch": {"source": "1", "face_detector": "mediapipe"}}.
+FACE_DETECTOR = os.getenv("FACE_DETECTOR", "hog")
+CAMERA_FACE_DETECTORS = {
+    camera_id: camera["face_detector"]
+    for camera_id, camera in CAMERAS.items() if camera.get("face_detector")
+}
+FACE_DNN_MODEL = os.getenv(
+    "FACE_DNN_MODEL",
+    os.path.join(BASE_DIR, "models", "res10_300x300_ssd_iter_140000.caffemodel"),
+)
+FACE_DNN_CONFIG = os.getenv(
+    "FACE_DNN_CONFIG", os.path.join(BASE_DIR, "models", "deploy.prototxt")
+)
+
+# Alert clips: each camera keeps the last CLIP_PRE_SECONDS of JPEG-encoded
+# frames in memory (capped at CLIP_BUFFER_BYTES); emergency/security alerts
+# save that plus CLIP_POST_SECONDS of what follows to CLIP_DIR.
+CLIP_RECORDING = os.getenv("CLIP_RECORDING", "1") == "1"
+CLIP_DIR = os.getenv("CLIP_DIR", os.path.join(BASE_DIR, "clips"))
+CLIP_ALERT_TYPES = ("emergency", "security")
+CLIP_PRE_SECONDS = float(os.getenv("CLIP_PRE_SECONDS", "10"))
+CLIP_POST_SECONDS = float(os.getenv("CLIP_POST_SECONDS", "5"))
+CLIP_FPS = float(os.getenv("CLIP_FPS", "5"))
+CLIP_WIDTH = 640
+CLIP_JPEG_QUALITY = 70
+CLIP_BUFFER_BYTES = int(os.getenv("CLIP_BUFFER_BYTES", 16 * 1024 * 1024))
+# Retention: oldest clips are deleted beyond either limit
+CLIP_MAX_COUNT = int(os.getenv("CLIP_MAX_COUNT", "100"))
+CLIP_MAX_AGE_DAYS = float(os.getenv("CLIP_MAX_AGE_DAYS", "7"))
+
+# Known-face gallery storage for matching: "float64" (exact, as loaded),
+# "float32", "float16" or "int8" (per-vector scale). Quantized galleries scan
+# the compact copy first and re-rank the best GALLERY_RERANK_K exactly.
+GALLERY_QUANTIZATION = os.getenv("GALLERY_QUANTIZATION", "float64")
+GALLERY_RERANK_K = int(os.getenv("GALLERY_RERANK_K", "8"))
+
+# Face-encoding cache: a detected face whose crop hash is within
+# ENCODING_CACHE_MAX_HAMMING bits of a recent one, at nearly the same box,
+# reuses that encoding instead of running the encoder again. Entries are
+# dropped when their face leaves the box, and a cached known match is
+# re-checked with a fresh encoding after ENCODING_CACHE_VERIFY_EVERY reuses.
+# Entries live two recognition intervals (setting("face_interval")) plus
+# ENCODING_CACHE_TTL_SLACK, so a resident sitting still hits on the next check.
+ENCODING_CACHE_SIZE = int(os.getenv("ENCODING_CACHE_SIZE", "64"))  # entries (~1.2 KB each)
+ENCODING_CACHE_TTL_SLACK = float(os.getenv("ENCODING_CACHE_TTL_SLACK", "2"))  # seconds
+ENCODING_CACHE_MAX_HAMMING = 6   # of 64 hash bits
+ENCODING_CACHE_MIN_IOU = 0.7
+ENCODING_CACHE_VERIFY_EVERY = int(os.getenv("ENCODING_CACHE_VERIFY_EVERY", "3"))
+
+# Sighting index: every recognised face (embedding, name, camera, time) is
+# appended to hourly partitions under SIGHTINGS_DIR for later face search.
+SIGHTINGS_ENABLED = os.getenv("SIGHTINGS_ENABLED", "1") == "1"
+SIGHTINGS_DIR = os.getenv("SIGHTINGS_DIR", os.path.join(BASE_DIR, "sightings"))
+SIGHTING_FLUSH_SECONDS = 10
+SIGHTING_RETENTION_DAYS = float(os.getenv("SIGHTING_RETENTION_DAYS", "30"))
+# Range searched / listed when a request gives no start time
+SIGHTING_DEFAULT_WINDOW_HOURS = float(os.getenv("SIGHTING_DEFAULT_WINDOW_HOURS", "24"))
+
+# Presence timeline: per-camera run-length encoded state (who is present,
+# motion, fall) kept in NumPy chunks of PRESENCE_CHUNK_RUNS runs. Full chunks
+# are compacted every PRESENCE_COMPACT_SECONDS: runs shorter than
+# PRESENCE_MIN_RUN_SECONDS are folded into their neighbours. The oldest
+# chunks are dropped beyond PRESENCE_MAX_CHUNKS per camera.
+PRESENCE_CHUNK_RUNS = 4096
+PRESENCE_MAX_CHUNKS = int(os.getenv("PRESENCE_MAX_CHUNKS", "64"))  # ~90 KB each
+PRESENCE_GAP_SECONDS = 5.0  # no observation for longer closes the current run
+PRESENCE_MIN_RUN_SECONDS = 2.0
+PRESENCE_COMPACT_SECONDS = 60
+
+# Performance profiles: tuning values switched together at runtime (see
+# services/profiles.py). PROFILE is active at startup. SETTINGS_PATH holds
+# {"profile": name, "overrides": {key: value}}; it is written by POST /profile
+# and re-read whenever it changes, so edits apply without a restart.
+PROFILES = {
+    "low-power": {
+        "face_interval": 10.0,          # seconds between face recognitions
+        "match_threshold": 0.45,        # face distance below which a face is known
+        "cooldowns": {"MOTION": 15, "EMERGENCY": 10, "WARNING": 30, "SECURITY": 20},
+        "pose_complexity": 0,           # MediaPipe Pose model_complexity (0-2)
+        "capture_width": 320,
+        "capture_height": 240,
+        "motion_area_fraction": 0.03,   # changed share of the frame that is motion
+        "stream_max_tier": "medium",    # best /video-feed tier served
+        "jpeg_quality": 60,             # /snapshot and alert thumbnails
+    },
+    "balanced": {
+        "face_interval": 5.0,
+        "match_threshold": 0.45,
+        "cooldowns": {"MOTION": 5, "EMERGENCY": 10, "WARNING": 15, "SECURITY": 10},
+        "pose_complexity": 1,
+        "capture_width": 640,
+        "capture_height": 480,
+        "motion_area_fraction": 0.02,
+        "stream_max_tier": "high",
+        "jpeg_quality": 80,
+    },
+    "max-accuracy": {
+        "face_interval": 2.0,
+        "match_threshold": 0.42,
+        "cooldowns": {"MOTION": 5, "EMERGENCY": 10, "WARNING": 15, "SECURITY": 10},
+        "pose_complexity": 2,
+        "capture_width": 1280,
+        "capture_height": 720,
+        "motion_area_fraction": 0.01,
+        "stream_max_tier": "high",
+        "jpeg_quality": 90,
+    },
+}
+PROFILE = os.getenv("PROFILE", "balanced")
+SETTINGS_PATH = os.getenv("SETTINGS_PATH", os.path.join(BASE_DIR, "settings.json"))
+SETTINGS_CHECK_SECONDS = 2  # how often SETTINGS_PATH is checked for changes
+
+# Idle power save: a camera with no motion, nobody in view and no fall in
+# progress for IDLE_AFTER_SECONDS captures at IDLE_CAPTURE_WIDTH x
+# IDLE_CAPTURE_HEIGHT and IDLE_FPS and runs only the motion check. The Pose
+# model is released while every camera is idle. Motion is noticed within
+# 1 / IDLE_FPS seconds and restores full-rate processing.
+POWER_SAVE_ENABLED = os.getenv("POWER_SAVE_ENABLED", "1") == "1"
+IDLE_AFTER_SECONDS = float(os.getenv("IDLE_AFTER_SECONDS", "300"))
+IDLE_CAPTURE_WIDTH = 320
+IDLE_CAPTURE_HEIGHT = 240
+IDLE_FPS = float(os.getenv("IDLE_FPS", "2"))
+
+# Uploads are read in UPLOAD_CHUNK_BYTES pieces and rejected past their cap.
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Enrollment from a short video (POST /enroll-video): the upload is streamed
+# to a temporary file, ENROLL_VIDEO_SAMPLE_FPS frames per second of its first
+# ENROLL_VIDEO_MAX_SECONDS are checked for a face (detected on a copy at most
+# ENROLL_DETECT_MAX_SIDE pixels), and the ENROLL_VIDEO_KEEP sharpest, most
+# varied faces are enrolled.
+ENROLL_VIDEO_MAX_BYTES = int(os.getenv("ENROLL_VIDEO_MAX_BYTES", 50 * 1024 * 1024))
+ENROLL_VIDEO_MAX_SECONDS = 10
+ENROLL_VIDEO_SAMPLE_FPS = 4
+ENROLL_VIDEO_KEEP = 5
+ENROLL_DETECT_MAX_SIDE = 640
+# Photo enrollment (POST /enroll-face, /re-enroll-face): uploads above
+# ENROLL_IMAGE_MAX_BYTES are rejected; large JPEGs are decoded at 1/2, 1/4 or
+# 1/8 scale as long as the longer side stays at least ENROLL_DECODE_MIN_SIDE.
+# Faces are detected on a copy bounded by ENROLL_DETECT_MAX_SIDE and only
+# the face region of the decoded image is encoded.
+ENROLL_IMAGE_MAX_BYTES = int(os.getenv("ENROLL_IMAGE_MAX_BYTES", 15 * 1024 * 1024))
+ENROLL_DECODE_MIN_SIDE = 1600
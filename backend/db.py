@@ -1,9 +1,22 @@
 import json
 import os
+import threading
+
+from services.logger import get_logger
 
 # Use absolute path based on this file's location
 DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.json")
 
+log = get_logger("db")
+
+MAX_ENCODINGS_PER_USER = 10
+
+# Read-side cache, reloaded when the file's mtime changes. Writers keep
+# using load_db()/save_db() on their own copy. A reload builds a new dict and
+# swaps it in whole, so readers always see users and version from one load.
+_cache = {"mtime": None, "users": [], "by_name": {}, "version": 0}
+_cache_lock = threading.Lock()
+
 def load_db():
     if not os.path.exists(DB_FILE):
         return []
@@ -11,8 +24,11 @@ def load_db():
         return json.load(f)
 
 def save_db(data):
-    with open(DB_FILE, "w") as f:
+    # Written aside and renamed, so a concurrent reload never reads half a file
+    tmp_path = DB_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump(data, f, indent=4)
+    os.replace(tmp_path, DB_FILE)
 
 def add_user(user):
     """Add or update user with face encoding - supports multiple encodings per person"""
@@ -31,15 +47,15 @@ def add_user(user):
                 else:
                     u["face_encodings"] = []
             
-            # Add new encoding to the list (max 10 encodings per person)
-            if len(u["face_encodings"]) < 10:
+            # Add new encoding to the list (max MAX_ENCODINGS_PER_USER per person)
+            if len(u["face_encodings"]) < MAX_ENCODINGS_PER_USER:
                 u["face_encodings"].append(new_encoding)
-                print(f"Added encoding #{len(u['face_encodings'])} for user: {user_name}")
+                log.info("encoding added", user=user_name, encodings=len(u["face_encodings"]))
             else:
                 # Replace oldest encoding if at max
                 u["face_encodings"].pop(0)
                 u["face_encodings"].append(new_encoding)
-                print(f"Replaced oldest encoding for user: {user_name} (max 10 reached)")
+                log.info("oldest encoding replaced", user=user_name, encodings=len(u["face_encodings"]))
             
             u["reminders"] = user.get("reminders", u.get("reminders", []))
             save_db(data)
@@ -52,7 +68,33 @@ def add_user(user):
         "reminders": user.get("reminders", [])
     })
     save_db(data)
-    print(f"Added new user: {user_name} with 1 encoding")
+    log.info("user added", user=user_name, encodings=1)
+
+def add_user_encodings(name, encodings):
+    """Add several encodings to a user (created if new) with a single write; returns the user's count"""
+    data = load_db()
+    user_name = name.lower()
+    new_encodings = [e.tolist() if hasattr(e, 'tolist') else e for e in encodings]
+
+    for u in data:
+        if u["name"] == user_name:
+            existing = u.get("face_encodings")
+            if existing is None:
+                existing = [u["face_encoding"]] if "face_encoding" in u else []
+            # Newest encodings win once the per-person limit is reached
+            u["face_encodings"] = (existing + new_encodings)[-MAX_ENCODINGS_PER_USER:]
+            save_db(data)
+            log.info("encodings added", user=user_name, added=len(new_encodings), encodings=len(u["face_encodings"]))
+            return len(u["face_encodings"])
+
+    data.append({
+        "name": user_name,
+        "face_encodings": new_encodings[-MAX_ENCODINGS_PER_USER:],
+        "reminders": []
+    })
+    save_db(data)
+    log.info("user added", user=user_name, encodings=len(data[-1]["face_encodings"]))
+    return len(data[-1]["face_encodings"])
 
 def add_user_embedding(name, embedding):
     """Update user's face encoding"""
@@ -67,21 +109,62 @@ def add_user_embedding(name, embedding):
     
     return False
 
+def _mtime():
+    try:
+        return os.stat(DB_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def _cached():
+    global _cache
+    cache = _cache
+    if _mtime() == cache["mtime"]:
+        return cache
+    with _cache_lock:
+        # Another thread may have reloaded while we waited
+        mtime = _mtime()
+        if mtime != _cache["mtime"]:
+            users = load_db()
+            _cache = {
+                "mtime": mtime,
+                "users": users,
+                "by_name": {u["name"]: u for u in users},
+                "version": _cache["version"] + 1,
+            }
+        return _cache
+
+def users_version():
+    """Changes whenever users.json does."""
+    return _cached()["version"]
+
+def users_snapshot():
+    """Cached list of users and its version, read together."""
+    cache = _cached()
+    return cache["users"], cache["version"]
+
 def get_all_users():
-    return load_db()
+    """Cached list of users; don't modify the returned records."""
+    return _cached()["users"]
 
 def get_user_by_name(name):
+    """Cached user record or None; don't modify it."""
+    return _cached()["by_name"].get(name.lower())
+
+def update_reminders(name, reminders):
     users = load_db()
     for user in users:
         if user["name"] == name.lower():
-            return user
-    return None
+            user["reminders"] = reminders
+            save_db(users)
+            return True
+    return False
 
-def update_reminders(name, reminders):
+def update_timed_reminders(name, reminders):
+    """Replace a user's time-of-day reminders ([{"message", "at": "HH:MM"}])."""
     users = load_db()
     for user in users:
         if user["name"] == name.lower():
-            user["reminders"] = reminders
+            user["timed_reminders"] = reminders
             save_db(users)
             return True
     return False
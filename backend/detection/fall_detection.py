@@ -1,15 +1,45 @@
 import math
 import time
-import mediapipe as mp
+from services.logger import get_logger
+from services.metrics import stage
+from services.model_pool import ModelPool, PoolClosed
+from services.profiles import setting
+from services.readiness import LazyComponent
+
+_pose_complexity = None
+
+
+def _create_pose(complexity):
+    # mediapipe itself is slow to import, so it is only imported when needed
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=complexity,
+        enable_segmentation=False,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+    )
+
+
+def _create_pose_pool():
+    global _pose_complexity
+    _pose_complexity = setting("pose_complexity")
+    complexity = _pose_complexity
+    return ModelPool("pose", lambda: _create_pose(complexity)).warm(1)
+
+
+# Pool of Pose instances, one per concurrent caller
+pose = LazyComponent("pose", _create_pose_pool)
 
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(
-    static_image_mode=False,
-    model_complexity=1,
-    enable_segmentation=False,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5,
-)
+
+def get_pose_pool():
+    """The Pose pool, rebuilt when the profile's model complexity has changed."""
+    if pose.state == "ready" and _pose_complexity != setting("pose_complexity"):
+        log.info("reloading pose model", complexity=setting("pose_complexity"))
+        previous = pose.release()
+        if previous is not None:
+            previous.close()
+    return pose.get()
 
 ANGLE_THRESHOLD_DEGREES = 30
 SITTING_ANGLE_THRESHOLD_DEGREES = 55
@@ -18,11 +48,29 @@ WRIST_HEAD_OFFSET = 0.04
 HEAD_DROP_VELOCITY = 0.06
 MOVEMENT_THRESHOLD = 0.015
 
-fall_detected = False
-fall_start_time = None
-last_movement_time = None
-_previous_centers = None
-_previous_head_level = None
+log = get_logger("fall_detection")
+
+
+class FallTracker:
+    """Fall state machine for one camera."""
+
+    def __init__(self):
+        self.fall_detected = False
+        self.fall_start_time = None
+        self.last_movement_time = None
+        self.previous_centers = None
+        self.previous_head_level = None
+
+
+_trackers = {}
+
+
+def get_fall_tracker(camera_id="default"):
+    tracker = _trackers.get(camera_id)
+    if tracker is None:
+        tracker = FallTracker()
+        _trackers[camera_id] = tracker
+    return tracker
 
 
 def _compute_centers(landmarks):
@@ -53,13 +101,12 @@ def _torso_angle_degrees(shoulder_center, hip_center):
     return angle
 
 
-def _register_movement(shoulder_center, hip_center):
-    global last_movement_time
-    if _previous_centers is None:
+def _register_movement(tracker, shoulder_center, hip_center):
+    if tracker.previous_centers is None:
         return
 
-    shoulder_prev = _previous_centers[0]
-    hip_prev = _previous_centers[1]
+    shoulder_prev = tracker.previous_centers[0]
+    hip_prev = tracker.previous_centers[1]
 
     shoulder_delta = math.hypot(
         shoulder_center[0] - shoulder_prev[0],
@@ -70,27 +117,38 @@ def _register_movement(shoulder_center, hip_center):
         hip_center[1] - hip_prev[1],
     )
 
-    if fall_detected and max(shoulder_delta, hip_delta) > MOVEMENT_THRESHOLD:
-        last_movement_time = time.time()
+    if tracker.fall_detected and max(shoulder_delta, hip_delta) > MOVEMENT_THRESHOLD:
+        tracker.last_movement_time = time.time()
 
 
-def detect_fall(frame):
-    global fall_detected, fall_start_time, last_movement_time, _previous_centers, _previous_head_level
+def analyze_pose(frame, camera_id=None):
+    """
+    Run pose estimation on a BGR frame and summarise the posture.
 
+    Stateless apart from the model, so it can run in an inference worker;
+    returns a small picklable dict, or None when nobody is visible. The
+    model instance is borrowed from the pool, preferring the one that last
+    tracked ``camera_id``.
+    """
     rgb = frame[:, :, ::-1]
-    result = pose.process(rgb)
+    for attempt in range(3):
+        try:
+            with get_pose_pool().checkout(camera_id) as model:
+                result = model.process(rgb)
+            break
+        except PoolClosed:
+            # Released for power save or rebuilt for a new complexity after
+            # we fetched it; the next get_pose_pool() returns the live one
+            if attempt == 2:
+                raise
 
     if not result.pose_landmarks:
-        _previous_centers = None
-        _previous_head_level = None
-        return fall_detected
+        return None
 
     landmarks = result.pose_landmarks.landmark
     shoulder_center, hip_center = _compute_centers(landmarks)
-    angle = _torso_angle_degrees(shoulder_center, hip_center)
     head_y = landmarks[0].y
     hip_y = (landmarks[23].y + landmarks[24].y) * 0.5
-    head_below_hip = head_y - hip_y > HEAD_DROP_OFFSET
 
     left_wrist_y = landmarks[15].y
     right_wrist_y = landmarks[16].y
@@ -99,44 +157,74 @@ def detect_fall(frame):
         or abs(right_wrist_y - head_y) < WRIST_HEAD_OFFSET
     )
 
+    return {
+        "shoulder_center": shoulder_center,
+        "hip_center": hip_center,
+        "angle": _torso_angle_degrees(shoulder_center, hip_center),
+        "head_y": head_y,
+        "head_below_hip": head_y - hip_y > HEAD_DROP_OFFSET,
+        "wrists_near_head": wrists_near_head,
+    }
+
+
+def update_fall_state(posture, camera_id="default"):
+    """Advance a camera's fall state machine with the output of analyze_pose."""
+    tracker = get_fall_tracker(camera_id)
+
+    if posture is None:
+        tracker.previous_centers = None
+        tracker.previous_head_level = None
+        return tracker.fall_detected
+
+    shoulder_center = posture["shoulder_center"]
+    hip_center = posture["hip_center"]
+    angle = posture["angle"]
+    head_y = posture["head_y"]
+
     transient_head_drop = False
-    if _previous_head_level is not None:
-        head_velocity = head_y - _previous_head_level
+    if tracker.previous_head_level is not None:
+        head_velocity = head_y - tracker.previous_head_level
         transient_head_drop = head_velocity > HEAD_DROP_VELOCITY
-    _previous_head_level = head_y
+    tracker.previous_head_level = head_y
 
-    _register_movement(shoulder_center, hip_center)
-    _previous_centers = (shoulder_center, hip_center)
+    _register_movement(tracker, shoulder_center, hip_center)
+    tracker.previous_centers = (shoulder_center, hip_center)
 
     is_fallen_posture = angle < ANGLE_THRESHOLD_DEGREES
     is_faint_posture = (
         not is_fallen_posture
         and angle < SITTING_ANGLE_THRESHOLD_DEGREES
-        and head_below_hip
-        and not wrists_near_head
+        and posture["head_below_hip"]
+        and not posture["wrists_near_head"]
     )
     posture_triggered = is_fallen_posture or is_faint_posture or transient_head_drop
 
-    if posture_triggered and not fall_detected:
-        fall_detected = True
-        fall_start_time = time.time()
-        last_movement_time = fall_start_time
+    if posture_triggered and not tracker.fall_detected:
+        tracker.fall_detected = True
+        tracker.fall_start_time = time.time()
+        tracker.last_movement_time = tracker.fall_start_time
         if is_fallen_posture:
-            print("[fall_detection] Fall posture detected; monitoring movement.")
+            log.info("fall posture detected; monitoring movement", camera=camera_id)
         elif is_faint_posture:
-            print("[fall_detection] Possible faint posture detected; monitoring movement.")
+            log.info("possible faint posture detected; monitoring movement", camera=camera_id)
         else:
-            print("[fall_detection] Rapid head drop detected; monitoring movement.")
-    elif not posture_triggered and fall_detected:
-        fall_detected = False
-        fall_start_time = None
-        last_movement_time = None
-        print("[fall_detection] Posture recovered; reset fall state.")
+            log.info("rapid head drop detected; monitoring movement", camera=camera_id)
+    elif not posture_triggered and tracker.fall_detected:
+        tracker.fall_detected = False
+        tracker.fall_start_time = None
+        tracker.last_movement_time = None
+        log.info("posture recovered; fall state reset", camera=camera_id)
+
+    return tracker.fall_detected
+
 
-    return fall_detected
+@stage("detect_fall")
+def detect_fall(frame, camera_id="default"):
+    return update_fall_state(analyze_pose(frame, camera_id), camera_id)
 
 
-def no_movement(timeout=10):
-    if not fall_detected or last_movement_time is None:
+def no_movement(timeout=10, camera_id="default"):
+    tracker = get_fall_tracker(camera_id)
+    if not tracker.fall_detected or tracker.last_movement_time is None:
         return False
-    return time.time() - last_movement_time > timeout
+    return time.time() - tracker.last_movement_time > timeout
@@ -0,0 +1,118 @@
+# backend/detection/identity_vote.py
+# Time-windowed identity vote over recent recognition results.
+# All thresholds are in seconds, so alert latency does not depend on frame rate.
+
+import time
+from collections import deque
+
+from services.logger import get_logger
+
+# Recognition results older than this no longer vote
+VOTE_WINDOW_SECONDS = 6.0
+# Stranger must hold the vote for this long before an alert fires
+STRANGER_CONFIRM_SECONDS = 2.0
+# ...and be backed by at least this many observations
+MIN_STRANGER_VOTES = 2
+# Hysteresis on the weighted stranger share of the window
+STRANGER_ENTER_SHARE = 0.6
+STRANGER_EXIT_SHARE = 0.3
+# Forget everything (including the alert flag) after this long without a face
+NO_FACE_RESET_SECONDS = 4.0
+# Floor for a single vote so a borderline match still counts a little
+MIN_VOTE_WEIGHT = 0.1
+
+log = get_logger("identity_vote")
+
+
+class IdentityVoter:
+    def __init__(self):
+        self.votes = deque()  # (timestamp, name, weight)
+        self.stranger_active = False
+        self.stranger_since = None
+        self.alerted = False
+        self.last_face_time = None
+
+    def reset(self):
+        self.votes.clear()
+        self.stranger_active = False
+        self.stranger_since = None
+        self.alerted = False
+
+    def observe(self, name, distance=None, now=None):
+        """
+        Record one recognition result.
+
+        ``name`` is a known name, "STRANGER" or None (no face). ``distance`` is
+        the face distance to the closest enrolled encoding; close matches weigh
+        more for known names and far ones weigh more for strangers.
+        """
+        now = time.time() if now is None else now
+
+        if name is None:
+            if self.last_face_time is not None and now - self.last_face_time >= NO_FACE_RESET_SECONDS:
+                if self.alerted:
+                    log.info("face lost long enough; stranger alert re-armed")
+                self.reset()
+                self.last_face_time = None
+            return
+
+        self.last_face_time = now
+        weight = 1.0
+        if distance is not None:
+            weight = distance if name == "STRANGER" else 1.0 - distance
+            weight = min(1.0, max(MIN_VOTE_WEIGHT, weight))
+        self.votes.append((now, name, weight))
+
+    def decide(self, now=None):
+        """
+        Current verdict of the window.
+
+        Returns a dict with ``name`` (known name, "STRANGER" or None),
+        ``stranger_share``, ``pending`` (stranger not yet confirmed) and
+        ``alert`` (True exactly once per confirmed stranger sighting).
+        """
+        now = time.time() if now is None else now
+        while self.votes and now - self.votes[0][0] > VOTE_WINDOW_SECONDS:
+            self.votes.popleft()
+
+        decision = {"name": None, "stranger_share": 0.0, "pending": False, "alert": False}
+        if not self.votes:
+            return decision
+
+        totals = {}
+        stranger_votes = 0
+        first_stranger = None
+        for timestamp, name, weight in self.votes:
+            totals[name] = totals.get(name, 0.0) + weight
+            if name == "STRANGER":
+                stranger_votes += 1
+                if first_stranger is None:
+                    first_stranger = timestamp
+
+        share = totals.get("STRANGER", 0.0) / sum(totals.values())
+        decision["stranger_share"] = share
+
+        if not self.stranger_active and share >= STRANGER_ENTER_SHARE:
+            self.stranger_active = True
+            self.stranger_since = first_stranger
+        elif self.stranger_active and share <= STRANGER_EXIT_SHARE:
+            self.stranger_active = False
+            self.stranger_since = None
+            self.alerted = False
+
+        if self.stranger_active:
+            decision["name"] = "STRANGER"
+            confirmed = (
+                stranger_votes >= MIN_STRANGER_VOTES
+                and now - self.stranger_since >= STRANGER_CONFIRM_SECONDS
+            )
+            if confirmed and not self.alerted:
+                self.alerted = True
+                decision["alert"] = True
+            decision["pending"] = not confirmed
+            return decision
+
+        known = {name: weight for name, weight in totals.items() if name != "STRANGER"}
+        decision["name"] = max(known, key=known.get) if known else "STRANGER"
+        decision["pending"] = not known
+        return decision
@@ -1,4 +1,142 @@
+import os
+import threading
+import time
+import cv2
+from config import CAMERAS, ITEM_MODEL_PATH, ITEM_MODEL_CONFIG, MOTION_ZONES
+from services.logger import get_logger
+from services.model_pool import ModelPool
+
 REQUIRED_ITEMS = ["phone", "wallet", "bag"]
 
-def check_missing_items(detected_items):
-    return [i for i in REQUIRED_ITEMS if i not in detected_items]
+# COCO class ids (TensorFlow SSD numbering) mapped to reminder item names.
+# Wallets are not a COCO class; a custom model can add its own ids here.
+ITEM_CLASS_IDS = {
+    77: "phone",   # cell phone
+    27: "bag",     # backpack
+    31: "bag",     # handbag
+    33: "bag",     # suitcase
+}
+ITEM_CONFIDENCE = 0.4
+ITEM_INPUT_SIZE = (300, 300)
+
+# Detected items are reused for this long per person instead of re-running the net
+ITEM_CACHE_SECONDS = 10
+
+# Motion zone that marks the exit, and how much of it must be active. Item
+# checks only run on cameras that define it (CAMERAS "zones" or MOTION_ZONES).
+EXIT_ZONE = "exit"
+EXIT_ZONE_ACTIVITY = 0.05
+
+log = get_logger("item_detection")
+
+# cv2.dnn nets are not thread-safe: every camera thread checks out its own
+_net_pool = None
+_net_failed = False
+_net_lock = threading.Lock()
+_person_cache = {}
+
+
+def _create_net():
+    if ITEM_MODEL_CONFIG and os.path.exists(ITEM_MODEL_CONFIG):
+        net = cv2.dnn.readNet(ITEM_MODEL_PATH, ITEM_MODEL_CONFIG)
+    else:
+        net = cv2.dnn.readNet(ITEM_MODEL_PATH)
+    net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+    net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+    return net
+
+
+def _get_net_pool():
+    global _net_pool, _net_failed
+    if _net_pool is not None or _net_failed:
+        return _net_pool
+
+    with _net_lock:
+        if _net_pool is not None or _net_failed:
+            return _net_pool
+        if not os.path.exists(ITEM_MODEL_PATH):
+            log.warning("no item model; item checks disabled", path=ITEM_MODEL_PATH)
+            _net_failed = True
+            return None
+
+        pool = ModelPool("item_detector", _create_net)
+        try:
+            _net_pool = pool.warm(1)
+        except cv2.error as e:
+            log.error("failed to load item model", error=e)
+            pool.close()
+            _net_failed = True
+    return _net_pool
+
+
+def detect_items(frame):
+    """
+    Run the object detector on a BGR frame.
+
+    Returns the set of item names seen, or None when no detector is available.
+    """
+    pool = _get_net_pool()
+    if pool is None:
+        return None
+
+    blob = cv2.dnn.blobFromImage(frame, size=ITEM_INPUT_SIZE, swapRB=True, crop=False)
+    with pool.checkout() as net:
+        net.setInput(blob)
+        detections = net.forward()
+
+    items = set()
+    # SSD output shape: [1, 1, N, 7] -> (image_id, class_id, score, x1, y1, x2, y2)
+    for detection in detections.reshape(-1, 7):
+        if detection[2] < ITEM_CONFIDENCE:
+            continue
+        item = ITEM_CLASS_IDS.get(int(detection[1]))
+        if item:
+            items.add(item)
+    return items
+
+
+def get_person_items(name, frame):
+    """Detected items for a person, cached for ITEM_CACHE_SECONDS."""
+    now = time.time()
+    cached = _person_cache.get(name)
+    if cached and now - cached[0] < ITEM_CACHE_SECONDS:
+        return cached[1]
+
+    items = detect_items(frame)
+    _person_cache[name] = (now, items)
+    return items
+
+
+def is_at_exit(motion):
+    """True when the exit zone is active. Cameras without an exit zone never count."""
+    return motion["zones"].get(EXIT_ZONE, 0.0) >= EXIT_ZONE_ACTIVITY
+
+
+def check_exit_zones(camera_ids):
+    """Log at startup when no camera has an exit zone, since item reminders then never fire."""
+    with_exit = [
+        camera_id for camera_id in camera_ids
+        if EXIT_ZONE in CAMERAS.get(camera_id, {}).get("zones", MOTION_ZONES)
+    ]
+    if not with_exit:
+        log.warning("no exit zone configured; missing-item reminders disabled", zone=EXIT_ZONE)
+    return with_exit
+
+
+def check_missing_items(detected_items, required_items=None):
+    if required_items is None:
+        required_items = REQUIRED_ITEMS
+    detected = {item.lower() for item in detected_items}
+    return [i for i in required_items if i.lower() not in detected]
+
+
+def get_missing_reminders(name, frame, reminders):
+    """
+    Reminder items the person is not carrying.
+
+    Falls back to every reminder when no detector is available.
+    """
+    items = get_person_items(name, frame)
+    if items is None:
+        return list(reminders)
+    return check_missing_items(items, reminders)
@@ -1,28 +1,149 @@
 import cv2
-from detection.state import current_detection
+import numpy as np
+from config import CAMERAS, MOTION_ZONES
+from detection.state import get_detection
+from services.metrics import stage
+from services.profiles import setting
 
-prev_frame = None
+# Motion is evaluated on a small grey copy of the frame, so the cost no longer
+# grows with camera resolution.
+DOWNSCALE_WIDTH = 160
+BLUR_KERNEL = (5, 5)
+# Running-average weight of each new frame in the background model. Slow
+# lighting changes are absorbed into the background instead of firing alerts.
+BACKGROUND_ALPHA = 0.05
+PIXEL_DIFF_THRESHOLD = 25
+# The fraction of the (downscaled) frame that must change to count as motion
+# is the profile's setting("motion_area_fraction").
+# Ignore blobs smaller than this fraction of the frame when reporting regions.
+MIN_REGION_FRACTION = 0.002
+# Frames used to seed the background model before motion is reported.
+WARMUP_FRAMES = 5
 
-def detect_motion(frame):
-    global prev_frame
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (21, 21), 0)
+_detectors = {}
 
-    if prev_frame is None:
-        prev_frame = gray
-        return False
 
-    diff = cv2.absdiff(prev_frame, gray)
-    prev_frame = gray
+class MotionDetector:
+    """Per-camera running-average background model."""
 
-    _, thresh = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
-    motion_pixels = cv2.countNonZero(thresh)
+    def __init__(self, zones=None):
+        self.zones = dict(zones or {})
+        self.background = None
+        self.frames_seen = 0
+        self.input_size = None
+        self._zone_masks = {}
 
-    if motion_pixels > 5000:
+    def reset(self):
+        self.background = None
+        self.frames_seen = 0
+        self.input_size = None
+        self._zone_masks = {}
+
+    def _prepare(self, frame):
+        height, width = frame.shape[:2]
+        scale = DOWNSCALE_WIDTH / float(width)
+        small = cv2.resize(
+            frame,
+            (DOWNSCALE_WIDTH, max(1, int(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, BLUR_KERNEL, 0)
+
+    def _zone_mask(self, name, shape):
+        mask = self._zone_masks.get(name)
+        if mask is None or mask.shape != shape:
+            x1, y1, x2, y2 = self.zones[name]
+            h, w = shape
+            mask = np.zeros(shape, dtype=np.uint8)
+            mask[int(y1 * h):int(y2 * h), int(x1 * w):int(x2 * w)] = 255
+            self._zone_masks[name] = mask
+        return mask
+
+    def analyze(self, frame):
+        """
+        Update the background model with a BGR frame and report motion.
+
+        Returns a dict with ``motion`` (bool), ``score`` (changed fraction of the
+        frame, 0-1), ``regions`` (normalized ``(x1, y1, x2, y2)`` boxes) and
+        ``zones`` (changed fraction per configured zone).
+        """
+        gray = self._prepare(frame)
+        result = {
+            "motion": False,
+            "score": 0.0,
+            "regions": [],
+            "zones": {name: 0.0 for name in self.zones},
+        }
+
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            self.frames_seen = 1
+            self.input_size = frame.shape[:2]
+            return result
+        if frame.shape[:2] != self.input_size:
+            # Same scene at a new capture resolution (profile or power-save
+            # switch): resampling alone would read as motion, so rebase
+            self.background = gray.astype(np.float32)
+            self.input_size = frame.shape[:2]
+            return result
+
+        background = cv2.convertScaleAbs(self.background)
+        diff = cv2.absdiff(background, gray)
+        cv2.accumulateWeighted(gray, self.background, BACKGROUND_ALPHA)
+        self.frames_seen += 1
+        if self.frames_seen <= WARMUP_FRAMES:
+            return result
+
+        _, thresh = cv2.threshold(diff, PIXEL_DIFF_THRESHOLD, 255, cv2.THRESH_BINARY)
+        thresh = cv2.dilate(thresh, None, iterations=2)
+
+        total = float(thresh.size)
+        score = cv2.countNonZero(thresh) / total
+        result["score"] = score
+        result["motion"] = score >= setting("motion_area_fraction")
+
+        for name in self.zones:
+            mask = self._zone_mask(name, thresh.shape)
+            changed = cv2.countNonZero(cv2.bitwise_and(thresh, mask))
+            result["zones"][name] = changed / float(max(1, cv2.countNonZero(mask)))
+
+        if result["motion"]:
+            h, w = thresh.shape
+            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            min_area = MIN_REGION_FRACTION * total
+            for contour in contours:
+                if cv2.contourArea(contour) < min_area:
+                    continue
+                x, y, bw, bh = cv2.boundingRect(contour)
+                result["regions"].append((x / w, y / h, (x + bw) / w, (y + bh) / h))
+
+        return result
+
+
+def get_motion_detector(camera_id="default"):
+    detector = _detectors.get(camera_id)
+    if detector is None:
+        zones = CAMERAS.get(camera_id, {}).get("zones", MOTION_ZONES)
+        detector = MotionDetector(zones)
+        _detectors[camera_id] = detector
+    return detector
+
+
+@stage("detect_motion")
+def analyze_motion(frame, camera_id="default", update_state=True):
+    result = get_motion_detector(camera_id).analyze(frame)
+
+    if result["motion"] and update_state:
         # 🔥 UPDATE SHARED STATE
+        current_detection = get_detection(camera_id)
         current_detection["type"] = "motion"
         current_detection["name"] = "Motion Detected"
         current_detection["isKnown"] = False
-        return True
 
-    return False
+    return result
+
+
+def detect_motion(frame, camera_id="default"):
+    return analyze_motion(frame, camera_id)["motion"]
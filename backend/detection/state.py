@@ -1,22 +1,37 @@
 # backend/detection/state.py
 # Single source of truth for current detection state
 
-current_detection = {
-    "type": None,        # motion / face / fall
-    "name": None,        # person name or "Unknown"
-    "isKnown": False,    # true / false
-    "confidence": None   # optional
-}
-
-# Tracking state for unknown user persistence
-detection_tracking = {
-    "unknown_frames": 0,           # Count of consecutive unknown frames
-    "no_face_frames": 0,           # Count of frames with no face detected
-    "known_user_present": False,   # Whether a known user was recently detected
-    "last_stranger_alert": False   # Whether we already sent a stranger alert
-}
-
-# Threshold: ~0.5 second at 30 FPS so alerts trigger faster
-UNKNOWN_THRESHOLD = 15
-# Reset unknown counter if no face for ~2 seconds
-NO_FACE_RESET_THRESHOLD = 60
+from config import CAMERAS, PRIMARY_CAMERA
+from detection.identity_vote import IdentityVoter
+
+# Per-camera detection state
+camera_states = {}
+
+
+def get_camera_state(camera_id=PRIMARY_CAMERA):
+    state = camera_states.get(camera_id)
+    if state is None:
+        state = {
+            "detection": {
+                "type": None,        # motion / face / fall
+                "name": None,        # person name or "Unknown"
+                "isKnown": False,    # true / false
+                "confidence": None   # optional
+            },
+            # Time-windowed identity vote for this camera
+            "identity_votes": IdentityVoter(),
+        }
+        camera_states[camera_id] = state
+    return state
+
+
+def get_detection(camera_id=PRIMARY_CAMERA):
+    return get_camera_state(camera_id)["detection"]
+
+
+for _camera_id in CAMERAS:
+    get_camera_state(_camera_id)
+
+# Primary camera's state, for callers that predate multi-camera support
+current_detection = get_detection(PRIMARY_CAMERA)
+identity_votes = get_camera_state(PRIMARY_CAMERA)["identity_votes"]
@@ -0,0 +1,263 @@
+# backend/frame_sources.py
+# Pluggable frame sources: camera device, video file, network stream,
+# image directory and synthetic generator.
+#
+# Every source paces itself with its own ``fps``:
+#   fps=None -> natural rate (live devices/streams as delivered, files at
+#               their recorded frame rate, generated sources at 30 FPS)
+#   fps=0    -> unthrottled, as fast as frames can be read (offline replay)
+#   fps=N    -> at most N frames per second
+
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+from services.logger import get_logger
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+STREAM_PREFIXES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://")
+DEFAULT_FPS = 30.0
+
+log = get_logger("frame_sources")
+RECONNECT_DELAY = 2.0  # seconds
+
+
+class FrameSource:
+    # Frame rate the content was captured at, used when fps=None
+    native_fps = None
+
+    def __init__(self, fps=None):
+        self.fps = fps
+        self._next_due = 0.0
+        self._lock = threading.Lock()
+
+    def _interval(self):
+        fps = self.native_fps if self.fps is None else self.fps
+        return 1.0 / fps if fps else 0.0
+
+    def _throttle(self):
+        interval = self._interval()
+        if not interval:
+            return
+        now = time.monotonic()
+        if self._next_due > now:
+            time.sleep(self._next_due - now)
+            now = self._next_due
+        # Don't bank time after a stall; never burst to catch up
+        self._next_due = max(self._next_due + interval, now)
+
+    def read(self):
+        """Next BGR frame, or None if none is available right now."""
+        # Serialised: several consumers may share one capture handle
+        with self._lock:
+            self._throttle()
+            return self._read()
+
+    def _read(self):
+        raise NotImplementedError
+
+    def open(self):
+        """Acquire the underlying device/file; True if it is usable."""
+        return True
+
+    def set_resolution(self, width, height):
+        """Best-effort capture resolution change; ignored by sources that can't."""
+
+    def close(self):
+        pass
+
+    def describe(self):
+        return {"type": type(self).__name__, "fps": self.fps}
+
+
+class CaptureSource(FrameSource):
+    """Anything cv2.VideoCapture can open."""
+
+    def __init__(self, target, fps=None):
+        super().__init__(fps)
+        self.target = target
+        self._capture = None
+
+    def _open(self):
+        if self._capture is None or not self._capture.isOpened():
+            self._capture = cv2.VideoCapture(self.target)
+            if not self._capture.isOpened():
+                log.error("could not open frame source", target=self.target)
+                self._capture = None
+        return self._capture
+
+    def open(self):
+        with self._lock:
+            return self._open() is not None
+
+    def _read(self):
+        capture = self._open()
+        if capture is None:
+            return None
+        ok, frame = capture.read()
+        if not ok or frame is None:
+            return self._on_read_failure()
+        return frame
+
+    def _on_read_failure(self):
+        return None
+
+    def set_resolution(self, width, height):
+        capture = self._open()
+        if capture is not None:
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def close(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def describe(self):
+        info = super().describe()
+        info["target"] = str(self.target)
+        return info
+
+
+class DeviceSource(CaptureSource):
+    """Local camera by index; the device paces itself when fps is None."""
+
+    def __init__(self, index=0, fps=None):
+        super().__init__(int(index), fps)
+
+
+class VideoFileSource(CaptureSource):
+    def __init__(self, path, fps=None, loop=False):
+        super().__init__(path, fps)
+        self.loop = loop
+
+    def _open(self):
+        capture = super()._open()
+        if capture is not None and self.native_fps is None:
+            self.native_fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        return capture
+
+    def _on_read_failure(self):
+        if not self.loop or self._capture is None:
+            return None
+        self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        ok, frame = self._capture.read()
+        return frame if ok else None
+
+
+class StreamSource(CaptureSource):
+    """RTSP/HTTP stream; reconnects after a read failure."""
+
+    def __init__(self, url, fps=None):
+        super().__init__(url, fps)
+        self._retry_at = 0.0
+
+    def _open(self):
+        if self._capture is None and time.monotonic() < self._retry_at:
+            return None
+        capture = super()._open()
+        if capture is None:
+            self._retry_at = time.monotonic() + RECONNECT_DELAY
+        return capture
+
+    def _on_read_failure(self):
+        log.warning("stream dropped; reconnecting", target=self.target)
+        self.close()
+        self._retry_at = time.monotonic() + RECONNECT_DELAY
+        return None
+
+
+class ImageDirSource(FrameSource):
+    native_fps = DEFAULT_FPS
+
+    def __init__(self, directory, fps=None, loop=True):
+        super().__init__(fps)
+        self.directory = directory
+        self.loop = loop
+        self._files = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._index = 0
+
+    def _read(self):
+        if not self._files:
+            return None
+        if self._index >= len(self._files):
+            if not self.loop:
+                return None
+            self._index = 0
+        path = self._files[self._index]
+        self._index += 1
+        return cv2.imread(path, cv2.IMREAD_COLOR)
+
+    def describe(self):
+        info = super().describe()
+        info["target"] = self.directory
+        info["images"] = len(self._files)
+        return info
+
+
+class SyntheticSource(FrameSource):
+    """Noisy background with a moving block; enough to exercise motion detection."""
+
+    native_fps = DEFAULT_FPS
+
+    def __init__(self, width=640, height=480, fps=None, count=None, seed=0):
+        super().__init__(fps)
+        self.width = width
+        self.height = height
+        self.count = count
+        rng = np.random.default_rng(seed)
+        self._background = rng.integers(90, 110, size=(height, width, 3), dtype=np.uint8)
+        self._index = 0
+
+    def set_resolution(self, width, height):
+        if (width, height) != (self.width, self.height):
+            self._background = cv2.resize(self._background, (width, height))
+            self.width, self.height = width, height
+
+    def _read(self):
+        if self.count is not None and self._index >= self.count:
+            return None
+        i = self._index
+        self._index += 1
+        frame = self._background.copy()
+        block = max(20, self.height // 6)
+        x = int((i * 7) % max(1, self.width - block))
+        y = int(self.height / 2 + (self.height / 4) * np.sin(i / 15.0)) - block // 2
+        frame[y:y + block, x:x + block] = 230
+        return frame
+
+    def describe(self):
+        info = super().describe()
+        info["target"] = f"synthetic:{self.width}x{self.height}"
+        return info
+
+
+def open_source(spec, fps=None, loop=False):
+    """
+    Build a frame source from a spec string:
+
+        "0", "1"                   camera device index
+        "rtsp://...", "http://..." network stream
+        "synthetic[:WxH]"          generated frames
+        a directory                images in name order
+        anything else              video file
+    """
+    spec = str(spec).strip()
+    if spec.isdigit():
+        return DeviceSource(int(spec), fps=fps)
+    if spec.lower().startswith(STREAM_PREFIXES):
+        return StreamSource(spec, fps=fps)
+    if spec.startswith("synthetic"):
+        width, height = 640, 480
+        if ":" in spec:
+            width, height = (int(v) for v in spec.split(":", 1)[1].lower().split("x"))
+        return SyntheticSource(width, height, fps=fps)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, fps=fps, loop=loop)
+    return VideoFileSource(spec, fps=fps, loop=loop)
@@ -1,6 +1,8 @@
 import os
 
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware  
 from api.dashboard import router as dashboard_router
 from api.video import router as video_router
@@ -8,10 +10,26 @@ from api.enroll import router as enroll_router
 from api.reminders import router as reminders_router
 from api.re_enroll import router as re_enroll_router
 from api.delete_user import router as delete_user_router
+from api.metrics import router as metrics_router
+from api.clips import router as clips_router
+from api.sightings import router as sightings_router
+from api.presence import router as presence_router
+from api.profile import router as profile_router
 import threading
 from processor import start_processing
-from services.alert_store import alerts  # Import shared store directly
-from services.alert_service import clear_alerts, create_alert
+from services.alert_service import add_alert_listener, clear_alerts, create_alert
+from services.metrics import METRICS_ENABLED, inc, observe
+from services.logger import shutdown as shutdown_logging
+from services.readiness import warm_up
+from services.inference_pool import inference_pool, shutdown as shutdown_inference
+from camera import camera_ids, get_feed
+from config import CLIP_RECORDING, ENROLL_IMAGE_MAX_BYTES, ENROLL_VIDEO_MAX_BYTES, SIGHTINGS_ENABLED
+from api.upload_utils import UploadLimitMiddleware
+from services.clips import start_clip_recording
+from services.snapshots import capture_alert_thumbnail
+from detection.item_detection import check_exit_zones
+from services.sightings import sighting_index
+from services.presence import presence_timeline
 
 
 def get_allowed_origins():
@@ -28,11 +46,20 @@ def get_allowed_origins():
 
     return list(dict.fromkeys(default_origins))
 
-# Debug: Print store ID to verify same instance
-print(f"🔗 main.py loaded - ALERT STORE ID: {id(alerts)}")
-
 app = FastAPI(title="Smart Reminder & Surveillance System")
 
+# Oversized uploads are refused before their body is received (added first
+# so CORS headers still wrap the 413)
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/enroll-face": ENROLL_IMAGE_MAX_BYTES,
+        "/re-enroll-face": ENROLL_IMAGE_MAX_BYTES,
+        "/sightings/search": ENROLL_IMAGE_MAX_BYTES,
+        "/enroll-video": ENROLL_VIDEO_MAX_BYTES,
+    },
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=get_allowed_origins(),
@@ -48,16 +75,58 @@ app.include_router(enroll_router)
 app.include_router(reminders_router)
 app.include_router(re_enroll_router)
 app.include_router(delete_user_router)
+app.include_router(metrics_router)
+app.include_router(clips_router)
+app.include_router(sightings_router)
+app.include_router(presence_router)
+app.include_router(profile_router)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if not METRICS_ENABLED:
+        return await call_next(request)
+
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, to keep label cardinality bounded
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    observe("http_request_seconds", time.perf_counter() - start, method=request.method, path=path)
+    inc("http_requests_total", method=request.method, path=path, status=response.status_code)
+    return response
 
 @app.on_event("startup")
 def startup():
     # Clear old alerts on startup
     clear_alerts()
-    print("✓ Alerts cleared on startup")
+
+    # Models and the cameras load in the background so /health answers at once
+    cameras = [get_feed(camera_id).component.name for camera_id in camera_ids()]
+    if inference_pool is not None:
+        # Models load inside the worker processes
+        warm_up(cameras + ["inference_pool"])
+    else:
+        warm_up(cameras + ["face_recognition", "face_detector", "pose"])
     
+    check_exit_zones(camera_ids())
+    add_alert_listener(capture_alert_thumbnail)
+    if CLIP_RECORDING:
+        start_clip_recording(camera_ids())
+    if SIGHTINGS_ENABLED:
+        sighting_index.start()
+    presence_timeline.start()
+
     thread = threading.Thread(target=start_processing, daemon=True)
     thread.start()
 
+@app.on_event("shutdown")
+def shutdown():
+    shutdown_inference()
+    if SIGHTINGS_ENABLED:
+        sighting_index.flush()
+    shutdown_logging()
+
 @app.get("/")
 def root():
     return {"status": "System Running"}
@@ -1,211 +1,280 @@
+import threading
 import time
+from contextlib import nullcontext
+
 import numpy as np
 
-from camera import get_frame
-from detection.motion_detection import detect_motion
-from detection.fall_detection import detect_fall, no_movement
-from detection.state import (
-    current_detection,
-    detection_tracking,
-    UNKNOWN_THRESHOLD,
-    NO_FACE_RESET_THRESHOLD,
-)
-from services.alert_store import alerts  # Import shared store for debug
+from camera import get_feed, camera_ids
+from config import CAMERAS, PRIMARY_CAMERA, SIGHTINGS_ENABLED, POWER_SAVE_ENABLED
+from detection.motion_detection import analyze_motion
+from detection.fall_detection import update_fall_state, no_movement, get_fall_tracker
+from detection.state import get_camera_state
 from services.alert_service import create_alert, clear_stranger_alerts
-from recognition.face_recognition import identify_person
-from db import get_user_by_name
-
-# Debug: Print store ID to verify same instance
-print(f"🔗 processor.py loaded - ALERT STORE ID: {id(alerts)}")
+from services.scheduler import scheduler
+from services.reminder_scheduler import reminder_scheduler
+from services.sightings import sighting_index
+from services.presence import presence_timeline
+from services.power import power_manager, IDLE
+from services.logger import get_logger
+from services.metrics import inc, stage
+from services.profiles import setting
 
+log = get_logger("processor")
 
-# ---------------- ALERT COOLDOWNS ---------------- #
-COOLDOWNS = {
-    "MOTION": 5,
-    "REMINDER": 30,
-    "EMERGENCY": 10,
-    "WARNING": 15,
-    "SECURITY": 10
-}
 
 KNOWN_PERSISTENCE_SECONDS = 12
 
+# The normal recognition interval and the alert cooldowns come from the
+# active profile: setting("face_interval"), setting("cooldowns").
+# Recognise faster while a stranger vote is still undecided
+FACE_INTERVAL_PENDING = 1.0  # seconds
+
 last_alert_time = {}
 
 
-def can_trigger(alert_type):
+def can_trigger(alert_type, camera_id=PRIMARY_CAMERA):
     now = time.time()
-    last_time = last_alert_time.get(alert_type, 0)
-    if now - last_time >= COOLDOWNS[alert_type]:
-        last_alert_time[alert_type] = now
+    key = (camera_id, alert_type)
+    last_time = last_alert_time.get(key, 0)
+    if now - last_time >= setting("cooldowns")[alert_type]:
+        last_alert_time[key] = now
         return True
     return False
 
 
 # ---------------- AI PROCESSOR ---------------- #
-def start_processing():
-    print("🧠 AI Processor started")
+def _no_timer(stage):
+    return nullcontext()
 
-    last_face_check = 0
-    cached_person = None
-    FACE_INTERVAL = 5  # seconds
-    last_known_identity = {"name": None, "timestamp": 0.0, "ghost_active": False}
 
-    while True:
-        try:
-            # ---------------- GET FRAME ---------------- #
-            frame = get_frame()
-            if frame is None:
-                time.sleep(0.2)
-                continue
+def new_processor_state(camera_id=PRIMARY_CAMERA):
+    return {
+        "camera_id": camera_id,
+        "priority": CAMERAS.get(camera_id, {}).get("priority", 1.0),
+        "activity": 0.0,
+        "last_face_check": 0.0,
+        "cached_person": None,
+        "face_interval": setting("face_interval"),
+        "last_known_identity": {"name": None, "timestamp": 0.0, "ghost_active": False},
+    }
 
-            # ---------------- HARD FRAME VALIDATION ---------------- #
-            if (
-                not isinstance(frame, np.ndarray)
-                or frame.dtype != np.uint8
-                or len(frame.shape) != 3
-                or frame.shape[2] != 3
-            ):
-                print(
-                    "⚠️ Invalid frame skipped:",
-                    type(frame),
-                    getattr(frame, "dtype", None),
-                    getattr(frame, "shape", None)
-                )
-                time.sleep(0.5)
-                continue
 
-            now = time.time()
-
-            # ---------------- FACE RECOGNITION (RATE LIMITED) ---------------- #
-            if now - last_face_check >= FACE_INTERVAL:
-                cached_person = identify_person(frame)
-                last_face_check = now
-
-            person = cached_person
-            ghost_known = False
-
-            # ---------------- NO FACE ---------------- #
-            if person is None:
-                if (
-                    last_known_identity["name"]
-                    and (now - last_known_identity["timestamp"] <= KNOWN_PERSISTENCE_SECONDS)
-                ):
-                    person = last_known_identity["name"]
-                    ghost_known = True
-                    if not last_known_identity["ghost_active"]:
-                        print(
-                            f"👤 Processor: Continuing with last known identity {person} despite low visibility."
-                        )
-                    last_known_identity["ghost_active"] = True
-                else:
-                    current_detection["type"] = None
-                    current_detection["name"] = None
-                    current_detection["isKnown"] = False
-                    detection_tracking["no_face_frames"] += 1
-                    detection_tracking["known_user_present"] = False
-                    if detection_tracking["no_face_frames"] >= NO_FACE_RESET_THRESHOLD:
-                        if detection_tracking["last_stranger_alert"]:
-                            print(
-                                "🚪 Processor: Face lost long enough; resetting stranger alert flag."
-                            )
-                        detection_tracking["unknown_frames"] = 0
-                        detection_tracking["last_stranger_alert"] = False
-                        detection_tracking["no_face_frames"] = 0
-                    last_known_identity["name"] = None
-                    last_known_identity["timestamp"] = 0.0
-                    last_known_identity["ghost_active"] = False
-                    # Don't reset unknown_frames immediately - allow for brief detection gaps
-                    time.sleep(0.5)
-                    continue
-
-            # ---------------- STRANGER ---------------- #
-            if person == "STRANGER":
-                # 🔥 UPDATE DETECTION STATE
-                current_detection["type"] = "face"
-                current_detection["name"] = "Unknown"
-                current_detection["isKnown"] = False
-                
-                # Increment unknown frames counter on EVERY loop iteration (not just recognition)
-                detection_tracking["unknown_frames"] += 1
-                detection_tracking["no_face_frames"] = 0
-                detection_tracking["known_user_present"] = False
-                last_known_identity["name"] = None
-                last_known_identity["timestamp"] = 0.0
-                last_known_identity["ghost_active"] = False
-                
-                # Debug: Log every 5 increments
-                if detection_tracking["unknown_frames"] % 5 == 0:
-                    print(f"🔍 Processor: Unknown frames = {detection_tracking['unknown_frames']}/{UNKNOWN_THRESHOLD}")
-                
-                # Only create alert after threshold and not already alerted
-                if detection_tracking["unknown_frames"] >= UNKNOWN_THRESHOLD:
-                    if detection_tracking["last_stranger_alert"]:
-                        if detection_tracking["unknown_frames"] == UNKNOWN_THRESHOLD:
-                            print(
-                                "🚫 Processor: Stranger alert suppressed (flag still True from previous sighting)."
-                            )
-                    else:
-                        print(
-                            f"🚨 Processor: Stranger threshold reached ({detection_tracking['unknown_frames']} frames)"
-                        )
-                        create_alert(
-                            "security",
-                            "Stranger detected near entrance"
-                        )
-                        detection_tracking["last_stranger_alert"] = True
-                time.sleep(0.1)  # Faster loop for quicker detection
-                continue
+def is_valid_frame(frame):
+    return (
+        isinstance(frame, np.ndarray)
+        and frame.dtype == np.uint8
+        and len(frame.shape) == 3
+        and frame.shape[2] == 3
+    )
 
-            # ---------------- KNOWN USER ---------------- #
-            # Transition to known user - DO NOT clear alerts, let them persist
-            if not detection_tracking["known_user_present"]:
-                print(f"✅ Processor: Known user detected: {person}")
-            detection_tracking["unknown_frames"] = 0
-            detection_tracking["known_user_present"] = True
-            detection_tracking["last_stranger_alert"] = False
-            detection_tracking["no_face_frames"] = 0
-            
-            # 🔥 UPDATE DETECTION STATE
-            current_detection["type"] = "face"
-            current_detection["name"] = person
-            current_detection["isKnown"] = True
-            last_known_identity["name"] = person
-            if not ghost_known:
-                last_known_identity["timestamp"] = time.time()
-                last_known_identity["ghost_active"] = False
-            
-            user = get_user_by_name(person)
-
-            if detect_motion(frame) and can_trigger("MOTION"):
-                create_alert(
-                    "motion",
-                    f"Movement detected by {person}"
-                )
 
-            fall_now = detect_fall(frame)
-            if fall_now and can_trigger("EMERGENCY"):
-                create_alert(
-                    "emergency",
-                    f"🚨 {person} may have fallen"
-                )
+def process_frame(frame, state, now=None, timer=None):
+    """
+    Run one frame through recognition, motion, fall and alert stages.
+
+    ``timer(stage)`` returns a context manager wrapped around each stage, so
+    callers such as the benchmark harness can time them. Returns the delay the
+    live loop should sleep before the next frame.
+    """
+    timer = timer or _no_timer
+    now = time.time() if now is None else now
+    last_known_identity = state["last_known_identity"]
+    camera_id = state["camera_id"]
+    camera_state = get_camera_state(camera_id)
+    current_detection = camera_state["detection"]
+    identity_votes = camera_state["identity_votes"]
+    inc("frames_processed_total", camera=camera_id)
+
+    # ---------------- MOTION (every frame, cheap) ---------------- #
+    # The motion score doubles as this camera's activity for the scheduler
+    with timer("motion"):
+        motion = analyze_motion(frame, camera_id, update_state=False)
+    state["activity"] = motion["score"]
+
+    # ---------------- POWER SAVE ---------------- #
+    # An idle camera runs only the motion check until something moves
+    if POWER_SAVE_ENABLED:
+        busy = (
+            motion["motion"]
+            or state["cached_person"] is not None
+            or last_known_identity["name"] is not None
+            or get_fall_tracker(camera_id).fall_detected
+        )
+        mode = power_manager.update(camera_id, busy, now)
+        if mode == IDLE:
+            state["power_mode"] = mode
+            presence_timeline.observe(camera_id, now, None, False, False)
+            return 0.0  # the idle feed paces the loop
+        if state.get("power_mode") == IDLE:
+            # Just woken: recognise on this frame instead of waiting out the interval
+            state["power_mode"] = mode
+            state["last_face_check"] = 0.0
+
+    # ---------------- FACE RECOGNITION (RATE LIMITED) ---------------- #
+    if now - state["last_face_check"] >= state["face_interval"]:
+        with timer("recognition"):
+            recognition = scheduler.run(
+                camera_id, frame, ("recognition",), state["priority"], state["activity"]
+            )["recognition"]
+        cached_person, distance = recognition["name"], recognition["distance"]
+        if SIGHTINGS_ENABLED and recognition.get("encoding") is not None:
+            sighting_index.record(camera_id, now, recognition["encoding"], cached_person, distance)
+        identity_votes.observe(cached_person, distance, now)
+        state["cached_person"] = cached_person
+        state["distance"] = distance
+        state["last_face_check"] = now
+
+    vote = identity_votes.decide(now)
+    state["face_interval"] = FACE_INTERVAL_PENDING if vote["pending"] else setting("face_interval")
+
+    person = vote["name"] if state["cached_person"] is not None else None
+    ghost_known = False
+
+    # ---------------- NO FACE ---------------- #
+    if person is None:
+        if (
+            last_known_identity["name"]
+            and (now - last_known_identity["timestamp"] <= KNOWN_PERSISTENCE_SECONDS)
+        ):
+            person = last_known_identity["name"]
+            ghost_known = True
+            if not last_known_identity["ghost_active"]:
+                log.info("continuing with last known identity", person=person, camera=camera_id)
+            last_known_identity["ghost_active"] = True
+        else:
+            current_detection["type"] = None
+            current_detection["name"] = None
+            current_detection["isKnown"] = False
+            last_known_identity["name"] = None
+            last_known_identity["timestamp"] = 0.0
+            last_known_identity["ghost_active"] = False
+            presence_timeline.observe(camera_id, now, None, motion["motion"], False)
+            return 0.5
 
-            if no_movement() and can_trigger("WARNING"):
+    # ---------------- STRANGER ---------------- #
+    if person == "STRANGER":
+        # 🔥 UPDATE DETECTION STATE
+        current_detection["type"] = "face"
+        current_detection["name"] = "Unknown"
+        current_detection["isKnown"] = False
+
+        last_known_identity["name"] = None
+        last_known_identity["timestamp"] = 0.0
+        last_known_identity["ghost_active"] = False
+        presence_timeline.observe(camera_id, now, person, motion["motion"], False)
+
+        # Alert fires once the stranger has held the vote for STRANGER_CONFIRM_SECONDS
+        if vote["alert"]:
+            log.warning(
+                "stranger confirmed", share=round(vote["stranger_share"], 2), camera=camera_id
+            )
+            with timer("alert"):
                 create_alert(
                     "security",
-                    f"⚠️ No movement detected for {person}"
+                    "Stranger detected near entrance",
+                    camera_id=camera_id,
                 )
+        return 0.1  # Faster loop for quicker detection
+
+    # ---------------- KNOWN USER ---------------- #
+    # Transition to known user - DO NOT clear alerts, let them persist
+    if last_known_identity["name"] != person:
+        log.info("known user detected", person=person, camera=camera_id)
+
+    # 🔥 UPDATE DETECTION STATE
+    current_detection["type"] = "face"
+    current_detection["name"] = person
+    current_detection["isKnown"] = True
+    distance = state.get("distance")
+    current_detection["confidence"] = 1.0 - distance if distance is not None else None
+    last_known_identity["name"] = person
+    if not ghost_known:
+        last_known_identity["timestamp"] = now
+        last_known_identity["ghost_active"] = False
 
-            # ---------------- REMINDERS ---------------- #
-            if user and user.get("reminders") and can_trigger("REMINDER"):
-                items = ", ".join(user["reminders"])
+    if motion["motion"]:
+        # 🔥 UPDATE SHARED STATE
+        current_detection["type"] = "motion"
+        current_detection["name"] = "Motion Detected"
+        current_detection["isKnown"] = False
+        if can_trigger("MOTION", camera_id):
+            with timer("alert"):
                 create_alert(
-                    "reminder",
-                    f"{person.capitalize()}, don't forget your {items}"
+                    "motion",
+                    f"Movement detected by {person}",
+                    camera_id=camera_id,
+                )
+
+    with timer("fall"), stage("detect_fall"):
+        posture = scheduler.run(
+            camera_id, frame, ("pose",), state["priority"], state["activity"]
+        )["pose"]
+        fall_now = update_fall_state(posture, camera_id)
+    presence_timeline.observe(camera_id, now, person, motion["motion"], fall_now)
+    if fall_now and can_trigger("EMERGENCY", camera_id):
+        with timer("alert"):
+            create_alert(
+                "emergency",
+                f"🚨 {person} may have fallen",
+                camera_id=camera_id,
+            )
+
+    if no_movement(camera_id=camera_id) and can_trigger("WARNING", camera_id):
+        with timer("alert"):
+            create_alert(
+                "security",
+                f"⚠️ No movement detected for {person}",
+                camera_id=camera_id,
+            )
+
+    # ---------------- REMINDERS ---------------- #
+    # Per-user exit and time-of-day reminders for the person in view
+    with timer("reminders"):
+        reminder_scheduler.observe(person, camera_id, frame, motion, now)
+
+    return 0.5
+
+
+def run_camera(camera_id):
+    feed = get_feed(camera_id)
+    state = new_processor_state(camera_id)
+    seq = 0
+
+    while True:
+        try:
+            # ---------------- GET FRAME ---------------- #
+            # Latest frame from the camera's capture thread; stale ones are skipped
+            seq, frame = feed.wait_frame(seq)
+            if frame is None:
+                continue
+
+            # ---------------- HARD FRAME VALIDATION ---------------- #
+            if not is_valid_frame(frame):
+                log.warning(
+                    "invalid frame skipped",
+                    camera=camera_id,
+                    type=type(frame).__name__,
+                    dtype=getattr(frame, "dtype", None),
+                    shape=getattr(frame, "shape", None),
                 )
+                time.sleep(0.5)
+                continue
 
-            time.sleep(0.5)
+            time.sleep(process_frame(frame, state))
 
         except Exception as e:
-            print("❌ AI Processor error:", e)
+            log.exception("processor error", camera=camera_id, error=e)
             time.sleep(1)
+
+
+def start_processing():
+    log.info("processor started", cameras=",".join(camera_ids()))
+
+    threads = [
+        threading.Thread(target=run_camera, args=(camera_id,), name=f"processor-{camera_id}", daemon=True)
+        for camera_id in camera_ids()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
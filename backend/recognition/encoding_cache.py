@@ -0,0 +1,168 @@
+# backend/recognition/encoding_cache.py
+# LRU cache of face encodings keyed on a cheap descriptor of the face crop.
+#
+# The descriptor is a 64-bit difference hash (dHash) of the grey, 9x8
+# downsampled crop plus the face box. A lookup hits when an entry from the
+# same camera has a hash within ENCODING_CACHE_MAX_HAMMING bits and a box
+# overlapping by at least ENCODING_CACHE_MIN_IOU, i.e. someone sitting
+# still. Hits reuse the stored encoding and, while the gallery is unchanged,
+# the stored match. In process mode each worker keeps its own cache.
+#
+# So that nobody can inherit a resident's identity by stepping into their
+# spot, entries live at most two recognition intervals plus
+# ENCODING_CACHE_TTL_SLACK seconds (long enough to survive until the next
+# check at the active profile's face_interval), a camera's entries
+# are dropped as soon as its face is gone from their box, and the caller
+# re-checks a cached known match with a fresh encoding every
+# ENCODING_CACHE_VERIFY_EVERY reuses (see needs_check).
+
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from config import (
+    ENCODING_CACHE_SIZE, ENCODING_CACHE_TTL_SLACK, ENCODING_CACHE_MAX_HAMMING,
+    ENCODING_CACHE_MIN_IOU, ENCODING_CACHE_VERIFY_EVERY,
+)
+from services.metrics import inc
+from services.profiles import setting
+
+
+def crop_hash(rgb, location):
+    """64-bit dHash of a (top, right, bottom, left) face crop, or None if empty."""
+    top, right, bottom, left = location
+    crop = rgb[max(0, top):bottom, max(0, left):right]
+    if crop.size == 0:
+        return None
+    grey = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(grey, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def _iou(a, b):
+    # (top, right, bottom, left)
+    inter_h = min(a[2], b[2]) - max(a[0], b[0])
+    inter_w = min(a[1], b[1]) - max(a[3], b[3])
+    if inter_h <= 0 or inter_w <= 0:
+        return 0.0
+    inter = inter_h * inter_w
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return inter / float(area_a + area_b - inter)
+
+
+class _Entry:
+    __slots__ = ("key", "camera_id", "hash", "location", "encoding", "created", "gallery", "match", "uses")
+
+    def __init__(self, key, camera_id, hash_value, location, encoding, created):
+        self.key = key
+        self.camera_id = camera_id
+        self.hash = hash_value
+        self.location = location
+        self.encoding = encoding
+        self.created = created
+        self.gallery = None
+        self.match = None
+        self.uses = 0  # hits since the encoding was computed
+
+    def needs_check(self, threshold):
+        """True when a cached known match has been reused enough to be re-encoded."""
+        if self.match is None or self.match[1] is None or self.match[1] >= threshold:
+            return False
+        return self.uses > ENCODING_CACHE_VERIFY_EVERY
+
+
+class EncodingCache:
+    def __init__(self, size=ENCODING_CACHE_SIZE, ttl=None):
+        """``ttl`` in seconds; None follows the active profile's face_interval."""
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> _Entry, least recently used first
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def current_ttl(self):
+        if self.ttl is not None:
+            return self.ttl
+        return 2 * setting("face_interval") + ENCODING_CACHE_TTL_SLACK
+
+    def lookup(self, camera_id, rgb, location, now=None):
+        """
+        Returns (entry, hash). ``entry`` is a cached _Entry on a hit, else
+        None; pass ``hash`` to store() after encoding on a miss.
+        """
+        now = time.time() if now is None else now
+        hash_value = crop_hash(rgb, location)
+        if hash_value is None or self.size <= 0:
+            return None, hash_value
+
+        ttl = self.current_ttl()
+        with self._lock:
+            best_key, best_bits = None, ENCODING_CACHE_MAX_HAMMING + 1
+            for key, entry in list(self._entries.items()):
+                if now - entry.created > ttl:
+                    del self._entries[key]
+                    continue
+                if entry.camera_id != camera_id:
+                    continue
+                if _iou(entry.location, location) < ENCODING_CACHE_MIN_IOU:
+                    # The face this entry tracked has left its box
+                    del self._entries[key]
+                    continue
+                bits = (entry.hash ^ hash_value).bit_count()
+                if bits < best_bits:
+                    best_key, best_bits = key, bits
+
+            if best_key is None:
+                self.misses += 1
+                inc("encoding_cache_misses_total")
+                return None, hash_value
+
+            self._entries.move_to_end(best_key)
+            entry = self._entries[best_key]
+            entry.uses += 1
+            self.hits += 1
+        inc("encoding_cache_hits_total")
+        return entry, hash_value
+
+    def store(self, camera_id, hash_value, location, encoding, now=None):
+        if hash_value is None or self.size <= 0:
+            return None
+        with self._lock:
+            entry = _Entry(self._next_key, camera_id, hash_value, tuple(location), encoding,
+                           time.time() if now is None else now)
+            self._entries[entry.key] = entry
+            self._next_key += 1
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def discard(self, entry):
+        with self._lock:
+            self._entries.pop(entry.key, None)
+
+    def forget(self, camera_id):
+        """Drop a camera's entries, e.g. when no face is in view any more."""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.camera_id == camera_id]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "ttl": self.current_ttl(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else None,
+            }
+
+
+encoding_cache = EncodingCache()
@@ -1,37 +1,67 @@
-import json
 import numpy as np
 import os
+from db import DB_FILE, users_snapshot, users_version
+from services.logger import get_logger
 
-# Use absolute path based on backend folder
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "users.json")
+log = get_logger("face_db")
 
-def load_known_faces():
-    """Load enrolled faces from database - supports multiple encodings per person"""
-    try:
-        with open(DB_PATH, "r") as f:
-            users = json.load(f)
-    except FileNotFoundError:
-        print(f"Database {DB_PATH} not found. No known faces loaded.")
-        return [], []
 
+def _user_encodings(user):
+    # Support both old format (face_encoding) and new format (face_encodings)
+    if user.get("face_encodings"):
+        return user["face_encodings"]
+    if user.get("face_encoding"):
+        return [user["face_encoding"]]
+    return []
+
+
+class KnownFaceSource:
+    """
+    Exact encodings of gallery rows, read back from the shared user cache
+    (db.users_snapshot) instead of a second copy. Returns None once
+    users.json has changed, until the gallery is rebuilt.
+    """
+
+    def __init__(self, version, users, positions):
+        self.version = version
+        self._users = users
+        # Row -> (user index, encoding index)
+        self._positions = np.array(positions, dtype=np.int32).reshape(-1, 2)
+
+    def __call__(self, rows):
+        if users_version() != self.version:
+            return None
+        return np.array(
+            [_user_encodings(self._users[u])[j] for u, j in self._positions[rows]], dtype=np.float64
+        )
+
+    def nbytes(self):
+        return self._positions.nbytes
+
+
+def load_known_faces(with_source=False):
+    """
+    Load enrolled faces from the database - supports multiple encodings per
+    person. With ``with_source`` also returns a KnownFaceSource for them.
+    """
+    if not os.path.exists(DB_FILE):
+        log.warning("user database not found; no known faces loaded", path=DB_FILE)
+
+    users, version = users_snapshot()
     names = []
     encodings = []
+    positions = []
 
-    for u in users:
-        name = u.get("name")
+    for u, user in enumerate(users):
+        name = user.get("name")
         if not name:
             continue
-            
-        # Support both old format (face_encoding) and new format (face_encodings)
-        if "face_encodings" in u and u["face_encodings"]:
-            # New format: multiple encodings per person
-            for enc in u["face_encodings"]:
-                names.append(name)
-                encodings.append(np.array(enc, dtype=np.float64))
-        elif "face_encoding" in u and u["face_encoding"]:
-            # Old format: single encoding
+        for j, enc in enumerate(_user_encodings(user)):
             names.append(name)
-            encodings.append(np.array(u["face_encoding"], dtype=np.float64))
+            encodings.append(np.array(enc, dtype=np.float64))
+            positions.append((u, j))
 
-    print(f"Loaded {len(encodings)} face encodings for {len(set(names))} users")
+    log.info("known faces loaded", encodings=len(encodings), users=len(set(names)))
+    if with_source:
+        return names, encodings, KnownFaceSource(version, users, positions)
     return names, encodings
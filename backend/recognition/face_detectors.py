@@ -0,0 +1,222 @@
+# backend/recognition/face_detectors.py
+# Interchangeable face detector backends.
+# Every backend takes an RGB uint8 image and returns face_recognition-style
+# (top, right, bottom, left) boxes, so the result can be passed straight to
+# face_recognition.face_encodings. Backends whose models are not thread-safe
+# are shared through a ModelPool, one instance per concurrent caller.
+
+import os
+import threading
+import cv2
+import numpy as np
+from config import FACE_DETECTOR, CAMERA_FACE_DETECTORS, FACE_DNN_MODEL, FACE_DNN_CONFIG
+from recognition.face_lib import face_lib
+from services.model_pool import ModelPool
+from services.readiness import LazyComponent
+
+
+def _clip_box(top, right, bottom, left, height, width):
+    return (
+        max(0, int(top)),
+        min(width, int(right)),
+        min(height, int(bottom)),
+        max(0, int(left)),
+    )
+
+
+def crop_face(rgb, box, margin=0.25):
+    """
+    The face at ``box`` plus ``margin`` (a fraction of the face size) of
+    context on each side, and the box in crop coordinates.
+    """
+    top, right, bottom, left = box
+    height, width = rgb.shape[:2]
+    margin_y, margin_x = int((bottom - top) * margin), int((right - left) * margin)
+    y0, y1 = max(0, top - margin_y), min(height, bottom + margin_y)
+    x0, x1 = max(0, left - margin_x), min(width, right + margin_x)
+    crop = np.ascontiguousarray(rgb[y0:y1, x0:x1])
+    return crop, (top - y0, right - x0, bottom - y0, left - x0)
+
+
+class FaceDetector:
+    name = "base"
+    # False when one instance must not run detect() from two threads at once
+    thread_safe = True
+
+    def detect(self, rgb):
+        raise NotImplementedError
+
+
+class HogFaceDetector(FaceDetector):
+    """dlib HOG detector through face_recognition (the original behaviour)."""
+
+    name = "hog"
+
+    def __init__(self, upsample=1):
+        self.upsample = upsample
+
+    def detect(self, rgb):
+        return face_lib.get().face_locations(
+            rgb, number_of_times_to_upsample=self.upsample, model="hog"
+        )
+
+
+class MediaPipeFaceDetector(FaceDetector):
+    name = "mediapipe"
+    thread_safe = False
+
+    def __init__(self, min_confidence=0.5, model_selection=0):
+        from mediapipe import solutions
+        self._detector = solutions.face_detection.FaceDetection(
+            model_selection=model_selection,
+            min_detection_confidence=min_confidence,
+        )
+
+    def detect(self, rgb):
+        height, width = rgb.shape[:2]
+        result = self._detector.process(rgb)
+        boxes = []
+        for detection in result.detections or []:
+            box = detection.location_data.relative_bounding_box
+            left = box.xmin * width
+            top = box.ymin * height
+            boxes.append(_clip_box(
+                top, left + box.width * width, top + box.height * height, left,
+                height, width,
+            ))
+        return boxes
+
+
+class HaarFaceDetector(FaceDetector):
+    name = "haar"
+    thread_safe = False
+
+    def __init__(self, scale_factor=1.1, min_neighbors=5, min_size=(40, 40)):
+        path = os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        self._cascade = cv2.CascadeClassifier(path)
+        if self._cascade.empty():
+            raise RuntimeError(f"Could not load Haar cascade from {path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def detect(self, rgb):
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        faces = self._cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=self.min_size,
+        )
+        return [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in faces]
+
+
+class DnnFaceDetector(FaceDetector):
+    """OpenCV DNN SSD face detector (e.g. res10_300x300 Caffe model)."""
+
+    name = "dnn"
+    thread_safe = False
+
+    def __init__(self, min_confidence=0.5, input_size=(300, 300)):
+        if not os.path.exists(FACE_DNN_MODEL):
+            raise RuntimeError(f"No face DNN model at {FACE_DNN_MODEL}")
+        self._net = cv2.dnn.readNet(FACE_DNN_MODEL, FACE_DNN_CONFIG)
+        self.min_confidence = min_confidence
+        self.input_size = input_size
+
+    def detect(self, rgb):
+        height, width = rgb.shape[:2]
+        # The res10 model was trained on BGR input with these channel means
+        bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+        blob = cv2.dnn.blobFromImage(
+            bgr, 1.0, self.input_size, (104.0, 177.0, 123.0), swapRB=False
+        )
+        self._net.setInput(blob)
+        detections = self._net.forward().reshape(-1, 7)
+        boxes = []
+        for detection in detections:
+            if detection[2] < self.min_confidence:
+                continue
+            left, top, right, bottom = detection[3:7] * [width, height, width, height]
+            boxes.append(_clip_box(top, right, bottom, left, height, width))
+        return boxes
+
+
+DETECTOR_BACKENDS = {
+    HogFaceDetector.name: HogFaceDetector,
+    MediaPipeFaceDetector.name: MediaPipeFaceDetector,
+    HaarFaceDetector.name: HaarFaceDetector,
+    DnnFaceDetector.name: DnnFaceDetector,
+}
+
+class PooledFaceDetector(FaceDetector):
+    """A non-thread-safe backend with one instance per concurrent caller."""
+
+    def __init__(self, backend):
+        self.name = backend
+        self.pool = ModelPool(f"face_detector_{backend}", lambda: create_face_detector(backend))
+        try:
+            self.pool.warm(1)
+        except Exception:
+            self.pool.close()
+            raise
+
+    def detect(self, rgb):
+        with self.pool.checkout() as detector:
+            return detector.detect(rgb)
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def create_face_detector(backend):
+    if backend not in DETECTOR_BACKENDS:
+        raise ValueError(
+            f"Unknown face detector '{backend}'. Choose from: {', '.join(DETECTOR_BACKENDS)}"
+        )
+    return DETECTOR_BACKENDS[backend]()
+
+
+def get_face_detector(camera_id="default"):
+    """Shared detector for a camera, per CAMERA_FACE_DETECTORS / FACE_DETECTOR."""
+    backend = CAMERA_FACE_DETECTORS.get(camera_id, FACE_DETECTOR)
+    detector = _instances.get(backend)
+    if detector is None:
+        with _instances_lock:
+            detector = _instances.get(backend)
+            if detector is None:
+                if backend in DETECTOR_BACKENDS and not DETECTOR_BACKENDS[backend].thread_safe:
+                    detector = PooledFaceDetector(backend)
+                else:
+                    detector = create_face_detector(backend)
+                _instances[backend] = detector
+    return detector
+
+
+# Default camera's detector, so /ready can report (and warm_up preload) it
+default_face_detector = LazyComponent("face_detector", get_face_detector)
+
+
+def detect_faces(rgb, camera_id="default"):
+    return get_face_detector(camera_id).detect(rgb)
+
+
+def detect_faces_bounded(rgb, max_side, camera_id="default"):
+    """
+    detect_faces on a copy whose longer side is at most ``max_side`` pixels.
+    Boxes are scaled back to ``rgb`` coordinates, so the encoder can still
+    work on the full-resolution face.
+    """
+    height, width = rgb.shape[:2]
+    scale = max_side / float(max(height, width))
+    if scale >= 1.0:
+        return detect_faces(rgb, camera_id)
+    small = cv2.resize(
+        rgb, (max(1, round(width * scale)), max(1, round(height * scale))),
+        interpolation=cv2.INTER_AREA,
+    )
+    return [
+        _clip_box(top / scale, right / scale, bottom / scale, left / scale, height, width)
+        for top, right, bottom, left in detect_faces(small, camera_id)
+    ]
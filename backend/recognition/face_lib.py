@@ -0,0 +1,25 @@
+# backend/recognition/face_lib.py
+# The face_recognition package loads its dlib models at import time, so it is
+# imported on first use through a lazy component instead of at module import.
+
+import threading
+
+from services.readiness import LazyComponent
+
+
+def _load_face_recognition():
+    import face_recognition
+    return face_recognition
+
+
+face_lib = LazyComponent("face_recognition", _load_face_recognition)
+
+# dlib's face encoder network reuses its buffers between calls, so encodes
+# from several inference threads or requests take turns
+_encode_lock = threading.Lock()
+
+
+def face_encodings(rgb, locations):
+    """face_recognition.face_encodings, serialized across threads."""
+    with _encode_lock:
+        return face_lib.get().face_encodings(rgb, locations)
@@ -1,13 +1,19 @@
 import time
 import cv2
-import face_recognition
 import numpy as np
+from db import users_version
 from recognition.face_db import load_known_faces
+from recognition.face_lib import face_encodings
+from recognition.face_detectors import detect_faces
+from recognition.gallery import FaceGallery
+from recognition.encoding_cache import encoding_cache
+from services.metrics import stage
+from services.profiles import setting
 
 
 _cache = {
-    "names": [],
-    "encodings": [],
+    "gallery": FaceGallery([], []),
+    "version": None,  # users_version() the gallery was built from
     "timestamp": 0.0,
     "reload_interval": 5.0
 }
@@ -15,30 +21,36 @@ _cache = {
 
 def _get_known_faces():
     now = time.time()
-    if (
-        not _cache["names"]
-        or now - _cache["timestamp"] > _cache["reload_interval"]
-    ):
-        try:
-            names, encodings = load_known_faces()
-            _cache["names"] = names
-            _cache["encodings"] = encodings
-            _cache["timestamp"] = now
-        except Exception:
-            pass
-    return _cache["names"], _cache["encodings"]
-
-
-def identify_person(frame):
+    if now - _cache["timestamp"] > _cache["reload_interval"]:
+        _cache["timestamp"] = now
+        # Rebuilt only when users.json has changed since the last build
+        if users_version() != _cache["version"]:
+            try:
+                names, encodings, source = load_known_faces(with_source=True)
+                _cache["gallery"] = FaceGallery(names, encodings, source=source)
+                _cache["version"] = source.version
+            except Exception:
+                pass
+    return _cache["gallery"]
+
+
+NO_FACE = {"name": None, "distance": None, "encoding": None}
+
+
+def recognize_face(frame, camera_id="default"):
+    """
+    Returns {"name", "distance", "encoding"}; name is a known name,
+    "STRANGER" or None (no face), encoding the face's 128-d vector.
+    """
     if frame is None:
-        return None
+        return NO_FACE
 
-    known_names, known_encodings = _get_known_faces()
-    if not known_names or len(known_encodings) == 0:
-        return None
+    gallery = _get_known_faces()
+    if not len(gallery):
+        return NO_FACE
 
     if not isinstance(frame, np.ndarray) or frame.ndim != 3:
-        return None
+        return NO_FACE
 
     if frame.dtype != np.uint8:
         frame = frame.astype(np.uint8)
@@ -47,20 +59,49 @@ def identify_person(frame):
     # Force a fresh copy to guarantee strict C-contiguous memory layout for dlib
     rgb = np.array(rgb, dtype=np.uint8, order='C', copy=True)
 
-    face_locations = face_recognition.face_locations(rgb)
+    with stage("face_detect"):
+        face_locations = detect_faces(rgb, camera_id)
     if not face_locations:
-        return None
+        encoding_cache.forget(camera_id)
+        return NO_FACE
+
+    # Only the first face is identified; a near-identical crop at the same
+    # spot reuses its cached encoding (and match, if the gallery is unchanged)
+    location = face_locations[0]
+    threshold = setting("match_threshold")
+    entry, crop_hash = encoding_cache.lookup(camera_id, rgb, location)
+    if entry is not None and entry.needs_check(threshold):
+        # A known identity is never served from the cache for long
+        encoding_cache.discard(entry)
+        entry = None
+    if entry is None:
+        with stage("face_encode"):
+            encodings = face_encodings(rgb, [location])
+        if not encodings:
+            return NO_FACE
+        entry = encoding_cache.store(camera_id, crop_hash, location, encodings[0])
+        encoding = encodings[0]
+    else:
+        encoding = entry.encoding
+
+    if entry is not None and entry.gallery is gallery:
+        name, distance = entry.match
+    else:
+        with stage("face_match"):
+            name, distance = gallery.best(encoding)
+        if entry is not None:
+            entry.gallery, entry.match = gallery, (name, distance)
+
+    if distance >= threshold:
+        name = "STRANGER"
+    return {"name": name, "distance": distance, "encoding": encoding}
 
-    encodings = face_recognition.face_encodings(rgb, face_locations)
-    if not encodings:
-        return None
 
-    distances = face_recognition.face_distance(known_encodings, encodings[0])
-    idx = np.argmin(distances)
-    distance = distances[idx]
+def recognize_person(frame, camera_id="default"):
+    """Returns (name, distance); name is a known name, "STRANGER" or None."""
+    result = recognize_face(frame, camera_id)
+    return result["name"], result["distance"]
 
-    MATCH_THRESHOLD = 0.45
-    if distance < MATCH_THRESHOLD:
-        return known_names[idx]
 
-    return "STRANGER"
+def identify_person(frame, camera_id="default"):
+    return recognize_person(frame, camera_id)[0]
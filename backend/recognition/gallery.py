@@ -0,0 +1,159 @@
+# backend/recognition/gallery.py
+# Known-face encodings as one matrix, optionally quantized.
+#
+# "float64" keeps the encodings exactly as loaded and computes plain L2
+# distances (same as face_recognition.face_distance). The other modes keep
+# only a compact scan matrix: float32, float16, or int8 with one scale per
+# vector (max |value| / 127). The first pass scans it for approximate
+# distances, widening one cache-sized block at a time, then the closest
+# ``rerank_k`` candidates are re-ranked against the source encodings, so
+# reported distances stay exact. The source is a callable
+# returning the exact encodings of given rows, e.g. from the user cache that
+# is in memory anyway; without one the gallery keeps the encodings it was
+# built from.
+
+import cv2
+import numpy as np
+from config import GALLERY_QUANTIZATION, GALLERY_RERANK_K
+
+GALLERY_MODES = ("float64", "float32", "float16", "int8")
+# Rows quantized / widened at a time; small enough for the float32 copy of
+# a block to stay in cache during the scan
+SCAN_CHUNK = 1024
+
+
+def _float16_to_float32(chunk):
+    # OpenCV converts with F16C instructions; numpy's astype is several times slower
+    return cv2.convertFp16(chunk) if hasattr(cv2, "convertFp16") else chunk.astype(np.float32)
+
+
+def _int8_to_float32(chunk):
+    return chunk.astype(np.float32)
+
+
+class _HeldEncodings:
+    """Default re-rank source: the encodings the gallery was built from."""
+
+    def __init__(self, encodings):
+        self.encodings = encodings
+
+    def __call__(self, rows):
+        return np.array([self.encodings[i] for i in rows], dtype=np.float64)
+
+    def nbytes(self):
+        if isinstance(self.encodings, np.ndarray):
+            return self.encodings.nbytes
+        return sum(np.asarray(e).nbytes for e in self.encodings)
+
+
+class FaceGallery:
+    def __init__(self, names, encodings, mode=GALLERY_QUANTIZATION, rerank_k=GALLERY_RERANK_K, source=None):
+        """
+        ``source(rows)`` returns the exact encodings of the given row indices,
+        or None if they are no longer available (searches then report the
+        approximate distances).
+        """
+        if mode not in GALLERY_MODES:
+            raise ValueError(f"Unknown gallery mode '{mode}'. Choose from {GALLERY_MODES}")
+        self.names = list(names)
+        self.mode = mode
+        self.rerank_k = rerank_k
+        count = len(self.names)
+        dims = len(encodings[0]) if count else 0
+
+        self._scale = None
+        self._source = None
+        if mode == "float64":
+            self._scan = np.asarray(encodings, dtype=np.float64).reshape(count, dims)
+            return
+
+        # Built a chunk at a time so no full-precision copy is ever held
+        self._scan = np.empty((count, dims), dtype=np.int8 if mode == "int8" else np.dtype(mode))
+        self._sq_norms = np.empty(count, dtype=np.float32)
+        if mode == "int8":
+            self._scale = np.empty(count, dtype=np.float32)
+        for start in range(0, count, SCAN_CHUNK):
+            rows = slice(start, start + SCAN_CHUNK)
+            chunk = np.asarray(encodings[rows], dtype=np.float32)
+            # |v|^2 of the exact rows, for |q - v|^2 = |q|^2 - 2 q.v + |v|^2
+            self._sq_norms[rows] = np.einsum("ij,ij->i", chunk, chunk)
+            if mode == "int8":
+                scale = np.abs(chunk).max(axis=1, initial=0.0) / 127.0
+                scale[scale == 0] = 1.0
+                self._scan[rows] = np.round(chunk / scale[:, None])
+                self._scale[rows] = scale
+            else:
+                self._scan[rows] = chunk
+
+        if mode == "float32":
+            self._source = lambda rows: self._scan[rows]
+        elif source is not None:
+            self._source = source
+        else:
+            self._source = _HeldEncodings(encodings)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _approximate_sq_distances(self, query):
+        if self.mode == "float32":
+            dots = self._scan @ query
+        else:
+            # Cache-sized blocks widened to float32 just for the product;
+            # int8 rows are scaled after the dot, one multiply per row
+            convert = _float16_to_float32 if self.mode == "float16" else _int8_to_float32
+            dots = np.empty(len(self), dtype=np.float32)
+            for start in range(0, len(self), SCAN_CHUNK):
+                rows = slice(start, start + SCAN_CHUNK)
+                np.dot(convert(self._scan[rows]), query, out=dots[rows])
+            if self._scale is not None:
+                dots *= self._scale
+        return self._sq_norms - 2.0 * dots + float(query @ query)
+
+    def search(self, query, k=1):
+        """The ``k`` closest encodings as [(index, distance)], nearest first."""
+        if not len(self):
+            return []
+        k = min(k, len(self))
+
+        if self.mode == "float64":
+            distances = np.linalg.norm(self._scan - np.asarray(query, dtype=np.float64), axis=1)
+            order = np.argsort(distances)[:k]
+            return [(int(i), float(distances[i])) for i in order]
+
+        exact_query = np.asarray(query, dtype=np.float64)
+        query = exact_query.astype(np.float32)
+        shortlist = min(len(self), max(k, self.rerank_k))
+        approximate = self._approximate_sq_distances(query)
+        candidates = np.argpartition(approximate, shortlist - 1)[:shortlist]
+        exact = self._source(candidates)
+        if exact is None:
+            distances = np.sqrt(np.maximum(approximate[candidates], 0.0))
+        else:
+            distances = np.linalg.norm(np.asarray(exact, dtype=np.float64) - exact_query, axis=1)
+        order = np.argsort(distances)[:k]
+        return [(int(candidates[i]), float(distances[i])) for i in order]
+
+    def best(self, query):
+        """(name, distance) of the nearest encoding, or (None, None) if empty."""
+        results = self.search(query, 1)
+        if not results:
+            return None, None
+        index, distance = results[0]
+        return self.names[index], distance
+
+    def nbytes(self):
+        """Memory held by the gallery, including encodings it keeps for re-ranking."""
+        total = self._scan.nbytes
+        if self.mode != "float64":
+            total += self._sq_norms.nbytes
+        if self._scale is not None:
+            total += self._scale.nbytes
+        source_nbytes = getattr(self._source, "nbytes", None)
+        if callable(source_nbytes):
+            total += source_nbytes()
+        return total
+
+    def scan_nbytes(self):
+        """Memory of the matrix scanned on every query."""
+        return self._scan.nbytes
@@ -1,51 +1,59 @@
 import cv2
-import face_recognition
 import numpy as np
+from db import users_version
 from recognition.face_db import load_known_faces
+from recognition.face_lib import face_encodings
+from recognition.face_detectors import detect_faces
+from recognition.gallery import FaceGallery
+from services.logger import get_logger
+from services.metrics import stage
+from services.profiles import setting
 import time
 
+log = get_logger("live_recognition")
+
 # Cache loaded faces with timestamp
 _cache = {
-    'names': [],
-    'encodings': [],
+    'gallery': FaceGallery([], []),
+    'version': None,  # users_version() the gallery was built from
     'timestamp': 0,
-    'reload_interval': 5  # Reload every 5 seconds
+    'reload_interval': 5  # Check for changes every 5 seconds
 }
 
 def get_known_faces():
-    """Get cached known faces, reload if needed"""
+    """Get cached known faces, rebuilt when users.json has changed"""
     current_time = time.time()
     
-    # Reload if cache is empty or interval passed
-    if (not _cache['names'] or 
-        current_time - _cache['timestamp'] > _cache['reload_interval']):
-        try:
-            names, encodings = load_known_faces()
-            _cache['names'] = names
-            _cache['encodings'] = encodings
-            _cache['timestamp'] = current_time
-        except Exception as e:
-            # Silently fail, keep old cache
-            pass
+    if current_time - _cache['timestamp'] > _cache['reload_interval']:
+        _cache['timestamp'] = current_time
+        if users_version() != _cache['version']:
+            try:
+                names, encodings, source = load_known_faces(with_source=True)
+                _cache['gallery'] = FaceGallery(names, encodings, source=source)
+                _cache['version'] = source.version
+            except Exception as e:
+                # Silently fail, keep old cache
+                pass
     
-    return _cache['names'], _cache['encodings']
+    return _cache['gallery']
 
 
-def recognize_from_frame(frame):
+def recognize_from_frame(frame, camera_id="default"):
     """
     Recognize face in a frame using face_recognition library
     
     Args:
         frame: BGR image frame from camera (uint8)
+        camera_id: camera whose configured face detector is used
         
     Returns:
         (name, confidence) tuple or (None, None) if no face detected
     """
     try:
-        known_names, known_encodings = get_known_faces()
+        gallery = get_known_faces()
         
         # Skip recognition if no known faces
-        if not known_names or len(known_encodings) == 0:
+        if not len(gallery):
             return None, None
         
         # Ensure frame is uint8 BGR
@@ -59,33 +67,29 @@ def recognize_from_frame(frame):
         rgb = np.array(rgb, dtype=np.uint8, order='C', copy=True)
         
         # Use face_recognition to detect face locations
-        face_locations = face_recognition.face_locations(rgb)
+        with stage("face_detect"):
+            face_locations = detect_faces(rgb, camera_id)
         
         if not face_locations:
             return None, None
 
         # Get encoding for the first detected face
-        encodings = face_recognition.face_encodings(rgb, face_locations)
+        with stage("face_encode"):
+            encodings = face_encodings(rgb, face_locations)
         
         if not encodings or len(encodings) == 0:
             return None, None
 
         # Compare with known faces
-        distances = face_recognition.face_distance(known_encodings, encodings[0])
-        min_dist = np.min(distances)
-        idx = np.argmin(distances)
+        with stage("face_match"):
+            best_name, min_dist = gallery.best(encodings[0])
         
-        # Debug: Print distance for troubleshooting
-        import random
-        if random.random() < 0.03:
-            print(f"Face detected - Distance to {known_names[idx]}: {min_dist:.3f}", flush=True)
+        log.sample(30, "debug", "face distance", best=best_name, distance=round(min_dist, 3))
 
-        # Threshold tuned to reduce false positives; lower distance = better match (0.0 perfect, 1.0 none)
-        RECOGNITION_THRESHOLD = 0.45
-        
-        if min_dist < RECOGNITION_THRESHOLD:
+        # Profile threshold (shared with face_recognition.py); lower distance = better match (0.0 perfect, 1.0 none)
+        if min_dist < setting("match_threshold"):
             confidence = 1 - min_dist  # Convert distance to confidence (0-1)
-            return known_names[idx], confidence
+            return best_name, confidence
 
         # Return "STRANGER" to match identify_person() in face_recognition.py
         return "STRANGER", 1 - min_dist
@@ -1,20 +1,27 @@
 import cv2
 import numpy as np
-from mediapipe import solutions
 from recognition.face_db import load_known_faces
 from recognition.mediapipe_embedding import extract_embedding
+from services.logger import get_logger
+from services.model_pool import ModelPool
+from services.readiness import LazyComponent
 
-# Initialize MediaPipe Face Mesh
-mp_face_mesh = solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(
-    static_image_mode=False,
-    max_num_faces=1,
-    min_detection_confidence=0.6,
-    min_tracking_confidence=0.6
-)
+log = get_logger("mediapipe_live")
 
-# Load known faces at startup
-known_names, known_embeddings = load_known_faces()
+
+def _create_face_mesh():
+    from mediapipe import solutions
+    return solutions.face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        min_detection_confidence=0.6,
+        min_tracking_confidence=0.6
+    )
+
+
+# Initialize the MediaPipe Face Mesh pool and the known faces on first use
+face_mesh = LazyComponent("face_mesh", lambda: ModelPool("face_mesh", _create_face_mesh).warm(1))
+known_faces = LazyComponent("mediapipe_known_faces", load_known_faces)
 
 # Stricter threshold for MediaPipe embeddings
 SIMILARITY_THRESHOLD = 0.97
@@ -27,7 +34,11 @@ def recognize_face(frame):
     - name: person's name or "Unknown"
     - confidence_score: similarity score (0-1)
     """
-    if frame is None or len(known_embeddings) == 0:
+    if frame is None:
+        return None, None
+
+    known_names, known_embeddings = known_faces.get()
+    if len(known_embeddings) == 0:
         return None, None
 
     try:
@@ -35,7 +46,8 @@ def recognize_face(frame):
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         
         # Detect landmarks
-        result = face_mesh.process(rgb)
+        with face_mesh.get().checkout() as mesh:
+            result = mesh.process(rgb)
         
         if not result.multi_face_landmarks:
             return None, None
@@ -55,7 +67,7 @@ def recognize_face(frame):
         best_score = max(similarities)
         best_idx = np.argmax(similarities)
 
-        print(f"Similarity: {best_score:.4f}")
+        log.sample(30, "debug", "face similarity", best=known_names[best_idx], score=round(float(best_score), 4))
 
         # Stricter threshold (0.97 for MediaPipe)
         if best_score > SIMILARITY_THRESHOLD:
@@ -64,5 +76,5 @@ def recognize_face(frame):
         return "Unknown", best_score
 
     except Exception as e:
-        print(f"Face recognition error: {e}")
+        log.exception("face recognition error", error=e)
         return None, None
@@ -0,0 +1,135 @@
+# backend/recognition/video_enrollment.py
+# Picks enrollment faces from a short video clip.
+#
+# Frames are decoded one at a time straight from the file and sampled at
+# ENROLL_VIDEO_SAMPLE_FPS. A usable sample shows exactly one face: a clip
+# with nobody in its first samples, or with several people in a few
+# samples, is rejected without decoding the rest. Faces are scored by
+# sharpness (variance of the Laplacian of the face crop) and only the best
+# crops are kept in memory and encoded. From those, the final set is chosen
+# for diversity: the sharpest face first, then repeatedly the face farthest
+# (in encoding distance) from the ones already chosen.
+
+import heapq
+
+import cv2
+import numpy as np
+from config import (
+    ENROLL_DETECT_MAX_SIDE, ENROLL_VIDEO_KEEP, ENROLL_VIDEO_MAX_SECONDS, ENROLL_VIDEO_SAMPLE_FPS,
+)
+from recognition.face_detectors import crop_face, detect_faces_bounded
+from recognition.face_lib import face_encodings
+
+EARLY_CHECK_SAMPLES = 4      # samples without any face before the clip is rejected
+MULTI_FACE_LIMIT = 3         # samples with several faces before the clip is rejected
+CANDIDATES_PER_KEPT = 3      # sharpest crops encoded per face enrolled
+SAME_PERSON_DISTANCE = 0.6   # faces farther than this from the sharpest one are dropped
+MIN_DIVERSITY = 0.02         # stop adding faces once the farthest is this close
+SHARPNESS_SIZE = 128         # crops are scored at one size so face size doesn't bias sharpness
+
+
+class EnrollmentError(ValueError):
+    """The clip cannot be used for enrollment; the message is meant for the user."""
+
+
+def sharpness(rgb, box):
+    top, right, bottom, left = box
+    grey = cv2.cvtColor(rgb[top:bottom, left:right], cv2.COLOR_RGB2GRAY)
+    grey = cv2.resize(grey, (SHARPNESS_SIZE, SHARPNESS_SIZE), interpolation=cv2.INTER_AREA)
+    return float(cv2.Laplacian(grey, cv2.CV_64F).var())
+
+
+def iter_sampled_frames(path, sample_fps=ENROLL_VIDEO_SAMPLE_FPS, max_seconds=ENROLL_VIDEO_MAX_SECONDS):
+    """Yield (seconds, BGR frame) at about ``sample_fps``, decoding one frame at a time."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise EnrollmentError("Could not read the video. Please upload an MP4, MOV or WebM clip.")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        if not 0 < fps < 1000:
+            fps = 30.0
+        step = max(1, round(fps / sample_fps))
+        index = 0
+        while index < max_seconds * fps:
+            if index % step:
+                # Skipped frames are only grabbed, not converted
+                if not capture.grab():
+                    break
+            else:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield index / fps, frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def select_enrollment_faces(path, keep=ENROLL_VIDEO_KEEP):
+    """
+    Encodings of up to ``keep`` sharp, varied faces from the video at ``path``
+    and a report of what was decoded. Raises EnrollmentError when the clip
+    shows no face, several people, or nothing usable.
+    """
+    report = {"frames_sampled": 0, "frames_with_face": 0, "frames_multiple_faces": 0}
+    candidates = []  # min-heap of (sharpness, seconds, crop, box)
+    limit = keep * CANDIDATES_PER_KEPT
+
+    for seconds, bgr in iter_sampled_frames(path):
+        report["frames_sampled"] += 1
+        rgb = np.ascontiguousarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+        boxes = detect_faces_bounded(rgb, ENROLL_DETECT_MAX_SIDE)
+
+        if len(boxes) > 1:
+            report["frames_multiple_faces"] += 1
+            if report["frames_multiple_faces"] >= MULTI_FACE_LIMIT:
+                raise EnrollmentError(
+                    "More than one face in the video. Please record only the person being enrolled."
+                )
+            continue
+        if not boxes:
+            if not report["frames_with_face"] and report["frames_sampled"] >= EARLY_CHECK_SAMPLES:
+                raise EnrollmentError(
+                    "No face detected at the start of the video. Please keep your face in view."
+                )
+            continue
+
+        top, right, bottom, left = boxes[0]
+        if bottom <= top or right <= left:
+            continue
+        report["frames_with_face"] += 1
+        score = sharpness(rgb, boxes[0])
+        if len(candidates) < limit:
+            heapq.heappush(candidates, (score, seconds, *crop_face(rgb, boxes[0])))
+        elif score > candidates[0][0]:
+            heapq.heapreplace(candidates, (score, seconds, *crop_face(rgb, boxes[0])))
+
+    if not report["frames_sampled"]:
+        raise EnrollmentError("Could not read any frames from the video.")
+    if not candidates:
+        raise EnrollmentError("No usable face found in the video.")
+
+    encoded = []
+    for score, seconds, crop, box in sorted(candidates, key=lambda c: c[0], reverse=True):
+        encodings = face_encodings(crop, [box])
+        if encodings:
+            encoded.append((score, seconds, np.asarray(encodings[0])))
+    if not encoded:
+        raise EnrollmentError("Could not extract a face encoding from the video.")
+
+    # The sharpest face defines the person; anything far from it is someone else
+    reference = encoded[0][2]
+    pool = [c for c in encoded if np.linalg.norm(c[2] - reference) <= SAME_PERSON_DISTANCE]
+    chosen, rest = pool[:1], pool[1:]
+    while rest and len(chosen) < keep:
+        spread = [min(np.linalg.norm(c[2] - s[2]) for s in chosen) for c in rest]
+        best = int(np.argmax(spread))
+        if spread[best] < MIN_DIVERSITY:
+            break
+        chosen.append(rest.pop(best))
+
+    report["faces_encoded"] = len(encoded)
+    report["selected"] = [
+        {"time": round(seconds, 2), "sharpness": round(score, 1)} for score, seconds, _ in chosen
+    ]
+    return [encoding for _, _, encoding in chosen], report
@@ -1,20 +1,28 @@
 import uuid
 from datetime import datetime, timedelta
 from services.alert_store import alerts
+from services.logger import get_logger
+from services.metrics import stage, inc
 
-# Debug: Print store ID to verify same instance is used everywhere
-print(f"🔗 alert_service.py loaded - ALERT STORE ID: {id(alerts)}")
+log = get_logger("alerts")
 
 DUPLICATE_SUPPRESS_SECONDS = 60
 
-def create_alert(alert_type, message):
-    print(f"📥 create_alert called with type={alert_type}, message={message}")
-    print(f"📥 ALERT STORE ID: {id(alerts)}, Current count BEFORE: {len(alerts)}")
+# Called with each new alert (e.g. clip recording); must return quickly
+_listeners = []
 
+def add_alert_listener(callback):
+    _listeners.append(callback)
+
+@stage("create_alert")
+def create_alert(alert_type, message, camera_id=None):
     now = datetime.now()
 
     # Prevent duplicate alerts unless the previous one is older than the suppression window
-    existing_match = next((a for a in alerts if a.get("message") == message), None)
+    existing_match = next(
+        (a for a in alerts if a.get("message") == message and a.get("camera_id") == camera_id),
+        None
+    )
     if existing_match:
         existing_time_str = existing_match.get("timestamp")
         within_window = False
@@ -25,27 +33,32 @@ def create_alert(alert_type, message):
             except ValueError:
                 within_window = True  # Fallback to suppress if timestamp is invalid
         if within_window:
-            print(f"📥 Duplicate alert suppressed for {message}")
+            log.debug("duplicate alert suppressed", message=message, camera=camera_id)
             return existing_match
 
     alert = {
         "id": str(uuid.uuid4()),
         "type": alert_type,
         "message": message,
+        "camera_id": camera_id,
         "timestamp": now.isoformat(),
         "read": False
     }
     alerts.append(alert)
-    print(f"⚠️ Alert ADDED to list: {message}")
-    print(f"📥 ALERT STORE ID: {id(alerts)}, Current count AFTER: {len(alerts)}")
+    inc("alerts_created_total", type=alert_type)
+    log.info("alert created", type=alert_type, message=message, camera=camera_id, count=len(alerts))
     # Keep only last 50 alerts
     if len(alerts) > 50:
         alerts.pop(0)
+    for callback in _listeners:
+        try:
+            callback(alert)
+        except Exception as e:
+            log.exception("alert listener failed", error=e)
     return alert
 
 def get_alerts():
     # Return alerts in reverse order (newest first)
-    print(f"📋 get_alerts called - ALERT STORE ID: {id(alerts)}, count: {len(alerts)}")
     return list(reversed(alerts))
 
 def mark_alert_read(alert_id):
@@ -57,12 +70,11 @@ def mark_alert_read(alert_id):
 
 def clear_alerts():
     """Clear all alerts"""
-    print(f"🗑️ clear_alerts called - ALERT STORE ID: {id(alerts)}")
+    log.info("alerts cleared", count=len(alerts))
     alerts.clear()
 
 def clear_stranger_alerts():
     """Remove all stranger-related alerts"""
-    print(f"🗑️ clear_stranger_alerts called - ALERT STORE ID: {id(alerts)}")
     # Use slice assignment to modify in-place (keeps same list reference)
     alerts[:] = [a for a in alerts if "Stranger" not in a.get("message", "")]
-    print(f"🗑️ After clearing stranger alerts: {len(alerts)} remaining")
+    log.info("stranger alerts cleared", remaining=len(alerts))
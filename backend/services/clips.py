@@ -0,0 +1,263 @@
+# backend/services/clips.py
+# Pre-event ring buffer and background clip recording for alerts.
+#
+# An encoder thread per camera samples the published frames at CLIP_FPS,
+# downsizes and JPEG-encodes them into a ring buffer bounded by both
+# CLIP_PRE_SECONDS and CLIP_BUFFER_BYTES. When an emergency/security alert is
+# created, the buffered frames plus CLIP_POST_SECONDS of following frames are
+# handed to a writer thread, which saves them to CLIP_DIR/<alert id>.mjpeg
+# (concatenated JPEGs, playable with e.g. ffplay/VLC) and records the clip in
+# index.json. The processing loop only pays for a list append per alert.
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+from config import (
+    CLIP_DIR, CLIP_ALERT_TYPES, CLIP_PRE_SECONDS, CLIP_POST_SECONDS, CLIP_FPS,
+    CLIP_WIDTH, CLIP_JPEG_QUALITY, CLIP_BUFFER_BYTES, CLIP_MAX_COUNT,
+    CLIP_MAX_AGE_DAYS, PRIMARY_CAMERA,
+)
+from services.logger import get_logger
+from services.metrics import inc, stage
+
+log = get_logger("clips")
+
+INDEX_FILE = "index.json"
+
+
+class FrameRing:
+    """Recent (timestamp, jpeg bytes) pairs, bounded by age and total size."""
+
+    def __init__(self, max_seconds=CLIP_PRE_SECONDS, max_bytes=CLIP_BUFFER_BYTES):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self._frames = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp, jpeg):
+        with self._lock:
+            self._frames.append((timestamp, jpeg))
+            self._bytes += len(jpeg)
+            while self._frames and (
+                self._bytes > self.max_bytes
+                or timestamp - self._frames[0][0] > self.max_seconds
+            ):
+                _, dropped = self._frames.popleft()
+                self._bytes -= len(dropped)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._frames)
+
+    def stats(self):
+        with self._lock:
+            return {"frames": len(self._frames), "bytes": self._bytes}
+
+
+class _ClipJob:
+    def __init__(self, alert, camera_id, frames):
+        self.alert = alert
+        self.camera_id = camera_id
+        self.frames = frames
+        self.until = time.time() + CLIP_POST_SECONDS
+
+
+def encode_frame(frame, width=CLIP_WIDTH, quality=CLIP_JPEG_QUALITY):
+    height, current_width = frame.shape[:2]
+    if current_width > width:
+        frame = cv2.resize(
+            frame, (width, int(height * width / current_width)), interpolation=cv2.INTER_AREA
+        )
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes() if ok else None
+
+
+class ClipRecorder:
+    def __init__(self, clip_dir=CLIP_DIR):
+        self.clip_dir = clip_dir
+        self.rings = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._index = None
+        self._started = False
+
+    # ---------------- CAPTURE (encoder thread per camera) ---------------- #
+    def start(self, camera_ids):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for camera_id in camera_ids:
+                self.rings[camera_id] = FrameRing()
+                self._active[camera_id] = []
+                threading.Thread(
+                    target=self._encode_loop, args=(camera_id,),
+                    name=f"clip-encoder-{camera_id}", daemon=True,
+                ).start()
+        threading.Thread(target=self._write_loop, name="clip-writer", daemon=True).start()
+
+    def _encode_loop(self, camera_id):
+        from camera import get_feed
+        feed = get_feed(camera_id)
+        ring = self.rings[camera_id]
+        interval = 1.0 / CLIP_FPS
+        seq = 0
+        last = 0.0
+
+        while True:
+            try:
+                seq, frame = feed.wait_frame(seq)
+                now = time.time()
+                if frame is not None and now - last >= interval:
+                    last = now
+                    with stage("clip_encode"):
+                        jpeg = encode_frame(frame)
+                    if jpeg is not None:
+                        ring.append(now, jpeg)
+                        self._extend_active(camera_id, now, jpeg)
+                self._finish_due(camera_id, now)
+            except Exception as e:
+                log.exception("clip encoder error", camera=camera_id, error=e)
+                time.sleep(1)
+
+    def _extend_active(self, camera_id, timestamp, jpeg):
+        with self._lock:
+            for job in self._active[camera_id]:
+                job.frames.append((timestamp, jpeg))
+
+    def _finish_due(self, camera_id, now):
+        with self._lock:
+            active = self._active[camera_id]
+            if not active:
+                return
+            due = [job for job in active if now >= job.until]
+            active[:] = [job for job in active if now < job.until]
+        for job in due:
+            self._writes.put(job)
+
+    # ---------------- TRIGGER (alert listener) ---------------- #
+    def on_alert(self, alert):
+        if alert["type"] not in CLIP_ALERT_TYPES:
+            return
+        camera_id = alert.get("camera_id") or PRIMARY_CAMERA
+        ring = self.rings.get(camera_id)
+        if ring is None:
+            return
+        job = _ClipJob(alert, camera_id, ring.snapshot())
+        with self._lock:
+            self._active[camera_id].append(job)
+        alert["clip"] = f"/clips/{alert['id']}"
+
+    # ---------------- WRITER ---------------- #
+    def _write_loop(self):
+        while True:
+            job = self._writes.get()
+            try:
+                self._write(job)
+            except Exception as e:
+                log.exception("clip write failed", alert=job.alert["id"], error=e)
+
+    def _write(self, job):
+        if not job.frames:
+            log.warning("no frames for clip", alert=job.alert["id"], camera=job.camera_id)
+            return
+        os.makedirs(self.clip_dir, exist_ok=True)
+        filename = f"{job.alert['id']}.mjpeg"
+        path = os.path.join(self.clip_dir, filename)
+        size = 0
+        with open(path + ".tmp", "wb") as f:
+            for _, jpeg in job.frames:
+                f.write(jpeg)
+                size += len(jpeg)
+        os.replace(path + ".tmp", path)
+
+        entry = {
+            "alert_id": job.alert["id"],
+            "alert_type": job.alert["type"],
+            "message": job.alert["message"],
+            "camera_id": job.camera_id,
+            "file": filename,
+            "start": job.frames[0][0],
+            "end": job.frames[-1][0],
+            "frames": len(job.frames),
+            "bytes": size,
+        }
+        with self._lock:
+            index = self._load_index()
+            index.append(entry)
+            self._apply_retention(index)
+            self._save_index(index)
+        inc("clips_written_total", camera=job.camera_id)
+        log.info("clip saved", alert=entry["alert_id"], camera=job.camera_id,
+                 frames=entry["frames"], bytes=size)
+
+    # ---------------- INDEX / RETENTION ---------------- #
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.clip_dir, INDEX_FILE)) as f:
+                    self._index = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = []
+        return self._index
+
+    def _save_index(self, index):
+        path = os.path.join(self.clip_dir, INDEX_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _apply_retention(self, index):
+        cutoff = time.time() - CLIP_MAX_AGE_DAYS * 86400
+        expired = [e for e in index if e["end"] < cutoff]
+        kept = [e for e in index if e["end"] >= cutoff]
+        if len(kept) > CLIP_MAX_COUNT:
+            expired += kept[:-CLIP_MAX_COUNT]
+            kept = kept[-CLIP_MAX_COUNT:]
+        for entry in expired:
+            try:
+                os.remove(os.path.join(self.clip_dir, entry["file"]))
+            except FileNotFoundError:
+                pass
+        index[:] = kept
+
+    # ---------------- QUERIES ---------------- #
+    def list_clips(self, camera_id=None):
+        with self._lock:
+            index = list(self._load_index())
+        if camera_id is not None:
+            index = [e for e in index if e["camera_id"] == camera_id]
+        return list(reversed(index))
+
+    def get_clip(self, alert_id):
+        """Index entry plus absolute ``path`` for an alert's clip, or None."""
+        with self._lock:
+            entry = next((e for e in self._load_index() if e["alert_id"] == alert_id), None)
+        if entry is None:
+            return None
+        return dict(entry, path=os.path.join(self.clip_dir, entry["file"]))
+
+    def stats(self):
+        with self._lock:
+            pending = {camera_id: len(jobs) for camera_id, jobs in self._active.items()}
+        return {
+            "buffers": {camera_id: ring.stats() for camera_id, ring in self.rings.items()},
+            "recording": pending,
+            "queued_writes": self._writes.qsize(),
+        }
+
+
+clip_recorder = ClipRecorder()
+
+
+def start_clip_recording(camera_ids):
+    from services.alert_service import add_alert_listener
+    clip_recorder.start(camera_ids)
+    add_alert_listener(clip_recorder.on_alert)
@@ -0,0 +1,190 @@
+# backend/services/inference_pool.py
+# Optional process-pool inference.
+#
+# With INFERENCE_MODE=process, frames are copied into preallocated
+# multiprocessing.shared_memory slots and recognition / pose estimation run in
+# worker processes that each load their own models. Only compact results
+# (names, distances, 128-d encodings, posture summaries) travel back to the
+# API process, so the heavy work no longer competes with request handling for
+# the GIL.
+#
+# With the default INFERENCE_MODE=thread everything runs in the calling thread,
+# exactly as before.
+
+import multiprocessing
+import queue
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from config import INFERENCE_MODE, INFERENCE_WORKERS, INFERENCE_SLOT_BYTES
+from services.logger import get_logger
+from services.readiness import LazyComponent
+
+log = get_logger("inference")
+
+
+# ---------------- TASKS (run in-process or inside a worker) ---------------- #
+def _task_recognition(frame, camera_id):
+    from recognition.face_recognition import recognize_face
+    return recognize_face(frame, camera_id)
+
+
+def _task_pose(frame, camera_id):
+    from detection.fall_detection import analyze_pose
+    return analyze_pose(frame, camera_id)
+
+
+TASKS = {
+    "recognition": _task_recognition,
+    "pose": _task_pose,
+}
+
+
+def run_tasks(frame, tasks, camera_id="default"):
+    return {task: TASKS[task](frame, camera_id) for task in tasks}
+
+
+# ---------------- WORKER PROCESS ---------------- #
+_worker_slots = {}
+
+
+def _init_worker():
+    # Load models up front so the first frame doesn't pay for it
+    from recognition.face_lib import face_lib
+    from detection.fall_detection import pose
+    for component in (face_lib, pose):
+        try:
+            component.get()
+        except Exception as e:
+            log.warning("worker could not load component", component=component.name, error=e)
+
+
+def _attach_slot(slot_name):
+    """Open a slot the parent owns without registering it with the resource tracker."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=slot_name, track=False)
+    # Before 3.13 attaching registers the segment as if this process owned
+    # it, and the tracker would unlink it or warn about a leak. Spawned
+    # workers share the parent's tracker, so unregistering afterwards would
+    # drop the parent's own registration; skip the register instead.
+    register = resource_tracker.register
+
+    def register_except_shared_memory(name, rtype):
+        if rtype != "shared_memory":
+            register(name, rtype)
+
+    resource_tracker.register = register_except_shared_memory
+    try:
+        return shared_memory.SharedMemory(name=slot_name)
+    finally:
+        resource_tracker.register = register
+
+
+def _worker_run(slot_name, shape, tasks, camera_id):
+    shm = _worker_slots.get(slot_name)
+    if shm is None:
+        shm = _attach_slot(slot_name)
+        _worker_slots[slot_name] = shm
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    return run_tasks(frame, tasks, camera_id)
+
+
+# ---------------- POOL ---------------- #
+class InferencePool:
+    def __init__(self, workers, slot_bytes=INFERENCE_SLOT_BYTES, slots=None):
+        self.workers = workers
+        self.slot_bytes = slot_bytes
+        # Two slots per worker: one being processed, one being filled
+        count = slots or workers * 2
+        self._slots = [
+            shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(count)
+        ]
+        self._free = queue.Queue()
+        for index in range(count):
+            self._free.put(index)
+        # spawn: forking a process that already runs threads and models is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, frame, tasks, camera_id="default"):
+        """Queue a frame for the given tasks; returns a Future of {task: result}."""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(
+                f"Frame of {frame.nbytes} bytes exceeds inference slot size {self.slot_bytes}"
+            )
+        index = self._free.get()  # blocks when every slot is in flight (backpressure)
+        slot = self._slots[index]
+        try:
+            view = np.ndarray(frame.shape, dtype=np.uint8, buffer=slot.buf)
+            view[...] = frame
+            future = self._executor.submit(
+                _worker_run, slot.name, frame.shape, tuple(tasks), camera_id
+            )
+        except Exception:
+            self._free.put(index)
+            raise
+        future.add_done_callback(lambda _: self._free.put(index))
+        return future
+
+    def run(self, frame, tasks, camera_id="default"):
+        return self.submit(frame, tasks, camera_id).result()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+
+
+def _create_pool():
+    return InferencePool(INFERENCE_WORKERS)
+
+
+inference_pool = None
+if INFERENCE_MODE == "process":
+    inference_pool = LazyComponent("inference_pool", _create_pool)
+
+
+def get_inference_pool():
+    """The shared pool in process mode, None in thread mode."""
+    return inference_pool.get() if inference_pool is not None else None
+
+
+def infer(frame, tasks, camera_id="default"):
+    """Run tasks on a frame in the pool if enabled, otherwise in this thread."""
+    pool = get_inference_pool()
+    if pool is None:
+        return run_tasks(frame, tasks, camera_id)
+    return pool.run(frame, tasks, camera_id)
+
+
+def submit(frame, tasks, camera_id="default"):
+    """Like infer(), but returns a Future (already resolved in thread mode)."""
+    pool = get_inference_pool()
+    if pool is not None:
+        return pool.submit(frame, tasks, camera_id)
+
+    from concurrent.futures import Future
+    future = Future()
+    try:
+        future.set_result(run_tasks(frame, tasks, camera_id))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def shutdown():
+    if inference_pool is not None and inference_pool.state == "ready":
+        inference_pool.get().close()
@@ -0,0 +1,184 @@
+# backend/services/logger.py
+# Structured, leveled logging that never blocks the processing loop.
+#
+# Callers only build a LogRecord and drop it on a bounded queue; a background
+# listener thread formats and writes it. When the queue is full the record is
+# dropped (and counted) instead of stalling a camera loop on stdout.
+#
+#   log = get_logger("processor")
+#   log.info("known user detected", person=name, camera=camera_id)
+#   log.sample(30, "debug", "frame streamed", size=len(jpeg))  # 1 in 30 calls
+#
+# Disabled levels return before any formatting work. Identical records
+# (same level, event and fields) repeated within LOG_REPEAT_SECONDS are
+# suppressed; the next one that gets through carries a "repeated" count.
+#
+# LOG_LEVEL   DEBUG / INFO / WARNING / ERROR (default INFO)
+# LOG_FORMAT  text (default) or json
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_REPEAT_SECONDS = float(os.getenv("LOG_REPEAT_SECONDS", "10"))
+
+ROOT_NAME = "homecam"
+_MAX_TRACKED_REPEATS = 1024
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def formatMessage(self, record):
+        text = super().formatMessage(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops on a full queue and leaves formatting to the listener."""
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            from services.metrics import inc
+            inc("log_records_dropped_total")
+
+
+_configure_lock = threading.Lock()
+_listener = None
+
+
+def _configure():
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+
+        records = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        root = logging.getLogger(ROOT_NAME)
+        root.setLevel(LOG_LEVEL)
+        root.addHandler(_DroppingQueueHandler(records))
+        # Don't also go through whatever uvicorn installs on the root logger
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(records, stream)
+        _listener.start()
+        atexit.register(shutdown)
+
+
+def shutdown():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _configure_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+class Logger:
+    def __init__(self, name):
+        self._logger = logging.getLogger(f"{ROOT_NAME}.{name}")
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._repeats = {}
+
+    def enabled(self, level):
+        return self._logger.isEnabledFor(logging.getLevelName(level.upper()))
+
+    def _log(self, level, event, fields, exc_info=None):
+        if fields and LOG_REPEAT_SECONDS > 0:
+            key = (level, event, repr(sorted(fields.items())))
+        else:
+            key = (level, event)
+
+        now = time.monotonic()
+        with self._lock:
+            last = self._repeats.get(key)
+            if last is not None and now - last[0] < LOG_REPEAT_SECONDS:
+                last[1] += 1
+                return
+            if len(self._repeats) >= _MAX_TRACKED_REPEATS:
+                self._repeats.clear()
+            self._repeats[key] = [now, 0]
+            repeated = last[1] if last else 0
+
+        if repeated:
+            fields = dict(fields, repeated=repeated)
+        self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+    def debug(self, event, **fields):
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        if self._logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """error() with the current exception's traceback attached."""
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, event, fields, exc_info=sys.exc_info())
+
+    def sample(self, every, level, event, **fields):
+        """Log only one in ``every`` calls for this event (for per-frame messages)."""
+        numeric = logging.getLevelName(level.upper())
+        if not self._logger.isEnabledFor(numeric):
+            return
+        with self._lock:
+            count = self._counters.get(event, 0)
+            self._counters[event] = count + 1
+        if count % every == 0:
+            self._log(numeric, event, fields)
+
+
+_loggers = {}
+
+
+def get_logger(name):
+    logger = _loggers.get(name)
+    if logger is None:
+        _configure()
+        logger = _loggers.setdefault(name, Logger(name))
+    return logger
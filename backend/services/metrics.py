@@ -0,0 +1,131 @@
+# backend/services/metrics.py
+# In-process counters and timing histograms, rendered in the Prometheus text
+# format by GET /metrics. Set METRICS_ENABLED=0 to turn every call into a no-op.
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ContextDecorator
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# Seconds; covers everything from a motion check to a full dlib pass
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+HELP = {
+    "pipeline_stage_seconds": "Time spent in each processing stage",
+    "http_request_seconds": "API handler latency",
+    "http_requests_total": "API requests by route and status",
+    "frames_processed_total": "Frames that went through the processor",
+    "alerts_created_total": "Alerts created by type",
+}
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(name, value, **labels):
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    index = bisect_left(DEFAULT_BUCKETS, value)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = [0] * (len(DEFAULT_BUCKETS) + 1) + [0.0, 0]
+            _histograms[key] = hist
+        hist[index] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+
+class timed(ContextDecorator):
+    """Observe the duration of a block or function call into a histogram."""
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self._start = None
+
+    def _recreate_cm(self):
+        # Each decorated call gets its own start time (thread safe)
+        return timed(self.name, **self.labels)
+
+    def __enter__(self):
+        if METRICS_ENABLED:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            observe(self.name, time.perf_counter() - self._start, **self.labels)
+        return False
+
+
+def stage(name):
+    return timed("pipeline_stage_seconds", stage=name)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+
+    lines = []
+    seen = set()
+
+    for (name, labels), value in sorted(counters.items()):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), hist in sorted(histograms.items()):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(DEFAULT_BUCKETS, hist):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, {'le': bound})} {cumulative}")
+        cumulative += hist[len(DEFAULT_BUCKETS)]
+        lines.append(f"{name}_bucket{_format_labels(labels, {'le': '+Inf'})} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {hist[-2]}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist[-1]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
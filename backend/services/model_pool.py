@@ -0,0 +1,136 @@
+# backend/services/model_pool.py
+# Pools of non-thread-safe model instances (MediaPipe Pose, FaceMesh).
+#
+# Instead of one shared instance that every thread races on, a pool builds
+# up to ``size`` instances on demand and lends each caller its own for the
+# duration of a call. A returned instance goes preferentially back to the
+# same key (camera id, or the calling thread by default), so MediaPipe's
+# frame-to-frame tracking keeps seeing a single stream. When every instance
+# is lent out, callers wait; the wait time and checkouts are recorded as
+# metrics. A pool that can be closed while in use (e.g. released for power
+# save) raises PoolClosed at checkout; callers fetch the current pool again.
+
+import threading
+import time
+from contextlib import contextmanager
+
+from config import MODEL_POOL_SIZE
+from services.logger import get_logger
+from services.metrics import inc, observe
+
+log = get_logger("model_pool")
+
+_pools = {}
+
+
+class PoolClosed(RuntimeError):
+    """Checkout from a pool that has been closed."""
+
+
+def _close(instance):
+    close = getattr(instance, "close", None)
+    if close is not None:
+        close()
+
+
+class ModelPool:
+    def __init__(self, name, factory, size=MODEL_POOL_SIZE):
+        self.name = name
+        self.size = max(1, size)
+        self._factory = factory
+        self._cond = threading.Condition()
+        self._idle = []  # (instance, key it last served), most recent last
+        self._created = 0
+        self._closed = False
+        _pools[name] = self
+
+    def warm(self, count=1):
+        """Build ``count`` instances up front so the first callers don't pay for loading."""
+        while True:
+            with self._cond:
+                if self._created >= min(count, self.size):
+                    return self
+                self._created += 1
+            instance = self._build()
+            with self._cond:
+                self._idle.append((instance, None))
+                self._cond.notify()
+
+    def _build(self):
+        start = time.perf_counter()
+        try:
+            instance = self._factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        log.info("model instance created", model=self.name, seconds=round(time.perf_counter() - start, 2))
+        return instance
+
+    def _acquire(self, key):
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosed(f"Model pool '{self.name}' is closed")
+                if self._idle:
+                    # Same key first, otherwise the most recently returned instance
+                    index = next(
+                        (i for i, (_, last_key) in enumerate(self._idle) if last_key == key),
+                        len(self._idle) - 1,
+                    )
+                    return self._idle.pop(index)[0]
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                inc("model_pool_waits_total", model=self.name)
+                self._cond.wait()
+        # Loading takes a while; other callers can keep using the pool meanwhile
+        return self._build()
+
+    def _release(self, instance, key):
+        with self._cond:
+            if not self._closed:
+                self._idle.append((instance, key))
+                self._cond.notify()
+                return
+            self._created -= 1
+        _close(instance)
+
+    @contextmanager
+    def checkout(self, key=None):
+        """Borrow an instance for the duration of the ``with`` block."""
+        key = threading.get_ident() if key is None else key
+        start = time.perf_counter()
+        instance = self._acquire(key)
+        observe("model_pool_wait_seconds", time.perf_counter() - start, model=self.name)
+        inc("model_pool_checkouts_total", model=self.name)
+        try:
+            yield instance
+        finally:
+            self._release(instance, key)
+
+    def close(self):
+        """Close idle instances now and lent ones when they come back."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for instance, _ in idle:
+            _close(instance)
+        if _pools.get(self.name) is self:
+            del _pools[self.name]
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._created - len(self._idle),
+            }
+
+
+def stats():
+    return {name: pool.stats() for name, pool in list(_pools.items())}
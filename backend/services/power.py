@@ -0,0 +1,108 @@
+# backend/services/power.py
+# Idle power save with wake-on-motion.
+#
+# Each camera is "active" or "idle". The processor reports on every frame
+# whether anything is going on (motion, somebody in view, a fall in
+# progress); after IDLE_AFTER_SECONDS without activity the camera goes idle:
+# its feed captures at the idle resolution and frame rate and the processor
+# stops after the motion check. While every camera is idle the Pose model
+# is released. The first motion puts the camera back to
+# active, restores the capture settings and reloads the released models in
+# the background. Time spent in each mode is kept per camera.
+
+import threading
+import time
+
+from camera import get_feed
+from config import IDLE_AFTER_SECONDS, IDLE_CAPTURE_HEIGHT, IDLE_CAPTURE_WIDTH, IDLE_FPS
+from detection.fall_detection import pose
+from services.logger import get_logger
+from services.metrics import inc
+from services.readiness import warm_up
+
+log = get_logger("power")
+
+ACTIVE = "active"
+IDLE = "idle"
+# Models dropped while every camera is idle
+RELEASABLE = (pose,)
+
+
+class PowerManager:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cameras = {}
+        self._released = []  # names of models released by power save
+
+    def update(self, camera_id, busy, now):
+        """Record whether a processed frame showed activity; returns the camera's mode."""
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            if camera is None:
+                camera = self._cameras[camera_id] = {
+                    "mode": ACTIVE, "since": now, "last_activity": now,
+                    "seconds": {ACTIVE: 0.0, IDLE: 0.0}, "switches": 0,
+                }
+            if busy:
+                camera["last_activity"] = now
+
+            if camera["mode"] == ACTIVE and now - camera["last_activity"] >= IDLE_AFTER_SECONDS:
+                self._switch(camera_id, camera, IDLE, now)
+                if all(c["mode"] == IDLE for c in self._cameras.values()):
+                    self._release_models()
+            elif camera["mode"] == IDLE and busy:
+                self._switch(camera_id, camera, ACTIVE, now)
+                self._restore_models()
+            return camera["mode"]
+
+    def _switch(self, camera_id, camera, mode, now):
+        previous = camera["mode"]
+        elapsed = now - camera["since"]
+        camera["seconds"][previous] += elapsed
+        camera["mode"], camera["since"] = mode, now
+        camera["switches"] += 1
+        get_feed(camera_id).set_power_save(mode == IDLE)
+        inc("power_mode_seconds_total", elapsed, camera=camera_id, mode=previous)
+        inc("power_mode_switches_total", camera=camera_id, mode=mode)
+        log.info("power mode changed", camera=camera_id, mode=mode, after_seconds=round(elapsed, 1))
+
+    def _release_models(self):
+        for component in RELEASABLE:
+            if component.state != "ready":
+                continue
+            model = component.release()
+            if model is not None:
+                model.close()
+            self._released.append(component.name)
+        if self._released:
+            log.info("models released for power save", models=",".join(self._released))
+
+    def _restore_models(self):
+        if self._released:
+            warm_up(self._released)
+            self._released = []
+
+    def stats(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            cameras = {}
+            for camera_id, camera in self._cameras.items():
+                seconds = dict(camera["seconds"])
+                seconds[camera["mode"]] += now - camera["since"]
+                total = sum(seconds.values())
+                cameras[camera_id] = {
+                    "mode": camera["mode"],
+                    "since": camera["since"],
+                    "seconds": seconds,
+                    "idle_share": seconds[IDLE] / total if total else 0.0,
+                    "switches": camera["switches"],
+                }
+            return {
+                "cameras": cameras,
+                "models_released": bool(self._released),
+                "idle_after_seconds": IDLE_AFTER_SECONDS,
+                "idle_capture": {"width": IDLE_CAPTURE_WIDTH, "height": IDLE_CAPTURE_HEIGHT, "fps": IDLE_FPS},
+            }
+
+
+power_manager = PowerManager()
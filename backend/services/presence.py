@@ -0,0 +1,305 @@
+# backend/services/presence.py
+# Compact per-camera presence timeline.
+#
+# The processor reports the detection state of every frame it handles, but
+# only changes are stored. Each camera keeps a run-length encoded, columnar
+# series of runs:
+#
+#   start, end  float64   when the state began / was last seen
+#   person      int32     index into the shared name table, -1 = nobody
+#   motion      bool
+#   fall        bool
+#
+# Runs live in fixed-size chunks of PRESENCE_CHUNK_RUNS rows. A chunk is
+# sealed with per-person totals when it fills up, so occupancy over a range
+# adds up the totals of the chunks it covers and only clips the runs of the
+# chunks at its edges. A background thread compacts sealed chunks: flicker
+# shorter than PRESENCE_MIN_RUN_SECONDS is folded into the surrounding run
+# and partly empty chunks are packed together.
+
+import threading
+import time
+
+import numpy as np
+from config import (
+    PRESENCE_CHUNK_RUNS, PRESENCE_COMPACT_SECONDS, PRESENCE_GAP_SECONDS,
+    PRESENCE_MAX_CHUNKS, PRESENCE_MIN_RUN_SECONDS,
+)
+from services.logger import get_logger
+from services.metrics import inc
+
+log = get_logger("presence")
+
+NOBODY = -1
+
+
+def _totals(duration, person, motion, fall):
+    present = person != NOBODY
+    codes, inverse = np.unique(person[present], return_inverse=True)
+    seconds = np.bincount(inverse, weights=duration[present], minlength=len(codes))
+    return {
+        "observed": float(duration.sum()),
+        "occupied": float(duration[present].sum()),
+        "motion": float(duration[motion].sum()),
+        "fall": float(duration[fall].sum()),
+        "people": dict(zip(codes.tolist(), seconds.tolist())),
+    }
+
+
+def _add_totals(total, part):
+    for key in ("observed", "occupied", "motion", "fall"):
+        total[key] += part[key]
+    for code, seconds in part["people"].items():
+        total["people"][code] = total["people"].get(code, 0.0) + seconds
+
+
+def _merge_intervals(start, end):
+    """Sorted runs of one person -> [(start, end)] with touching runs joined."""
+    if not len(start):
+        return []
+    breaks = np.flatnonzero(start[1:] > end[:-1]) + 1
+    firsts = np.concatenate(([0], breaks))
+    lasts = np.concatenate((breaks - 1, [len(end) - 1]))
+    return list(zip(start[firsts].tolist(), end[lasts].tolist()))
+
+
+def _fold_short_runs(runs):
+    """Fold sub-PRESENCE_MIN_RUN_SECONDS flicker into the previous run, then join equal runs."""
+    folded = []
+    for start, end, person, motion, fall in runs:
+        if folded and start - folded[-1][1] <= PRESENCE_GAP_SECONDS:
+            previous = folded[-1]
+            same = previous[2:] == (person, motion, fall)
+            # A fall is never folded away, however short
+            if same or (end - start < PRESENCE_MIN_RUN_SECONDS and not fall):
+                folded[-1] = (previous[0], max(previous[1], end)) + previous[2:]
+                continue
+        folded.append((start, end, person, motion, fall))
+    return folded
+
+
+class PresenceChunk:
+    """Fixed-capacity column arrays holding consecutive runs of one camera."""
+
+    def __init__(self, capacity=PRESENCE_CHUNK_RUNS):
+        self.start = np.empty(capacity, dtype=np.float64)
+        self.end = np.empty(capacity, dtype=np.float64)
+        self.person = np.empty(capacity, dtype=np.int32)
+        self.motion = np.empty(capacity, dtype=bool)
+        self.fall = np.empty(capacity, dtype=bool)
+        self.count = 0
+        self.totals = None  # set when sealed
+        self.compacted = False
+
+    @property
+    def full(self):
+        return self.count == len(self.start)
+
+    def nbytes(self):
+        return sum(column.nbytes for column in (self.start, self.end, self.person, self.motion, self.fall))
+
+    def columns(self):
+        n = self.count
+        return self.start[:n], self.end[:n], self.person[:n], self.motion[:n], self.fall[:n]
+
+    def runs(self):
+        return list(zip(*(column.tolist() for column in self.columns())))
+
+    def append(self, start, end, person, motion, fall):
+        i = self.count
+        self.start[i], self.end[i], self.person[i] = start, end, person
+        self.motion[i], self.fall[i] = motion, fall
+        self.count += 1
+
+    def seal(self):
+        start, end, person, motion, fall = self.columns()
+        self.totals = _totals(end - start, person, motion, fall)
+
+    @classmethod
+    def pack(cls, runs):
+        """Sealed, compacted chunks holding ``runs`` in order."""
+        chunks = []
+        for offset in range(0, len(runs), PRESENCE_CHUNK_RUNS):
+            chunk = cls()
+            for run in runs[offset:offset + PRESENCE_CHUNK_RUNS]:
+                chunk.append(*run)
+            chunk.seal()
+            chunk.compacted = True
+            chunks.append(chunk)
+        return chunks
+
+
+class _CameraTimeline:
+    def __init__(self):
+        self.chunks = [PresenceChunk()]
+        self.state = None  # (person, motion, fall) of the open run
+
+
+class PresenceTimeline:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cameras = {}
+        self._names = []
+        self._codes = {}
+        self._thread = None
+
+    def _code(self, person):
+        if person is None:
+            return NOBODY
+        code = self._codes.get(person)
+        if code is None:
+            code = self._codes[person] = len(self._names)
+            self._names.append(person)
+        return code
+
+    # ---------------- WRITE ---------------- #
+    def observe(self, camera_id, timestamp, person, motion, fall):
+        """Record the detection state of a processed frame."""
+        with self._lock:
+            state = (self._code(person), bool(motion), bool(fall))
+            camera = self._cameras.get(camera_id)
+            if camera is None:
+                camera = self._cameras[camera_id] = _CameraTimeline()
+
+            chunk = camera.chunks[-1]
+            if chunk.count:
+                last = chunk.count - 1
+                contiguous = timestamp - chunk.end[last] <= PRESENCE_GAP_SECONDS
+                if contiguous:
+                    # The previous state held until now
+                    chunk.end[last] = timestamp
+                    if state == camera.state:
+                        return
+
+            if chunk.full:
+                chunk.seal()
+                chunk = PresenceChunk()
+                camera.chunks.append(chunk)
+                if len(camera.chunks) > PRESENCE_MAX_CHUNKS:
+                    camera.chunks.pop(0)
+            chunk.append(timestamp, timestamp, *state)
+            camera.state = state
+        inc("presence_runs_total", camera=camera_id)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._compact_loop, name="presence", daemon=True)
+            self._thread.start()
+
+    def _compact_loop(self):
+        while True:
+            time.sleep(PRESENCE_COMPACT_SECONDS)
+            try:
+                self.compact()
+            except Exception as e:
+                log.exception("presence compaction failed", error=e)
+
+    def compact(self):
+        """Fold flicker in newly sealed chunks and pack partly empty ones together."""
+        with self._lock:
+            cameras = list(self._cameras.items())
+        for camera_id, camera in cameras:
+            with self._lock:
+                sealed = camera.chunks[:-1]
+                # Packing leaves at most the newest sealed chunk partly empty
+                if all(chunk.compacted for chunk in sealed) and all(c.full for c in sealed[:-1]):
+                    continue
+                before = sum(chunk.count for chunk in sealed)
+                packed, pending = [], []
+                for chunk in sealed:
+                    if chunk.compacted and chunk.full:
+                        packed.extend(PresenceChunk.pack(pending))
+                        pending = []
+                        packed.append(chunk)
+                    else:
+                        pending.extend(chunk.runs() if chunk.compacted else _fold_short_runs(chunk.runs()))
+                packed.extend(PresenceChunk.pack(pending))
+                camera.chunks = packed + camera.chunks[-1:]
+                after = sum(chunk.count for chunk in packed)
+            log.debug("presence compacted", camera=camera_id, runs_before=before, runs_after=after)
+
+    # ---------------- READ ---------------- #
+    def _snapshot(self, camera_id):
+        """Chunks to read without holding the lock: sealed chunks are never
+        modified in place, the open chunk is copied."""
+        with self._lock:
+            names = list(self._names)
+            views = {}
+            for cid, camera in self._cameras.items():
+                if camera_id is not None and cid != camera_id:
+                    continue
+                *sealed, active = camera.chunks
+                views[cid] = [(chunk.columns(), chunk.totals) for chunk in sealed]
+                views[cid].append((tuple(column.copy() for column in active.columns()), None))
+        return names, views
+
+    def query(self, start, end, camera_id=None, name=None, intervals=True):
+        """
+        Per-camera occupancy between ``start`` and ``end``: seconds observed,
+        occupied, with motion and with a fall, seconds per person and, when
+        ``intervals`` is set, each person's merged presence intervals.
+        """
+        names, views = self._snapshot(camera_id)
+        # Known names are lower-case, strangers "STRANGER"
+        name = name.lower() if name is not None else None
+        report = {}
+        for cid, chunks in views.items():
+            totals = {"observed": 0.0, "occupied": 0.0, "motion": 0.0, "fall": 0.0, "people": {}}
+            clipped = []
+            for (run_start, run_end, person, motion, fall), chunk_totals in chunks:
+                if not len(run_start) or run_end[-1] < start or run_start[0] > end:
+                    continue
+                covered = run_start[0] >= start and run_end[-1] <= end
+                if covered and chunk_totals is not None and not intervals:
+                    _add_totals(totals, chunk_totals)
+                    continue
+                # Runs are in time order, so the overlapping ones are a slice
+                lo = np.searchsorted(run_end, start, side="left")
+                hi = np.searchsorted(run_start, end, side="right")
+                window = (
+                    np.clip(run_start[lo:hi], start, end), np.clip(run_end[lo:hi], start, end),
+                    person[lo:hi], motion[lo:hi], fall[lo:hi],
+                )
+                _add_totals(totals, _totals(window[1] - window[0], *window[2:]))
+                if intervals:
+                    clipped.append(window)
+
+            observed = totals["observed"]
+            people = {}
+            for code, seconds in totals["people"].items():
+                person_name = names[code]
+                if name is not None and person_name.lower() != name:
+                    continue
+                people[person_name] = {
+                    "seconds": seconds,
+                    "share": seconds / observed if observed else 0.0,
+                }
+                if intervals:
+                    run_start = np.concatenate([w[0][w[2] == code] for w in clipped])
+                    run_end = np.concatenate([w[1][w[2] == code] for w in clipped])
+                    merged = _merge_intervals(run_start, run_end)
+                    people[person_name]["visits"] = len(merged)
+                    people[person_name]["intervals"] = [{"start": s, "end": e} for s, e in merged]
+
+            report[cid] = {
+                "observed_seconds": observed,
+                "occupied_seconds": totals["occupied"],
+                "occupancy": totals["occupied"] / observed if observed else 0.0,
+                "motion_seconds": totals["motion"],
+                "fall_seconds": totals["fall"],
+                "people": people,
+            }
+        return report
+
+    def stats(self):
+        with self._lock:
+            chunks = [chunk for camera in self._cameras.values() for chunk in camera.chunks]
+            return {
+                "cameras": len(self._cameras),
+                "chunks": len(chunks),
+                "runs": sum(chunk.count for chunk in chunks),
+                "bytes": sum(chunk.nbytes() for chunk in chunks),
+            }
+
+
+presence_timeline = PresenceTimeline()
@@ -0,0 +1,136 @@
+# backend/services/profiles.py
+# Runtime tuning values and performance profiles.
+#
+# Knobs that trade accuracy for CPU (recognition interval, match threshold,
+# alert cooldowns, pose model size, capture resolution, motion sensitivity,
+# stream/snapshot quality) are read through setting(key) at the point of
+# use instead of module constants. Their values are the active profile from
+# config.PROFILES plus per-key overrides.
+#
+# apply_profile() switches immediately and persists the choice to
+# SETTINGS_PATH. Every process checks that file at most once per
+# SETTINGS_CHECK_SECONDS and reloads it when its mtime changes, so a switch
+# (or a hand edit of the file) also reaches the inference worker processes.
+
+import json
+import os
+import threading
+import time
+
+from config import PROFILE, PROFILES, SETTINGS_CHECK_SECONDS, SETTINGS_PATH
+from services.logger import get_logger
+from services.metrics import inc
+
+log = get_logger("profiles")
+
+# Settings limited to a fixed set of values
+CHOICES = {
+    "pose_complexity": (0, 1, 2),
+    "stream_max_tier": ("low", "medium", "high"),
+}
+
+
+def resolve(profile, overrides=None):
+    """Values of ``profile`` with ``overrides`` applied; ValueError if either is invalid."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}'")
+    values = dict(PROFILES[profile])
+    for key, value in (overrides or {}).items():
+        if key not in values:
+            raise ValueError(f"Unknown setting '{key}'")
+        default = values[key]
+        try:
+            if isinstance(default, dict):
+                value = {**default, **{str(k): float(v) for k, v in dict(value).items()}}
+            else:
+                value = type(default)(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for '{key}': {value!r}")
+        if key in CHOICES and value not in CHOICES[key]:
+            raise ValueError(f"'{key}' must be one of {list(CHOICES[key])}")
+        values[key] = value
+    return values
+
+
+class RuntimeSettings:
+    def __init__(self, path=SETTINGS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.profile = PROFILE
+        self.overrides = {}
+        self.values = resolve(PROFILE)
+        self.source = "default"
+        self.applied_at = time.time()
+        self._mtime = None
+        self._next_check = 0.0
+
+    def get(self, key):
+        self._check()
+        return self.values[key]
+
+    def _check(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + SETTINGS_CHECK_SECONDS
+            self._reload_if_changed()
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self._apply(data.get("profile", PROFILE), data.get("overrides") or {}, "file")
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            log.warning("settings file ignored", path=self.path, error=e)
+
+    def _apply(self, profile, overrides, source):
+        values = resolve(profile, overrides)
+        with self._lock:
+            changed = [key for key, value in values.items() if self.values.get(key) != value]
+            self.profile, self.overrides, self.values = profile, dict(overrides), values
+            self.source, self.applied_at = source, time.time()
+        inc("profile_switches_total", profile=profile, source=source)
+        log.info("profile applied", profile=profile, source=source, changed=",".join(changed))
+
+    def apply_profile(self, profile, overrides=None, persist=True):
+        """
+        Switch to ``profile`` (with optional per-key ``overrides``) now.
+        Raises ValueError for an unknown profile, key or value. With
+        ``persist`` the choice is written to the settings file.
+        """
+        overrides = dict(overrides or {})
+        # Take in any pending file change first so it cannot undo this switch later
+        self._reload_if_changed()
+        self._apply(profile, overrides, "api" if persist else "local")
+        if persist:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"profile": profile, "overrides": overrides}, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.stat(self.path).st_mtime_ns
+        return self.active()
+
+    def active(self):
+        self._check()
+        with self._lock:
+            return {
+                "profile": self.profile,
+                "overrides": dict(self.overrides),
+                "values": dict(self.values),
+                "source": self.source,
+                "applied_at": self.applied_at,
+            }
+
+
+runtime_settings = RuntimeSettings()
+
+
+def setting(key):
+    """Current value of a tuning knob (see config.PROFILES)."""
+    return runtime_settings.get(key)
@@ -0,0 +1,108 @@
+# backend/services/readiness.py
+# Lazily loaded heavy components (models, camera) and their load state.
+# Nothing heavy happens at import time: each component loads on first use,
+# or earlier when warm_up() preloads it in the background. GET /ready reports
+# the state and load time of every registered component, and is ready once
+# the components passed to warm_up() have loaded. A component released to
+# save power still counts as ready: it reloads on its next use.
+
+import threading
+import time
+
+from services.logger import get_logger
+
+log = get_logger("readiness")
+
+_components = {}
+# Components warm_up() was asked to load; what readiness waits for
+_required = []
+# States in which a component is usable (a released one reloads on get())
+USABLE = ("ready", "released")
+
+
+class LazyComponent:
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._value = None
+        self._lock = threading.Lock()
+        self.state = "pending"   # pending / loading / ready / released / failed
+        self.load_seconds = None
+        self.error = None
+        _components[name] = self
+
+    def get(self):
+        """The loaded component; loads it (once, thread safe) if needed."""
+        if self.state == "ready":
+            return self._value
+        with self._lock:
+            if self.state != "ready":
+                self.state = "loading"
+                start = time.perf_counter()
+                try:
+                    value = self._loader()
+                except Exception as e:
+                    self.state = "failed"
+                    self.error = str(e)
+                    self.load_seconds = time.perf_counter() - start
+                    raise
+                self._value = value
+                self.error = None
+                self.load_seconds = time.perf_counter() - start
+                self.state = "ready"
+        return self._value
+
+    def set(self, value):
+        """Replace the component with an already loaded value."""
+        with self._lock:
+            self._value = value
+            self.error = None
+            self.state = "ready"
+
+    def release(self):
+        """Drop the loaded value so it can be garbage collected; reloads on next get()."""
+        with self._lock:
+            value = self._value
+            self._value = None
+            if self.state == "ready":
+                self.state = "released"
+        return value
+
+    def status(self):
+        return {
+            "state": self.state,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+def get_component(name):
+    return _components[name]
+
+
+def status():
+    return {name: component.status() for name, component in _components.items()}
+
+
+def is_ready(names=None):
+    names = names or _required or list(_components)
+    return all(_components[n].state in USABLE for n in names if n in _components)
+
+
+def warm_up(names):
+    """Load components one after another in a background thread."""
+    _required.extend(name for name in names if name not in _required)
+    def _run():
+        for name in names:
+            component = _components.get(name)
+            if component is None:
+                continue
+            try:
+                component.get()
+                log.info("component ready", component=name, seconds=round(component.load_seconds, 2))
+            except Exception as e:
+                log.warning("component failed to load", component=name, error=e)
+
+    thread = threading.Thread(target=_run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
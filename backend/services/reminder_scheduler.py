@@ -0,0 +1,123 @@
+# backend/services/reminder_scheduler.py
+# Per-user reminder engine.
+#
+# Two kinds of reminder:
+#   - on exit: a user's "reminders" items, checked when they are seen at the
+#     exit zone, at most once per EXIT_REMINDER_COOLDOWN for that user
+#   - time of day: a user's "timed_reminders" ([{"message", "at": "HH:MM"}]),
+#     kept in a heap ordered by next due time
+#
+# Only users the processor actually sees are evaluated. A time-of-day
+# reminder that comes due while its user is away waits (up to
+# TIMED_REMINDER_GRACE) and is delivered the next time they are in view.
+
+import heapq
+import threading
+from datetime import datetime, timedelta
+
+from db import get_user_by_name, get_all_users, users_version
+from detection.item_detection import is_at_exit, get_missing_reminders
+from services.alert_service import create_alert
+from services.logger import get_logger
+
+EXIT_REMINDER_COOLDOWN = 30      # seconds, per user
+TIMED_REMINDER_GRACE = 2 * 3600  # seconds a due reminder waits for its user
+
+log = get_logger("reminders")
+
+
+def next_occurrence(at, now):
+    """Timestamp of the next "HH:MM" strictly after ``now``."""
+    hour, minute = (int(part) for part in at.split(":"))
+    due = datetime.fromtimestamp(now).replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if due.timestamp() <= now:
+        due += timedelta(days=1)
+    return due.timestamp()
+
+
+class ReminderScheduler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap = []        # (due, name, message, at)
+        self._pending = {}     # name -> [(expires, message)]
+        self._next_exit = {}   # name -> earliest time for the next exit reminder
+        self._version = None
+
+    def _sync(self, now):
+        """Rebuild the time-of-day heap when users.json has changed."""
+        version = users_version()
+        if version == self._version:
+            return
+        self._version = version
+        heap = []
+        for user in get_all_users():
+            for reminder in user.get("timed_reminders", []):
+                try:
+                    due = next_occurrence(reminder["at"], now)
+                except (KeyError, ValueError):
+                    log.warning("invalid timed reminder", user=user["name"], reminder=reminder)
+                    continue
+                heap.append((due, user["name"], reminder["message"], reminder["at"]))
+        heapq.heapify(heap)
+        self._heap = heap
+
+    def _poll(self, now):
+        """Move reminders that have come due to their user's pending list."""
+        while self._heap and self._heap[0][0] <= now:
+            due, name, message, at = heapq.heappop(self._heap)
+            self._pending.setdefault(name, []).append((due + TIMED_REMINDER_GRACE, message))
+            heapq.heappush(self._heap, (next_occurrence(at, now), name, message, at))
+
+        for name in list(self._pending):
+            live = [item for item in self._pending[name] if item[0] >= now]
+            if live:
+                self._pending[name] = live
+            else:
+                del self._pending[name]
+
+    def observe(self, name, camera_id, frame, motion, now):
+        """Evaluate reminders for a user seen on a camera."""
+        with self._lock:
+            self._poll(now)
+            self._sync(now)
+            due = [message for _, message in self._pending.pop(name, [])]
+            exit_due = now >= self._next_exit.get(name, 0)
+
+        for message in due:
+            create_alert("reminder", f"{name.capitalize()}, {message}", camera_id=camera_id)
+
+        if not exit_due:
+            return
+        user = get_user_by_name(name)
+        # Only check items when the user is heading out through the exit zone
+        if not user or not user.get("reminders") or not is_at_exit(motion):
+            return
+        missing = get_missing_reminders(name, frame, user["reminders"])
+        if missing:
+            items = ", ".join(missing)
+            create_alert(
+                "reminder",
+                f"{name.capitalize()}, don't forget your {items}",
+                camera_id=camera_id,
+            )
+            with self._lock:
+                self._next_exit[name] = now + EXIT_REMINDER_COOLDOWN
+
+    def upcoming(self, now):
+        """Scheduled and waiting time-of-day reminders."""
+        with self._lock:
+            self._poll(now)
+            self._sync(now)
+            return {
+                "scheduled": [
+                    {"name": name, "message": message, "at": at, "due": due}
+                    for due, name, message, at in sorted(self._heap)
+                ],
+                "waiting": {
+                    name: [message for _, message in items]
+                    for name, items in self._pending.items()
+                },
+            }
+
+
+reminder_scheduler = ReminderScheduler()
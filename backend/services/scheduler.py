@@ -0,0 +1,114 @@
+# backend/services/scheduler.py
+# Shared inference scheduler for all cameras.
+#
+# Each camera loop hands its recognition / pose work to the scheduler and
+# waits for the result. A fixed set of worker threads serves the waiting
+# cameras in order of camera priority, recent activity (motion score) and how
+# long the request has been waiting, so a busy camera is served first but an
+# idle one is never starved. Workers run the work through
+# services.inference_pool, i.e. in-thread or in the process pool.
+
+import threading
+import time
+
+from config import SCHEDULER_WORKERS
+from services.inference_pool import infer
+
+PRIORITY_WEIGHT = 1.0
+ACTIVITY_WEIGHT = 10.0   # motion score is a 0-1 fraction of the frame
+AGE_WEIGHT = 2.0         # per second waited
+
+
+class _Job:
+    def __init__(self, camera_id, frame, tasks, priority, activity):
+        self.camera_id = camera_id
+        self.frame = frame
+        self.tasks = tasks
+        self.priority = priority
+        self.activity = activity
+        self.submitted = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def score(self, now):
+        return (
+            self.priority * PRIORITY_WEIGHT
+            + self.activity * ACTIVITY_WEIGHT
+            + (now - self.submitted) * AGE_WEIGHT
+        )
+
+
+class InferenceScheduler:
+    def __init__(self, workers=SCHEDULER_WORKERS):
+        self.workers = workers
+        self._cond = threading.Condition()
+        self._pending = []
+        self._stats = {}
+        self._threads = []
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"inference-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def run(self, camera_id, frame, tasks, priority=1.0, activity=0.0):
+        """Queue work for a camera and block until a worker has run it."""
+        job = _Job(camera_id, frame, tuple(tasks), priority, activity)
+        with self._cond:
+            self._ensure_started()
+            self._pending.append(job)
+            self._cond.notify()
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                now = time.monotonic()
+                job = max(self._pending, key=lambda j: j.score(now))
+                self._pending.remove(job)
+                waited = now - job.submitted
+
+            start = time.monotonic()
+            try:
+                job.result = infer(job.frame, job.tasks, job.camera_id)
+            except Exception as e:
+                job.error = e
+            busy = time.monotonic() - start
+            job.done.set()
+
+            with self._cond:
+                stats = self._stats.setdefault(
+                    job.camera_id, {"jobs": 0, "wait_seconds": 0.0, "busy_seconds": 0.0}
+                )
+                stats["jobs"] += 1
+                stats["wait_seconds"] += waited
+                stats["busy_seconds"] += busy
+
+    def stats(self):
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "pending": len(self._pending),
+                "cameras": {
+                    camera_id: {
+                        "jobs": s["jobs"],
+                        "avg_wait_ms": 1000.0 * s["wait_seconds"] / s["jobs"],
+                        "busy_seconds": round(s["busy_seconds"], 3),
+                    }
+                    for camera_id, s in self._stats.items()
+                },
+            }
+
+
+scheduler = InferenceScheduler()
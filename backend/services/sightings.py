@@ -0,0 +1,316 @@
+# backend/services/sightings.py
+# Time-partitioned on-disk index of face sightings.
+#
+# Every recognised face (timestamp, camera, 128-d encoding, name, recognition
+# distance) is buffered in memory and flushed by a background thread as a
+# compressed chunk into an hourly (UTC) partition directory:
+#
+#   sightings/2026-10-19T14/chunk-<ms>-<seq>-<rows>.npz
+#       ts, camera, name, distance, embedding (float16)
+#
+# A partition's chunks are merged into one file once its hour is over, and
+# meanwhile whenever MERGE_CHUNKS of them have piled up. Searches only open
+# the partitions overlapping the requested time range and scan each one
+# with a single vectorised distance computation. Recently loaded partitions
+# are cached; partitions older than SIGHTING_RETENTION_DAYS are deleted.
+#
+# Records stay searchable from the buffer until their chunk is on disk: the
+# flush thread writes a chunk and drops its rows from the in-flight list
+# under the files lock, which a search holds while it reads partitions and
+# the buffer. Every change to a partition's files bumps its generation, and
+# a load started before a change is not cached.
+
+import calendar
+import itertools
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from config import (
+    SIGHTINGS_DIR, SIGHTING_FLUSH_SECONDS, SIGHTING_RETENTION_DAYS,
+)
+from services.logger import get_logger
+from services.metrics import inc
+
+log = get_logger("sightings")
+
+PARTITION_FORMAT = "%Y-%m-%dT%H"
+PARTITION_SECONDS = 3600
+CACHED_PARTITIONS = 48
+# Keeps chunk names unique when two are written within a millisecond
+_chunk_sequence = itertools.count()
+# Chunks an open partition may collect before they are merged (~5 minutes)
+MERGE_CHUNKS = 30
+FIELDS = ("ts", "camera", "name", "distance", "embedding")
+
+
+def partition_key(timestamp):
+    return time.strftime(PARTITION_FORMAT, time.gmtime(timestamp))
+
+
+def partition_start(key):
+    return calendar.timegm(time.strptime(key, PARTITION_FORMAT))
+
+
+def _to_arrays(records):
+    """List of (ts, camera, name, distance, embedding) -> dict of column arrays."""
+    if not records:
+        return None
+    ts, cameras, names, distances, embeddings = zip(*records)
+    return {
+        "ts": np.array(ts, dtype=np.float64),
+        "camera": np.array(cameras, dtype=str),
+        "name": np.array(names, dtype=str),
+        "distance": np.array(distances, dtype=np.float32),
+        "embedding": np.array(embeddings, dtype=np.float16),
+    }
+
+
+def _concat(parts):
+    parts = [p for p in parts if p is not None and len(p["ts"])]
+    if not parts:
+        return None
+    return {field: np.concatenate([p[field] for p in parts]) for field in FIELDS}
+
+
+class SightingIndex:
+    def __init__(self, root=SIGHTINGS_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._writing = {}  # partition key -> records taken from the buffer, not yet on disk
+        self._cache = OrderedDict()  # partition key -> column arrays
+        self._generations = {}  # partition key -> count of changes to its files
+        # Held while chunk files are read, written or removed
+        self._files_lock = threading.Lock()
+        self._thread = None
+
+    # ---------------- WRITE ---------------- #
+    def record(self, camera_id, timestamp, encoding, name, distance):
+        """Queue a sighting; written to disk by the flush thread."""
+        embedding = np.asarray(encoding, dtype=np.float16)
+        with self._lock:
+            self._buffer.append((
+                float(timestamp), camera_id, name or "",
+                float(distance) if distance is not None else np.nan, embedding,
+            ))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._flush_loop, name="sightings", daemon=True)
+            self._thread.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(SIGHTING_FLUSH_SECONDS)
+            try:
+                self.flush()
+                self.compact()
+                self.apply_retention()
+            except Exception as e:
+                log.exception("sighting flush failed", error=e)
+
+    def _changed(self, key):
+        """Invalidate a partition after its files changed; call with _lock held."""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._cache.pop(key, None)
+
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            for record in records:
+                self._writing.setdefault(partition_key(record[0]), []).append(record)
+            # Includes partitions a failed flush left behind
+            keys = list(self._writing)
+
+        for key in keys:
+            directory = os.path.join(self.root, key)
+            os.makedirs(directory, exist_ok=True)
+            with self._files_lock:
+                with self._lock:
+                    rows = self._writing[key]
+                self._write_chunk(directory, _to_arrays(rows))
+                with self._lock:
+                    del self._writing[key]
+                    self._changed(key)
+            inc("sightings_written_total", len(rows))
+
+    @staticmethod
+    def _write_chunk(directory, columns):
+        path = os.path.join(directory, f"chunk-{int(time.time() * 1000)}-{next(_chunk_sequence)}-{len(columns['ts'])}.npz")
+        with open(path + ".tmp", "wb") as f:
+            np.savez_compressed(f, **columns)
+        os.replace(path + ".tmp", path)
+        return path
+
+    @staticmethod
+    def _chunk_files(directory):
+        return sorted(f for f in os.listdir(directory) if f.endswith(".npz"))
+
+    def compact(self, now=None):
+        """Merge the chunks of finished partitions, and of open ones holding MERGE_CHUNKS."""
+        now = time.time() if now is None else now
+        for key in self._partition_keys():
+            directory = os.path.join(self.root, key)
+            filenames = self._chunk_files(directory)
+            # Late records of an hour can still arrive with the next flush
+            finished = partition_start(key) + PARTITION_SECONDS + SIGHTING_FLUSH_SECONDS < now
+            if len(filenames) < 2 or (not finished and len(filenames) < MERGE_CHUNKS):
+                continue
+
+            parts = []
+            for filename in filenames:
+                with np.load(os.path.join(directory, filename)) as chunk:
+                    parts.append({field: chunk[field] for field in FIELDS})
+            merged = _concat(parts)
+            with self._files_lock:
+                if merged is not None:
+                    self._write_chunk(directory, merged)
+                for filename in filenames:
+                    os.remove(os.path.join(directory, filename))
+                with self._lock:
+                    self._changed(key)
+            log.debug("sighting partition compacted", partition=key, chunks=len(filenames))
+
+    def apply_retention(self, now=None):
+        cutoff = (time.time() if now is None else now) - SIGHTING_RETENTION_DAYS * 86400
+        for key in self._partition_keys():
+            if partition_start(key) + PARTITION_SECONDS < cutoff:
+                with self._files_lock:
+                    shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+                    with self._lock:
+                        self._changed(key)
+
+    # ---------------- READ ---------------- #
+    def _partition_keys(self):
+        try:
+            entries = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        keys = []
+        for entry in entries:
+            try:
+                partition_start(entry)
+            except ValueError:
+                continue
+            keys.append(entry)
+        return sorted(keys)
+
+    def _load(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            generation = self._generations.get(key, 0)
+
+        directory = os.path.join(self.root, key)
+        parts = []
+        try:
+            filenames = self._chunk_files(directory)
+        except FileNotFoundError:
+            filenames = []
+        for filename in filenames:
+            with np.load(os.path.join(directory, filename)) as chunk:
+                parts.append({field: chunk[field] for field in FIELDS})
+        columns = _concat(parts)
+
+        with self._lock:
+            # Files changed while reading: return what was read, but don't cache it
+            if self._generations.get(key, 0) == generation:
+                self._cache[key] = columns
+                while len(self._cache) > CACHED_PARTITIONS:
+                    self._cache.popitem(last=False)
+        return columns
+
+    def _columns(self, start=None, end=None):
+        """Column arrays for each partition overlapping [start, end], then the unwritten records."""
+        found = []
+        # One consistent view: no chunk is written or dropped from the
+        # in-flight list between reading the partitions and the buffer
+        with self._files_lock:
+            for key in self._partition_keys():
+                key_start = partition_start(key)
+                if end is not None and key_start > end:
+                    continue
+                if start is not None and key_start + PARTITION_SECONDS <= start:
+                    continue
+                found.append(self._load(key))
+            with self._lock:
+                unwritten = [r for rows in self._writing.values() for r in rows] + self._buffer
+                pending = _to_arrays(unwritten)
+        found.append(pending)
+        return [columns for columns in found if columns is not None]
+
+    @staticmethod
+    def _mask(columns, start, end, camera_id, name):
+        mask = np.ones(len(columns["ts"]), dtype=bool)
+        if start is not None:
+            mask &= columns["ts"] >= start
+        if end is not None:
+            mask &= columns["ts"] <= end
+        if camera_id is not None:
+            mask &= columns["camera"] == camera_id
+        if name is not None:
+            # Known names are stored lower-case, strangers as "STRANGER"
+            mask &= np.char.lower(columns["name"]) == name.lower()
+        return mask
+
+    @staticmethod
+    def _rows(columns, indices, match_distances=None):
+        rows = []
+        for position, i in enumerate(indices):
+            row = {
+                "timestamp": float(columns["ts"][i]),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(columns["ts"][i])),
+                "camera_id": str(columns["camera"][i]),
+                "name": str(columns["name"][i]) or None,
+                "distance": None if np.isnan(columns["distance"][i]) else float(columns["distance"][i]),
+            }
+            if match_distances is not None:
+                row["match_distance"] = float(match_distances[position])
+            rows.append(row)
+        return rows
+
+    def list(self, start=None, end=None, camera_id=None, name=None, limit=100):
+        """Sightings in a time range, newest first."""
+        found = []
+        for columns in self._columns(start, end):
+            indices = np.flatnonzero(self._mask(columns, start, end, camera_id, name))
+            found.extend(self._rows(columns, indices))
+        found.sort(key=lambda row: row["timestamp"], reverse=True)
+        return found[:limit]
+
+    def search(self, probe, start=None, end=None, camera_id=None, threshold=0.5, limit=50):
+        """Sightings whose embedding is within ``threshold`` of ``probe``, closest first."""
+        probe = np.asarray(probe, dtype=np.float32)
+        found = []
+        for columns in self._columns(start, end):
+            indices = np.flatnonzero(self._mask(columns, start, end, camera_id, None))
+            if not len(indices):
+                continue
+            distances = np.linalg.norm(
+                columns["embedding"][indices].astype(np.float32) - probe, axis=1
+            )
+            close = distances < threshold
+            found.extend(self._rows(columns, indices[close], distances[close]))
+        found.sort(key=lambda row: row["match_distance"])
+        return found[:limit]
+
+    def stats(self):
+        keys = self._partition_keys()
+        with self._lock:
+            buffered = len(self._buffer) + sum(len(rows) for rows in self._writing.values())
+            cached = len(self._cache)
+        return {
+            "partitions": len(keys),
+            "oldest": keys[0] if keys else None,
+            "newest": keys[-1] if keys else None,
+            "buffered": buffered,
+            "cached_partitions": cached,
+        }
+
+
+sighting_index = SightingIndex()
@@ -0,0 +1,102 @@
+# backend/services/snapshots.py
+# Cached JPEG snapshots of each camera's latest frame, and alert thumbnails.
+#
+# A snapshot is encoded at most once per published frame and size; every
+# other request for the same frame is served from the cache, so polling
+# /snapshot costs no decode or inference. Alerts get a small thumbnail of the
+# frame at the moment they fire.
+
+import threading
+
+import cv2
+from camera import get_feed
+from config import PRIMARY_CAMERA
+from services.alert_store import alerts
+from services.metrics import inc, stage
+from services.profiles import setting
+
+THUMBNAIL_WIDTH = 160
+MIN_SNAPSHOT_WIDTH = 32
+
+
+def _encode(frame, width):
+    height, frame_width = frame.shape[:2]
+    if width and width < frame_width:
+        frame = cv2.resize(
+            frame, (width, max(1, round(height * width / frame_width))),
+            interpolation=cv2.INTER_AREA,
+        )
+    with stage("jpeg_encode"):
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, setting("jpeg_quality")])
+    return buffer.tobytes() if ok else None
+
+
+class SnapshotCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cameras = {}  # camera_id -> {"lock", "seq", "jpegs": {width: bytes}}
+
+    def _camera(self, camera_id):
+        with self._lock:
+            entry = self._cameras.get(camera_id)
+            if entry is None:
+                entry = {"lock": threading.Lock(), "seq": 0, "timestamp": 0.0, "jpegs": {}}
+                self._cameras[camera_id] = entry
+            return entry
+
+    def get(self, camera_id=PRIMARY_CAMERA, width=None):
+        """
+        (seq, timestamp, jpeg) of the camera's latest frame, ``width`` pixels
+        wide (full size when None). Returns None before the first frame.
+        """
+        feed = get_feed(camera_id)
+        feed.start()
+        seq, timestamp, frame = feed.latest()
+        if frame is None:
+            return None
+        if width is not None:
+            width = max(MIN_SNAPSHOT_WIDTH, int(width))
+            if width >= frame.shape[1]:
+                width = None
+
+        entry = self._camera(camera_id)
+        with entry["lock"]:
+            if entry["seq"] != seq:
+                # Only the latest frame is cached
+                entry["seq"] = seq
+                entry["timestamp"] = timestamp
+                entry["jpegs"] = {}
+            jpeg = entry["jpegs"].get(width)
+            if jpeg is None:
+                inc("snapshot_cache_misses_total")
+                jpeg = _encode(frame, width)
+                if jpeg is None:
+                    return None
+                entry["jpegs"][width] = jpeg
+            else:
+                inc("snapshot_cache_hits_total")
+            return seq, entry["timestamp"], jpeg
+
+
+snapshot_cache = SnapshotCache()
+
+# alert id -> thumbnail JPEG, pruned along with the alert store
+alert_thumbnails = {}
+
+
+def capture_alert_thumbnail(alert):
+    """Alert listener: keep a small thumbnail of the frame that triggered it."""
+    snapshot = snapshot_cache.get(alert.get("camera_id") or PRIMARY_CAMERA, THUMBNAIL_WIDTH)
+    if snapshot is None:
+        return
+    alert_thumbnails[alert["id"]] = snapshot[2]
+    alert["thumbnail"] = f"/alerts/{alert['id']}/thumbnail"
+
+    if len(alert_thumbnails) > len(alerts):
+        live = {a["id"] for a in alerts}
+        for alert_id in [i for i in alert_thumbnails if i not in live]:
+            alert_thumbnails.pop(alert_id, None)
+
+
+def get_alert_thumbnail(alert_id):
+    return alert_thumbnails.get(alert_id)
@@ -0,0 +1,140 @@
+# backend/services/streams.py
+# Shared MJPEG stream tiers.
+#
+# Each camera/tier pair keeps one encoded JPEG. A frame is encoded at most
+# once per tier and at most at the tier's max FPS; every client on the tier
+# gets the same bytes. Clients on "auto" start at medium and move between
+# tiers based on how much of each frame interval is spent sending.
+
+import threading
+import time
+
+import cv2
+from services.metrics import inc, stage
+from services.profiles import setting
+
+# width (px, aspect kept), JPEG quality, max frames per second
+STREAM_TIERS = {
+    "low": {"width": 320, "quality": 50, "fps": 5},
+    "medium": {"width": 480, "quality": 65, "fps": 12},
+    "high": {"width": 640, "quality": 80, "fps": 30},
+}
+TIER_ORDER = ["low", "medium", "high"]
+AUTO_START_TIER = "medium"
+
+# Auto tier: share of the frame interval spent sending (EWMA) that triggers
+# a step down / up, and how many frames to observe before switching again
+AUTO_DOWNGRADE_LOAD = 0.8
+AUTO_UPGRADE_LOAD = 0.25
+AUTO_SMOOTHING = 0.2
+AUTO_MIN_FRAMES = 15
+
+
+def cap_tier(tier):
+    """``tier``, lowered to the profile's setting("stream_max_tier") if above it."""
+    best = TIER_ORDER.index(setting("stream_max_tier"))
+    return TIER_ORDER[min(TIER_ORDER.index(tier), best)]
+
+
+def encode_tier(frame, tier):
+    settings = STREAM_TIERS[tier]
+    height, width = frame.shape[:2]
+    if width > settings["width"]:
+        frame = cv2.resize(
+            frame, (settings["width"], round(height * settings["width"] / width)),
+            interpolation=cv2.INTER_AREA,
+        )
+    with stage("jpeg_encode"):
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, settings["quality"]])
+    return buffer.tobytes() if ok else None
+
+
+class TierStream:
+    """The latest encoded frame of one camera at one tier."""
+
+    def __init__(self, feed, tier):
+        self.feed = feed
+        self.tier = tier
+        self.interval = 1.0 / STREAM_TIERS[tier]["fps"]
+        self._lock = threading.Lock()
+        self.seq = 0
+        self.jpeg = None
+        self.encoded_at = 0.0
+
+    def next_frame(self, after_seq=0):
+        """
+        Block until an encoded frame newer than ``after_seq`` is available
+        and return (seq, jpeg). A cached encode younger than the tier's frame
+        interval is reused instead of encoding a newer camera frame.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                fresh = now - self.encoded_at < self.interval
+                if self.seq > after_seq and fresh:
+                    return self.seq, self.jpeg
+                wait = self.encoded_at + self.interval - now if fresh else 0.0
+            if wait > 0:
+                time.sleep(wait)
+                continue
+
+            seq, frame = self.feed.wait_frame(max(self.seq, after_seq))
+            if frame is None:
+                continue
+            with self._lock:
+                if seq > self.seq:
+                    jpeg = encode_tier(frame, self.tier)
+                    if jpeg is None:
+                        continue
+                    self.seq, self.jpeg, self.encoded_at = seq, jpeg, time.monotonic()
+                    inc("stream_frames_encoded_total", tier=self.tier)
+                if self.seq > after_seq:
+                    return self.seq, self.jpeg
+
+
+class StreamHub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams = {}
+
+    def get(self, camera_id, tier):
+        with self._lock:
+            stream = self._streams.get((camera_id, tier))
+            if stream is None:
+                from camera import get_feed
+                stream = TierStream(get_feed(camera_id), tier)
+                self._streams[(camera_id, tier)] = stream
+            return stream
+
+
+stream_hub = StreamHub()
+
+
+class AutoTier:
+    """Per-client tier choice from the measured send time of each frame."""
+
+    def __init__(self, tier=AUTO_START_TIER):
+        self.tier = tier
+        self.load = 0.5
+        self.frames = 0
+
+    def record(self, send_seconds):
+        """Feed the time the last frame took to send; returns the tier to use next."""
+        interval = 1.0 / STREAM_TIERS[self.tier]["fps"]
+        self.load += AUTO_SMOOTHING * (send_seconds / interval - self.load)
+        self.frames += 1
+        if self.frames < AUTO_MIN_FRAMES:
+            return self.tier
+
+        index = TIER_ORDER.index(self.tier)
+        if self.load > AUTO_DOWNGRADE_LOAD and index > 0:
+            self._switch(TIER_ORDER[index - 1])
+        elif self.load < AUTO_UPGRADE_LOAD and index < TIER_ORDER.index(cap_tier(TIER_ORDER[-1])):
+            self._switch(TIER_ORDER[index + 1])
+        return self.tier
+
+    def _switch(self, tier):
+        inc("stream_tier_switches_total", to=tier)
+        self.tier = tier
+        self.load = 0.5
+        self.frames = 0